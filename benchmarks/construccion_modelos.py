@@ -0,0 +1,77 @@
+"""Tiempo de construcción de los modelos de cada sistema para distintas longitudes de serie
+
+Se compara la construcción original, con una regla de pyomo por hora (benchmarks.modelos_originales), con la
+construcción vectorizada actual.
+
+Uso: python -m benchmarks.construccion_modelos
+"""
+import time
+
+import yaml
+
+from benchmarks.datos_sinteticos import datos_sinteticos
+from benchmarks.modelos_originales import (modelo_aerotermia_original, modelo_aire_acondicionado_original,
+                                           modelo_gas_original)
+from optimizador.sistemas.estudio_aerotermia import modelo_aerotermia
+from optimizador.sistemas.estudio_aire_acondicionado import modelo_aire_acondicionado
+from optimizador.sistemas.estudio_gas import modelo_gas
+
+
+def medir(funcion, repeticiones=3):
+    """Mejor tiempo de ejecución de una función entre varias repeticiones
+
+    :param funcion: Función sin argumentos a medir
+    :param repeticiones: Número de repeticiones
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def main():
+    """Construye los modelos de cada sistema sin resolverlos e imprime el tiempo de cada construcción"""
+    with open('datos_tecnicos.yaml', "r", encoding="utf-8") as f:
+        datos = yaml.safe_load(f)
+    aguas = 2
+    placas = [60, 60]
+    print(f"{'Sistema':<35}{'Horas':>8}{'Original [s]':>14}{'Actual [s]':>12}{'Mejora':>8}")
+    for horas in (8760, 4 * 8760):
+        df, irradiacion = datos_sinteticos(horas, aguas)
+        df_gas = df.copy()
+        df_gas['cargas'] = df_gas['cargas'].clip(lower=0)
+        sistemas = {
+            'Gas': (
+                lambda df_gas=df_gas: modelo_gas_original(df_gas, 0, datos),
+                lambda df_gas=df_gas: modelo_gas(df_gas, 0, datos)),
+            'Aerotermia de alta': (
+                lambda df=df, irradiacion=irradiacion: modelo_aerotermia_original(
+                    'Aerotermia de alta', df, irradiacion, placas, aguas, 0, datos),
+                lambda df=df, irradiacion=irradiacion: modelo_aerotermia(
+                    'Aerotermia de alta', df, irradiacion, placas, aguas, 0, datos)),
+            'Aerotermia de baja': (
+                lambda df=df, irradiacion=irradiacion: modelo_aerotermia_original(
+                    'Aerotermia de baja', df, irradiacion, placas, aguas, 0, datos),
+                lambda df=df, irradiacion=irradiacion: modelo_aerotermia(
+                    'Aerotermia de baja', df, irradiacion, placas, aguas, 0, datos)),
+            'Aire acondicionado': (
+                lambda df=df, irradiacion=irradiacion: modelo_aire_acondicionado_original(
+                    df, irradiacion, placas, [0] * aguas, aguas, 0, datos),
+                lambda df=df, irradiacion=irradiacion: modelo_aire_acondicionado(
+                    df, irradiacion, placas, [0] * aguas, aguas, 0, datos)),
+            'Aire acondicionado (placas fijas)': (
+                lambda df=df, irradiacion=irradiacion: modelo_aire_acondicionado_original(
+                    df, irradiacion, placas, [3] * aguas, aguas, 0, datos),
+                lambda df=df, irradiacion=irradiacion: modelo_aire_acondicionado(
+                    df, irradiacion, placas, [3] * aguas, aguas, 0, datos)),
+        }
+        for nombre, (original, actual) in sistemas.items():
+            t_original = medir(original)
+            t_actual = medir(actual)
+            print(f"{nombre:<35}{horas:>8}{t_original:>14.3f}{t_actual:>12.3f}{t_original / t_actual:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+"""Módulo que genera datos horarios sintéticos para las pruebas de rendimiento"""
+import numpy as np
+import pandas as pd
+
+
+def datos_sinteticos(horas=8760, aguas=2, semilla=0):
+    """Genera un Dataframe horario y una irradiación con la misma forma que los datos reales
+
+    :param horas: Número de horas de la serie
+    :param aguas: Numero de aguas del tejado
+    :param semilla: Semilla del generador aleatorio
+    """
+    rng = np.random.default_rng(semilla)
+    h = np.arange(horas)
+    t_ext = 12 + 10 * np.sin(2 * np.pi * (h / 8760 - 0.3)) + 4 * np.sin(2 * np.pi * h / 24)
+    cargas = np.where(t_ext < 16, (16 - t_ext) * 400, np.where(t_ext > 24, (24 - t_ext) * 300, 0))
+    cargas = cargas + rng.normal(0, 50, horas)
+
+    df = pd.DataFrame({
+        'precio_luz': (0.12 + 0.05 * np.sin(2 * np.pi * h / 24) + rng.normal(0, 0.01, horas)) / 1000,
+        'precio_gas': np.full(horas, 0.11475 / 1000),
+        'cargas': cargas,
+        'T_exterior': t_ext
+    }, index=pd.date_range(start='01-01-2023', freq='h', periods=horas))
+    df["climatizacion"] = np.where(df["cargas"] >= 0, "Calefaccion", "Refrigeracion")
+
+    sol = np.clip(800 * np.sin(np.pi * ((h % 24) - 6) / 12), 0, None)
+    irradiacion = pd.DataFrame({f'cara_{j}': sol * (1 - 0.3 * j / aguas) for j in range(aguas)})
+    return df, irradiacion
@@ -0,0 +1,90 @@
+"""Error de coste y aceleración del modelo de aerotermia con días representativos frente al año completo
+
+Los precios son los de Datos/; las cargas, la temperatura exterior y la irradiación son sintéticas. El
+coste es el valor del objetivo (operación anual más inversión anualizada). Con despacho completo la
+operación se vuelve a calcular en el año completo con el depósito y las placas del modelo reducido (la
+potencia solo puede aumentar), de modo que su coste es alcanzable; sin él, el coste de operación es la
+estimación ponderada de los días representativos.
+
+Uso: python -m benchmarks.dias_representativos [--horas 8760] [--dias 4 8 12 24] [--tipo "Aerotermia de alta"]
+     [--gap 1e-4]
+"""
+import argparse
+import time
+
+import pyomo.environ as pyo
+import yaml
+
+from benchmarks.datos_sinteticos import datos_sinteticos
+from optimizador.entradas import leer_precios
+from optimizador.sistemas.dias_representativos import agrupar_dias, datos_agrupados
+from optimizador.sistemas.estudio_aerotermia import fijar_equipos, modelo_aerotermia
+from optimizador.sistemas.solver import argumentos_solve, configuracion_solver, crear_solver, valores_enteros
+
+
+def resolver_medido(model, datos, tipo, gap):
+    """Resuelve el modelo sin mostrar la salida del solver y devuelve el tiempo empleado
+
+    :param model: Modelo de pyomo
+    :param datos: Datos técnicos de los equipos de climatización
+    :param tipo: Tipo de aerotermia
+    :param gap: Gap relativo de parada, igual para todos los modelos para que los costes sean comparables
+    """
+    configuracion = configuracion_solver(datos, tipo)
+    configuracion['gap'] = gap
+    inicio = time.perf_counter()
+    crear_solver(configuracion).solve(model, **argumentos_solve(configuracion))
+    return time.perf_counter() - inicio
+
+
+def main():
+    """Compara el modelo completo con el de días representativos para distintos números de días"""
+    parser = argparse.ArgumentParser(description="Días representativos en el modelo de aerotermia")
+    parser.add_argument('--horas', type=int, default=8760, help="Horas de la serie (máximo 8760)")
+    parser.add_argument('--dias', type=int, nargs='+', default=[4, 8, 12, 24], help="Días representativos")
+    parser.add_argument('--tipo', default='Aerotermia de alta', help="Tipo de aerotermia")
+    parser.add_argument('--gap', type=float, default=1e-4, help="Gap relativo de parada de todos los modelos")
+    argumentos = parser.parse_args()
+
+    with open('datos_tecnicos.yaml', "r", encoding="utf-8") as f:
+        datos = yaml.safe_load(f)
+    aguas = 2
+    placas = [60, 60]
+    tipo = argumentos.tipo
+    df, irradiacion = datos_sinteticos(argumentos.horas, aguas)
+    df['precio_luz'] = leer_precios('Datos/Precio_Electrico.csv')[:argumentos.horas]
+    df['precio_gas'] = leer_precios('Datos/Precio_Gas.csv')[:argumentos.horas]
+
+    inicio = time.perf_counter()
+    completo = modelo_aerotermia(tipo, df, irradiacion, placas, aguas, 0, datos)
+    t_completo = time.perf_counter() - inicio + resolver_medido(completo, datos, tipo, argumentos.gap)
+    coste = pyo.value(completo.OBJ)
+    print(f"Modelo completo: {len(df)} h, {t_completo:.2f} s, coste {coste:.2f} €, "
+          f"potencia {pyo.value(completo.p_bdc) / 1000:.2f} kW, depósito {pyo.value(completo.v_dep):.2f} L")
+
+    print(f"{'Días':>6}{'Tiempo [s]':>12}{'Aceleración':>13}{'Coste [€]':>12}{'Error [%]':>11}"
+          f"{'Con despacho [s]':>18}{'Coste [€]':>12}{'Error [%]':>11}{'Potencia [kW]':>15}")
+    for n_dias in argumentos.dias:
+        inicio = time.perf_counter()
+        agrupacion = agrupar_dias(df, irradiacion, n_dias)
+        df_dias, irradiacion_dias = datos_agrupados(df, irradiacion, agrupacion)
+        reducido = modelo_aerotermia(tipo, df_dias, irradiacion_dias, placas, aguas, 0, datos,
+                                     pesos=agrupacion['pesos'], secuencia=agrupacion['asignacion'])
+        t_reducido = time.perf_counter() - inicio + resolver_medido(reducido, datos, tipo, argumentos.gap)
+        coste_reducido = pyo.value(reducido.OBJ)
+
+        inicio = time.perf_counter()
+        despacho = modelo_aerotermia(tipo, df, irradiacion, placas, aguas, 0, datos)
+        fijar_equipos(despacho, {'p_bdc': pyo.value(reducido.p_bdc), 'v_dep': pyo.value(reducido.v_dep),
+                                 'n_ps': valores_enteros(reducido.n_ps)})
+        t_despacho = t_reducido + time.perf_counter() - inicio + resolver_medido(despacho, datos, tipo, argumentos.gap)
+        coste_despacho = pyo.value(despacho.OBJ)
+
+        print(f"{n_dias:>6}{t_reducido:>12.2f}{t_completo / t_reducido:>12.1f}x{coste_reducido:>12.2f}"
+              f"{100 * (coste_reducido - coste) / coste:>11.2f}{t_despacho:>18.2f}{coste_despacho:>12.2f}"
+              f"{100 * (coste_despacho - coste) / coste:>11.2f}"
+              f"{pyo.value(reducido.p_bdc) / 1000:>8.2f}→{pyo.value(despacho.p_bdc) / 1000:.2f}")
+
+
+if __name__ == '__main__':
+    main()
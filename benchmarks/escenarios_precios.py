@@ -0,0 +1,100 @@
+"""Tiempo de N escenarios de precios consecutivos con modelos conservados en memoria frente a N cálculos en frío
+
+En frío cada escenario construye el modelo y lo resuelve desde cero. Con modelos vivos (ver
+optimizador.sistemas.modelos_vivos) el primer escenario construye el modelo y los siguientes solo cambian
+los parámetros de precio y el solver parte de la solución anterior. Los precios de cada escenario son los de
+Datos/ multiplicados por un factor aleatorio en cada hora; las cargas, la temperatura exterior y la irradiación
+son sintéticas. La reutilización completa (modelo cargado en el solver y arranque en caliente) solo la tienen
+los solvers appsi_*; con los solvers externos solo se ahorra la construcción del modelo.
+
+Uso: python -m benchmarks.escenarios_precios [--horas 8760] [--escenarios 10] [--solver appsi_highs]
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+
+import numpy as np
+import yaml
+
+from benchmarks.datos_sinteticos import datos_sinteticos
+from optimizador.entradas import leer_precios
+from optimizador.sistemas.estudio_aerotermia import actualizar_aerotermia, modelo_aerotermia
+from optimizador.sistemas.estudio_aire_acondicionado import actualizar_aire_acondicionado, modelo_aire_acondicionado
+from optimizador.sistemas.modelos_vivos import resolver_modelo_vivo, vaciar_modelos_vivos
+
+
+def escenarios(horas, n, semilla=0):
+    """Dataframes con las mismas cargas y distintos precios eléctricos
+
+    :param horas: Número de horas de la serie
+    :param n: Número de escenarios
+    :param semilla: Semilla de los factores aleatorios
+    """
+    df, irradiacion = datos_sinteticos(horas, 2)
+    precio = leer_precios('Datos/Precio_Electrico.csv')[:horas]
+    rng = np.random.default_rng(semilla)
+    lista = []
+    for _ in range(n):
+        escenario = df.copy()
+        escenario['precio_luz'] = precio * rng.uniform(0.7, 1.3, horas)
+        lista.append(escenario)
+    return lista, irradiacion.to_numpy()
+
+
+def calcular(modelos, sistema, construir, actualizar, datos, lista):
+    """Resuelve todos los escenarios y devuelve el tiempo total y el objetivo de cada uno
+
+    :param modelos: Número de modelos vivos (0 para calcular en frío)
+    :param sistema: Sistema del modelo
+    :param construir: Función que recibe el escenario y mutable y construye el modelo
+    :param actualizar: Función que recibe el modelo y el escenario y cambia sus parámetros
+    :param datos: Datos técnicos de los equipos de climatización
+    :param lista: Dataframes de los escenarios
+    """
+    os.environ['MODELOS_VIVOS'] = str(modelos)
+    vaciar_modelos_vivos()
+    objetivos = []
+    inicio = time.perf_counter()
+    for df in lista:
+        with contextlib.redirect_stdout(io.StringIO()):
+            model = resolver_modelo_vivo(('benchmark', sistema), lambda mutable, df=df: construir(df, mutable),
+                                         lambda m, df=df: actualizar(m, df), datos, sistema)
+        objetivos.append(model.OBJ())
+    return time.perf_counter() - inicio, np.array(objetivos)
+
+
+def main():
+    """Compara los escenarios resueltos en frío con los resueltos sobre el modelo conservado"""
+    parser = argparse.ArgumentParser(description="Escenarios de precios con modelos conservados en memoria")
+    parser.add_argument('--horas', type=int, default=8760, help="Horas de la serie (máximo 8760)")
+    parser.add_argument('--escenarios', type=int, default=10, help="Número de escenarios de precios")
+    parser.add_argument('--solver', default='appsi_highs', help="Solver de todos los modelos")
+    argumentos = parser.parse_args()
+
+    with open('datos_tecnicos.yaml', "r", encoding="utf-8") as f:
+        datos = yaml.safe_load(f)
+    datos['Solver'] = {**(datos.get('Solver') or {}), 'nombre': argumentos.solver}
+    lista, irradiacion = escenarios(argumentos.horas, argumentos.escenarios)
+    placas = [60, 60]
+    sistemas = {
+        'Aire acondicionado': (
+            lambda df, mutable: modelo_aire_acondicionado(df, irradiacion, placas, [0, 0], 2, 0, datos, mutable),
+            lambda model, df: actualizar_aire_acondicionado(model, df, irradiacion)),
+        'Aerotermia de alta': (
+            lambda df, mutable: modelo_aerotermia('Aerotermia de alta', df, irradiacion, placas, 2, 0, datos,
+                                                  mutable=mutable),
+            lambda model, df: actualizar_aerotermia(model, df, irradiacion)),
+    }
+
+    print(f"{'Sistema':<22}{'En frío [s]':>13}{'Vivo [s]':>11}{'Aceleración':>13}{'Diferencia máx. [€]':>21}")
+    for sistema, (construir, actualizar) in sistemas.items():
+        t_frio, frio = calcular(0, sistema, construir, actualizar, datos, lista)
+        t_vivo, vivo = calcular(1, sistema, construir, actualizar, datos, lista)
+        print(f"{sistema:<22}{t_frio:>13.2f}{t_vivo:>11.2f}{t_frio / t_vivo:>12.1f}x"
+              f"{np.abs(frio - vivo).max():>21.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""Tiempo de cada etapa del cálculo de cada sistema, con línea base en JSON para detectar regresiones
+
+Cada caso es una llamada a calculo_sistema (sin la caché de resultados) con las mismas combinaciones que
+seleccion_sistema, incluidas las de refrigeración. Las series horarias son sintéticas de 8760 horas y se leen de
+archivos .csv temporales. El tiempo se reparte en etapas con los avisos de optimizador.progreso:
+    datos         lectura de los archivos y parametros_horarios
+    construccion  construcción del modelo de pyomo (o actualización del modelo vivo) y creación del solver
+    solver        tiempo de reloj del solver
+    solucion      lectura de la solución del modelo, o cálculo de la solución analítica
+    csv           tabla de resultados horarios y escritura del .csv
+    graficas      dibujo y guardado de las gráficas
+Por defecto se usa appsi_highs, que se instala con pip y no necesita programas externos.
+
+Con --json los resultados (mediana de las repeticiones de cada etapa) se guardan en un archivo que sirve de
+línea base; con --base se comparan con una línea base anterior y el script termina con código 1 si alguna
+etapa es más lenta que la base por encima del umbral.
+
+Uso: python -m benchmarks.etapas [--horas 8760] [--repeticiones 3] [--solver appsi_highs] [--casos Gas "Gas+frio"]
+        [--json benchmarks/base_etapas.json] [--base benchmarks/base_etapas.json] [--umbral 1.25]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.series_binarias import crear_archivos
+from optimizador.configuracion import cargar_configuracion, variar_configuracion
+from optimizador.entradas import leer_cargas, leer_irradiacion, leer_precios, leer_temperatura
+from optimizador.parametros_horarios import parametros_horarios
+from optimizador.progreso import registrar
+from optimizador.sistemas import calculo_sistema
+
+ETAPAS = ('datos', 'construccion', 'solver', 'solucion', 'csv', 'graficas')
+# Caso: (sistema nuevo, refrigeración). '+frio' indica la combinación con aire acondicionado para refrigerar
+CASOS = {'Gas': ('Gas', False),
+         'Aerotermia de alta': ('Aerotermia de alta', False),
+         'Aerotermia de baja': ('Aerotermia de baja', False),
+         'Aire acondicionado': ('Aire acondicionado', True),
+         'Gas+frio': ('Gas', True),
+         'Aerotermia de alta+frio': ('Aerotermia de alta', True)}
+# Comienzo del aviso de progreso que cierra cada etapa
+FIN_ETAPA = (('Datos horarios preparados', 'datos'), ('Modelo', 'construccion'), ('Resolviendo', 'construccion'),
+             ('Solución', 'solucion'), ('Resultados', 'csv'), ('Gráficas', 'graficas'))
+
+
+class Cronometro:
+    """Reparte el tiempo transcurrido entre las etapas según los avisos de progreso"""
+
+    def __init__(self):
+        self.tiempos = dict.fromkeys(ETAPAS, 0.0)
+        self.anterior = time.perf_counter()
+
+    def aviso(self, etapa, detalle=""):
+        """Destino de optimizador.progreso: suma el tiempo desde el aviso anterior a la etapa que termina
+
+        :param etapa: Etapa del aviso
+        :param detalle: Detalle del aviso. Los avisos del gap durante la resolución no cierran ninguna etapa
+        """
+        if detalle.startswith('gap'):
+            return
+        if etapa.startswith('Modelo') and etapa.endswith('resuelto'):
+            cerrada = 'solver'
+        else:
+            cerrada = next((nombre for inicio, nombre in FIN_ETAPA if etapa.startswith(inicio)), None)
+        if cerrada is None:
+            return
+        ahora = time.perf_counter()
+        self.tiempos[cerrada] += ahora - self.anterior
+        self.anterior = ahora
+
+
+def medir_caso(caso, carpeta, configuracion, aguas):
+    """Lee los datos y calcula un caso una vez, devolviendo el tiempo de cada etapa
+
+    :param caso: Nombre del caso en CASOS
+    :param carpeta: Carpeta temporal con los archivos .csv de las series
+    :param configuracion: Configuración con el solver de la prueba
+    :param aguas: Numero de aguas del tejado
+    """
+    nuevo, refri = CASOS[caso]
+    destino = tempfile.mkdtemp(dir=carpeta)
+
+    def ruta(nombre):
+        return os.path.join(carpeta, 'csv', f'{nombre}.csv')
+
+    cronometro = Cronometro()
+    registrar(cronometro.aviso)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            irradiacion = leer_irradiacion(ruta('irradiacion'))
+            df = parametros_horarios(leer_precios(ruta('Precio_Electrico')), leer_precios(ruta('Precio_Gas')),
+                                     leer_cargas(ruta('cargas')), refri, leer_temperatura(ruta('T_exterior')))
+            resultado = calculo_sistema(nuevo, df, irradiacion, [60] * aguas, aguas, 'Gas', refri, destino,
+                                        configuracion)
+    finally:
+        registrar(None)
+    if not isinstance(resultado, dict):
+        raise RuntimeError(f"{caso}: {resultado}")
+    return {**cronometro.tiempos, 'total': sum(cronometro.tiempos.values())}
+
+
+def comparar(resultados, base, umbral):
+    """Cociente entre cada etapa y la línea base y lista de las etapas más lentas que el umbral
+
+    :param resultados: Resultados de esta ejecución
+    :param base: Resultados de la línea base
+    :param umbral: Cociente a partir del cual una etapa se considera más lenta
+    """
+    regresiones = []
+    print(f"\nComparación con la línea base del {base['fecha']} ({base['solver']}, {base['horas']} horas)")
+    print(f"{'caso':<24}" + "".join(f"{etapa:>13}" for etapa in (*ETAPAS, 'total')))
+    for caso, tiempos in resultados['casos'].items():
+        if caso not in base['casos']:
+            continue
+        fila = f"{caso:<24}"
+        for etapa in (*ETAPAS, 'total'):
+            anterior = base['casos'][caso].get(etapa, 0.0)
+            if anterior <= 0:
+                fila += f"{'-':>13}"
+                continue
+            cociente = tiempos[etapa] / anterior
+            fila += f"{cociente:>12.2f}x"
+            # Las etapas de menos de 10 ms se comparan pero no cuentan como regresión
+            if cociente > umbral and max(tiempos[etapa], anterior) > 0.01:
+                regresiones.append(f"{caso} / {etapa}: {anterior:.3f} s -> {tiempos[etapa]:.3f} s")
+        print(fila)
+    return regresiones
+
+
+def main():
+    """Mide cada caso, muestra la mediana de cada etapa y la guarda o la compara con una línea base"""
+    parser = argparse.ArgumentParser(description="Tiempo de cada etapa del cálculo de cada sistema")
+    parser.add_argument('--horas', type=int, default=8760, help="Horas de la serie")
+    parser.add_argument('--aguas', type=int, default=2, help="Numero de aguas del tejado")
+    parser.add_argument('--repeticiones', type=int, default=3, help="Repeticiones de cada caso")
+    parser.add_argument('--solver', default='appsi_highs', help="Solver de todos los modelos")
+    parser.add_argument('--casos', nargs='+', default=list(CASOS), choices=list(CASOS), help="Casos medidos")
+    parser.add_argument('--sin-graficas', action='store_true', help="No dibuja las gráficas")
+    parser.add_argument('--json', help="Archivo en el que se guardan los resultados como línea base")
+    parser.add_argument('--base', help="Línea base con la que se comparan los resultados")
+    parser.add_argument('--umbral', type=float, default=1.25, help="Cociente con la base que se considera regresión")
+    argumentos = parser.parse_args()
+
+    os.environ['MPLBACKEND'] = 'Agg'
+    os.environ['GRAFICAS'] = 'no' if argumentos.sin_graficas else 'inmediato'
+    # Cada repetición construye los modelos desde cero
+    os.environ['MODELOS_VIVOS'] = '0'
+    configuracion = variar_configuracion(cargar_configuracion(), {'Solver.nombre': argumentos.solver})
+
+    casos = {}
+    with tempfile.TemporaryDirectory() as carpeta:
+        crear_archivos(carpeta, argumentos.horas, argumentos.aguas)
+        print(f"{argumentos.horas} horas, solver {argumentos.solver}, mediana de {argumentos.repeticiones} "
+              "repeticiones [s]")
+        print(f"{'caso':<24}" + "".join(f"{etapa:>13}" for etapa in (*ETAPAS, 'total')))
+        for caso in argumentos.casos:
+            medidas = [medir_caso(caso, carpeta, configuracion, argumentos.aguas)
+                       for _ in range(argumentos.repeticiones)]
+            casos[caso] = {etapa: float(np.median([m[etapa] for m in medidas])) for etapa in (*ETAPAS, 'total')}
+            print(f"{caso:<24}" + "".join(f"{casos[caso][etapa]:>13.3f}" for etapa in (*ETAPAS, 'total')))
+
+    resultados = {'fecha': datetime.now().isoformat(timespec='seconds'), 'horas': argumentos.horas,
+                  'aguas': argumentos.aguas, 'solver': argumentos.solver, 'repeticiones': argumentos.repeticiones,
+                  'graficas': not argumentos.sin_graficas, 'python': sys.version.split()[0],
+                  'plataforma': platform.platform(), 'casos': casos}
+    if argumentos.json:
+        with open(argumentos.json, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en {argumentos.json}")
+    if argumentos.base:
+        with open(argumentos.base, encoding="utf-8") as f:
+            regresiones = comparar(resultados, json.load(f), argumentos.umbral)
+        for regresion in regresiones:
+            print(f"Más lento que la base: {regresion}")
+        return 1 if regresiones else 0
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,86 @@
+"""Tiempo de la frontera de Pareto de la aerotermia según cómo se resuelven sus puntos
+
+Con datos sintéticos se calcula la frontera entre inversión y coste de operación de un tipo de aerotermia:
+    reconstruido: un modelo nuevo y un solver nuevo en cada punto, sin partir de ninguna solución
+    reutilizado:  un solo modelo en el que cambia el límite de la inversión, con el mismo solver y partiendo
+                  de la solución del punto anterior (frontera_sistemas con un proceso)
+    paralelo:     los puntos intermedios repartidos entre varios procesos (frontera_sistemas)
+Se comprueba también que las tres formas dan los mismos costes.
+
+Uso: python -m benchmarks.frontera_pareto [--horas 720] [--puntos 12] [--procesos 4] [--solver appsi_highs]
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from benchmarks.datos_sinteticos import datos_sinteticos
+from optimizador.configuracion import cargar_configuracion, variar_configuracion
+from optimizador.sistemas.frontera_pareto import (activar_objetivo, coste_sistema, extremos_frontera,
+                                                  frontera_sistemas, modelo_frontera, punto_frontera,
+                                                  solver_sistema)
+from optimizador.sistemas.solver import resolver
+
+
+def reconstruido(tipo, df, irradiacion, c_i, datos, puntos):
+    """Frontera construyendo y resolviendo un modelo nuevo en cada punto"""
+    def nuevo_modelo():
+        return modelo_frontera(tipo, df, irradiacion, [60, 60], 2, c_i, datos)
+
+    extremos = extremos_frontera(nuevo_modelo(), tipo, datos, solver_sistema(datos, tipo))
+    filas = list(extremos)
+    for limite in np.linspace(extremos[2]['inversion'], extremos[1]['inversion'], puntos)[1:-1]:
+        model = nuevo_modelo()
+        activar_objetivo(model, 'OBJ_opex')
+        model.Frontera.activate()
+        model.limite_capex.set_value(float(limite))
+        resolver(model, datos, tipo)
+        filas.append(punto_frontera(model, tipo, datos, float(limite)))
+    return sorted((round(f['inversion'], 2), round(f['coste_operativo'], 2)) for f in filas)
+
+
+def main():
+    """Compara las tres formas de calcular la frontera"""
+    parser = argparse.ArgumentParser(description="Frontera de Pareto de la aerotermia")
+    parser.add_argument('--horas', type=int, default=720, help="Horas de la serie")
+    parser.add_argument('--puntos', type=int, default=12, help="Puntos de la frontera, extremos incluidos")
+    parser.add_argument('--procesos', type=int, default=4, help="Procesos de la versión en paralelo")
+    parser.add_argument('--solver', default='appsi_highs', help="Solver del modelo")
+    parser.add_argument('--tipo', default='Aerotermia de alta', help="Tipo de aerotermia")
+    argumentos = parser.parse_args()
+
+    configuracion = variar_configuracion(cargar_configuracion(), {'Solver.nombre': argumentos.solver})
+    datos = configuracion.datos
+    df, irradiacion = datos_sinteticos(argumentos.horas, 2)
+    tipo = argumentos.tipo
+    c_i = coste_sistema(tipo, 'Gas', False, configuracion)
+
+    def frontera(procesos):
+        tabla = frontera_sistemas(df, irradiacion, [60, 60], 2, 'Gas', False, [tipo], argumentos.puntos, procesos,
+                                  configuracion)
+        return sorted(zip(tabla['inversion'].round(2), tabla['coste_operativo'].round(2)))
+
+    tiempos = {}
+    costes = {}
+    for nombre, funcion in (('reconstruido', lambda: reconstruido(tipo, df, irradiacion, c_i, datos,
+                                                                  argumentos.puntos)),
+                            ('reutilizado', lambda: frontera(1)),
+                            ('paralelo', lambda: frontera(argumentos.procesos))):
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            costes[nombre] = funcion()
+        tiempos[nombre] = time.perf_counter() - inicio
+
+    print(f"{tipo}, {argumentos.horas} horas, {argumentos.puntos} puntos, {argumentos.solver}")
+    for nombre, tiempo in tiempos.items():
+        print(f"{nombre:<14}{tiempo:>8.2f} s{tiempos['reconstruido'] / tiempo:>8.1f}x")
+    referencia = dict(costes['reconstruido'])
+    diferencia = max(abs(coste - referencia.get(inversion, coste)) for nombre in ('reutilizado', 'paralelo')
+                     for inversion, coste in costes[nombre])
+    print(f"Diferencia máxima del coste de operación con la misma inversión: {diferencia:.2f} €")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Tiempo y memoria de la operación de la aerotermia resuelta de una vez y por horizonte rodante
+
+Para cada horizonte se dimensionan los equipos con días representativos y después se resuelve la operación
+con esos equipos de las dos formas. La memoria es el pico de memoria de Python medido con tracemalloc (no
+incluye la memoria interna del solver). Los precios de Datos/ se repiten en cada año; las cargas, la
+temperatura exterior y la irradiación son sintéticas. Con un paso menor de 60 minutos cada hora se repite en
+todos los pasos de la hora.
+
+Uso: python -m benchmarks.horizonte_rodante [--anios 1 2 4] [--paso 60] [--ventana 168] [--solape 24]
+"""
+import argparse
+import contextlib
+import io
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from benchmarks.datos_sinteticos import datos_sinteticos
+from optimizador.entradas import leer_precios
+from optimizador.serie_temporal import ajustar_serie, repeticiones_hora
+from optimizador.sistemas.dias_representativos import agrupar_dias, datos_agrupados
+from optimizador.sistemas.estudio_aerotermia import (despacho_horizonte_rodante, fijar_equipos, modelo_aerotermia,
+                                                     solucion_modelo)
+from optimizador.sistemas.solver import resolver
+
+
+def medir(funcion):
+    """Ejecuta la función sin mostrar la salida del solver
+
+    :param funcion: Función sin argumentos
+    :return: Resultado, tiempo en segundos y pico de memoria en MB
+    """
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultado = funcion()
+    tiempo = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+    tracemalloc.stop()
+    return resultado, tiempo, pico
+
+
+def main():
+    """Compara la operación monolítica con la de horizonte rodante para varios horizontes"""
+    parser = argparse.ArgumentParser(description="Horizonte rodante en la operación de la aerotermia")
+    parser.add_argument('--anios', type=int, nargs='+', default=[1, 2, 4], help="Años del horizonte")
+    parser.add_argument('--paso', type=int, default=60, help="Paso de la serie en minutos")
+    parser.add_argument('--ventana', type=int, default=168, help="Horas conservadas de cada ventana")
+    parser.add_argument('--solape', type=int, default=24, help="Horas de solape entre ventanas")
+    parser.add_argument('--tipo', default='Aerotermia de alta', help="Tipo de aerotermia")
+    argumentos = parser.parse_args()
+
+    with open('datos_tecnicos.yaml', "r", encoding="utf-8") as f:
+        datos = yaml.safe_load(f)
+    aguas = 2
+    placas = [60, 60]
+    tipo = argumentos.tipo
+    consigna = datos[tipo]['temperatura']
+
+    print(f"{'Filas':>8}{'Monolítico [s]':>16}{'Memoria [MB]':>14}{'Coste [€]':>12}"
+          f"{'Rodante [s]':>13}{'Memoria [MB]':>14}{'Coste [€]':>12}")
+    for anios in argumentos.anios:
+        horas = anios * 8760
+        df, irradiacion = datos_sinteticos(horas, aguas)
+        df['precio_luz'] = np.resize(leer_precios('Datos/Precio_Electrico.csv'), horas)
+        df['precio_gas'] = np.resize(leer_precios('Datos/Precio_Gas.csv'), horas)
+        irradiacion = irradiacion.to_numpy()
+        repeticiones = repeticiones_hora(argumentos.paso)
+        if repeticiones > 1:
+            df = pd.DataFrame({c: ajustar_serie(df[c].to_numpy(), horas * repeticiones, repeticiones)
+                               for c in df.columns},
+                              index=pd.date_range(df.index[0], freq=f'{argumentos.paso}min',
+                                                  periods=horas * repeticiones))
+            irradiacion = ajustar_serie(irradiacion, horas * repeticiones, repeticiones)
+        df.attrs.update(paso=argumentos.paso / 60 if repeticiones > 1 else 1.0, anios=anios)
+
+        agrupacion = agrupar_dias(df, irradiacion, 12)
+        df_dias, irradiacion_dias = datos_agrupados(df, irradiacion, agrupacion)
+        reducido = modelo_aerotermia(tipo, df_dias, irradiacion_dias, placas, aguas, 0, datos,
+                                     pesos=agrupacion['pesos'], secuencia=agrupacion['asignacion'])
+        medir(lambda: resolver(reducido, datos, tipo))
+        equipos = solucion_modelo(reducido, consigna)
+
+        def monolitico():
+            model = modelo_aerotermia(tipo, df, irradiacion, placas, aguas, 0, datos)
+            fijar_equipos(model, equipos)
+            resolver(model, datos, tipo)
+            return solucion_modelo(model, consigna)
+
+        def rodante():
+            return despacho_horizonte_rodante(tipo, df, irradiacion, placas, aguas, 0, datos, equipos,
+                                              argumentos.ventana, argumentos.solape)
+
+        completa, t_completa, m_completa = medir(monolitico)
+        ventanas, t_ventanas, m_ventanas = medir(rodante)
+        print(f"{len(df):>8}{t_completa:>16.2f}{m_completa:>14.1f}{completa['opex'] + completa['capex']:>12.2f}"
+              f"{t_ventanas:>13.2f}{m_ventanas:>14.1f}{ventanas['opex'] + ventanas['capex']:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
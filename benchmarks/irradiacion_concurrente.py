@@ -0,0 +1,61 @@
+"""Tiempo de descarga de la irradiación de un tejado de 4 aguas en serie y en paralelo
+
+Se levanta un servidor HTTP local que imita la API de PVGIS con una latencia fija, y cada medida usa una
+caché vacía para que todas las caras se descarguen.
+
+Uso: python -m benchmarks.irradiacion_concurrente
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from optimizador.irradiacion import calculo_irradiacion
+
+LATENCIA = 1.0  # Segundos que tarda el servidor simulado en responder
+
+
+class ServidorPVGIS(BaseHTTPRequestHandler):
+    """Servidor que devuelve una serie horaria sintética con el formato de PVGIS"""
+
+    def do_GET(self):  # pylint: disable=C0103
+        """Responde a una consulta seriescalc"""
+        azimut = float(parse_qs(urlparse(self.path).query)['aspect'][0])
+        time.sleep(LATENCIA)
+        horario = [{"time": f"2023{h:05d}", "P": 0.0, "Gb(i)": max(0.0, 500 - abs(h % 24 - 12) * 60) + azimut / 10,
+                    "Gd(i)": 50.0, "Gr(i)": 2.0, "H_sun": 0.0, "T2m": 12.0, "WS10m": 2.0, "Int": 0.0}
+                   for h in range(8760)]
+        cuerpo = json.dumps({"outputs": {"hourly": horario}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, format, *args):  # pylint: disable=W0622
+        """Silencia el registro de peticiones"""
+
+
+def main():
+    """Mide la descarga de las 4 caras con una y con cuatro conexiones simultáneas"""
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), ServidorPVGIS)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    os.environ["PVGIS_URL"] = f"http://127.0.0.1:{servidor.server_address[1]}/api/seriescalc"
+    tiempos = {}
+    for concurrencia in (1, 4):
+        with tempfile.TemporaryDirectory() as carpeta:
+            os.environ["CACHE_PVGIS"] = carpeta
+            inicio = time.perf_counter()
+            calculo_irradiacion(40, -3, 0, 4, concurrencia=concurrencia)
+            tiempos[concurrencia] = time.perf_counter() - inicio
+            print(f"Concurrencia {concurrencia}: {tiempos[concurrencia]:.2f} s")
+    print(f"Aceleración: {tiempos[1] / tiempos[4]:.1f}x")
+    servidor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""Construcción de los modelos horarios tal como estaba antes de la versión vectorizada
+
+Cada restricción se genera con una regla de pyomo por hora y los parámetros se inicializan con diccionarios,
+igual que en calculo_gas, calculo_aerotermia y calculo_aire_acondicionado originales. Solo se construyen los
+modelos, sin resolverlos, para medir en benchmarks.construccion_modelos la diferencia con la versión actual.
+"""
+import math
+
+import numpy as np
+import pyomo.environ as pyo
+
+
+def modelo_gas_original(df, c_i, datos):
+    """Modelo del gas construido con una regla por hora
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param c_i: Coste invariable de la instalación sin tener en cuenta el precio de la caldera de gas
+    :param datos: Datos técnicos de los equipos de climatización
+    """
+    horas = len(df)
+    cargas = df["cargas"].to_numpy()
+    precio = df["precio_gas"].to_numpy()
+    ef = datos['Gas']['eficiencia']
+
+    model = pyo.ConcreteModel()
+    model.H = pyo.RangeSet(0, horas - 1)
+    model.q_ct = pyo.Param(model.H, initialize={h: float(cargas[h]) for h in model.H})
+    model.precio = pyo.Param(model.H, initialize={h: float(precio[h]) for h in model.H})
+    model.q_cg = pyo.Var(model.H, domain=pyo.NonNegativeReals)
+    model.p_gas = pyo.Var(bounds=(0, np.inf))
+
+    def p_maxima(m, h):
+        return m.q_cg[h] <= m.p_gas
+    model.p_max = pyo.Constraint(model.H, rule=p_maxima)
+
+    def balance_rule(m, h):
+        return m.q_cg[h] * ef == m.q_ct[h]
+    model.Balance = pyo.Constraint(model.H, rule=balance_rule)
+
+    def coste_operativo(m):
+        return sum(m.q_cg[h] * m.precio[h] for h in m.H)
+    model.opex = pyo.Expression(rule=coste_operativo)
+    model.c_cg = pyo.Expression(expr=0.05968 * model.p_gas)
+    model.capex = pyo.Expression(expr=model.c_cg + c_i)
+    model.OBJ = pyo.Objective(expr=model.opex + model.capex / datos['Gas']['Ciclo de vida'], sense=pyo.minimize)
+    return model
+
+
+def modelo_aerotermia_original(tipo, df, irradiacion, placas, aguas, c_i, datos):
+    """Modelo de la aerotermia construido con una regla por hora
+
+    :param tipo: Módelo de aerotermia seleccionado
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param placas: Área disponible para las placas solares en cada agua del tejado
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param c_i: Coste invariable de la instalacion del nuevo sistema de climatización
+    :param datos: Datos técnicos de los equipos de climatización
+    """
+    horas = len(df)
+    area_tejado = np.array(placas) / (1.909 * 1.134)
+    cargas = df["cargas"].to_numpy()
+    precio = df["precio_luz"].to_numpy()
+    t_ext = df['T_exterior'].to_numpy()
+    climatizacion = df['climatizacion'].to_numpy()
+    irradiacion = np.array(irradiacion)
+
+    model = pyo.ConcreteModel()
+    model.H = pyo.RangeSet(1, horas - 1)
+    model.J = pyo.RangeSet(0, aguas - 1)
+    model.q_ct = pyo.Param(model.H, initialize={h: float(cargas[h]) for h in model.H})
+    model.t_ext = pyo.Param(model.H, initialize={h: float(t_ext[h]) for h in model.H})
+    model.climatizacion = pyo.Param(model.H, initialize={h: str(climatizacion[h]) for h in model.H}, within=pyo.Any)
+    model.precio = pyo.Param(model.H, initialize={h: float(precio[h]) for h in model.H})
+    model.g = pyo.Param(model.H, model.J,
+                        initialize={(h, j): float(irradiacion[h][j]) for h in model.H for j in model.J})
+
+    ef = datos["Deposito"]["eficiencia"]
+    cop = float(datos[tipo]["cop"])
+    err = float(datos[tipo]["err"])
+    model.p_bdc = pyo.Var(bounds=(0, datos["Bomba de calor"]["Limite"]))
+    model.v_dep = pyo.Var(bounds=(0, datos['Deposito']['Limite']))
+    model.e_red = pyo.Var(model.H, bounds=(0, datos["Bomba de calor"]["Limite"]))
+    model.e_ps = pyo.Var(model.H, bounds=(0, datos["Bomba de calor"]["Limite"]))
+    model.t_int = pyo.Var(model.H, bounds=(5, 85))
+    model.n_ps = pyo.Var(model.J, within=pyo.NonNegativeIntegers, bounds=lambda m, j: (0, int(area_tejado[j])))
+    model.t_int_prev = pyo.Param(initialize=datos[tipo]['temperatura'])
+
+    def solar_rule(m, h):
+        return m.e_ps[h] <= sum(m.g[h, j] * m.n_ps[j] for j in m.J) * datos['Placas solares']['eficiencia']
+    model.SolarLimit = pyo.Constraint(model.H, rule=solar_rule)
+
+    def p_maxima(m, h):
+        if m.climatizacion[h] == 'Calefaccion':
+            return (m.e_ps[h] + m.e_red[h]) * cop <= m.p_bdc
+        return (m.e_ps[h] + m.e_red[h]) * err <= m.p_bdc
+    model.p_max = pyo.Constraint(model.H, rule=p_maxima)
+
+    def balance_rule(m, h):
+        if h == 1:
+            return ((m.e_red[h] + m.e_ps[h]) * cop - m.q_ct[h] - m.v_dep * ef * (m.t_int[h] - m.t_ext[h]) ==
+                    m.v_dep * 1.136888 * (m.t_int[h] - m.t_int_prev))
+        if m.climatizacion[h] == 'Calefaccion':
+            return ((m.e_red[h] + m.e_ps[h]) * cop - m.q_ct[h] - m.v_dep * ef * (m.t_int[h] - m.t_ext[h]) ==
+                    m.v_dep * 1.136888 * (m.t_int[h] - m.t_int[h-1]))
+        return ((m.e_red[h] + m.e_ps[h]) * err * -1 - m.q_ct[h] - m.v_dep * ef * (m.t_int[h] - m.t_ext[h]) ==
+                m.v_dep * 1.136888 * (m.t_int[h] - m.t_int[h-1]))
+    model.Balance = pyo.Constraint(model.H, rule=balance_rule)
+
+    def temp_lim(m, h):
+        if m.climatizacion[h] == 'Calefaccion':
+            return m.t_int[h] >= datos[tipo]['temperatura']
+        return m.t_int[h] <= 7.0
+    model.temp = pyo.Constraint(model.H, rule=temp_lim)
+
+    def coste_operativo(m):
+        return sum(m.e_red[h] * m.precio[h] for h in m.H)
+    model.opex = pyo.Expression(rule=coste_operativo)
+    model.c_bdc = pyo.Expression(expr=0.35849 * model.p_bdc)
+    model.c_dep = pyo.Expression(expr=4.08 * model.v_dep)
+    model.c_ps = pyo.Expression(expr=311 * sum(model.n_ps[j] for j in model.J))
+    model.capex = pyo.Expression(expr=model.c_bdc + model.c_dep + model.c_ps + c_i)
+    model.OBJ = pyo.Objective(expr=model.opex + model.capex / datos['Bomba de calor']['Ciclo de vida'],
+                              sense=pyo.minimize)
+    return model
+
+
+def modelo_aire_acondicionado_original(df, irradiacion, area, n_ps, aguas, c_i, datos):
+    """Modelo del aire acondicionado construido con una regla por hora
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param area: Área disponible para las placas solares en cada agua del tejado
+    :param n_ps: Número de placas fijado en cada agua, o ceros para dimensionarlas
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param c_i: Coste invariable de la instalacion del nuevo sistema de climatización
+    :param datos: Datos técnicos de los equipos de climatización
+    """
+    horas = len(df)
+    area_tejado = np.array(area) / (1.909 * 1.134)
+    cargas = df["cargas"].to_numpy()
+    precio = df["precio_luz"].to_numpy()
+    climatizacion = df['climatizacion'].to_numpy()
+    irradiacion = np.array(irradiacion)
+
+    model = pyo.ConcreteModel()
+    model.H = pyo.RangeSet(0, horas - 1)
+    model.J = pyo.RangeSet(0, aguas - 1)
+    model.q_ct = pyo.Param(model.H, initialize={h: float(cargas[h]) for h in model.H})
+    model.climatizacion = pyo.Param(model.H, initialize={h: str(climatizacion[h]) for h in model.H}, within=pyo.Any)
+    model.precio = pyo.Param(model.H, initialize={h: float(precio[h]) for h in model.H})
+    model.g = pyo.Param(model.H, model.J,
+                        initialize={(h, j): float(irradiacion[h][j]) for h in model.H for j in model.J})
+    cop = float(datos['Aire acondicionado']["cop"])
+    err = float(datos['Aire acondicionado']["err"])
+    model.p_bdc = pyo.Var(bounds=(0, datos["Bomba de calor"]["Limite"]))
+    model.e_red = pyo.Var(model.H, domain=pyo.NonNegativeReals)
+    model.vertido_ps = pyo.Var(model.H, domain=pyo.NonNegativeReals)
+    if sum(n_ps[j] for j in model.J) > 0:
+        model.e_ps = pyo.Param(
+            model.H,
+            initialize={h: float(sum(irradiacion[h, j] * n_ps[j] * datos['Placas solares']['eficiencia']
+                                     for j in model.J)) for h in model.H}
+        )
+        model.n_ps = pyo.Param(model.J, initialize={j: float(n_ps[j]) for j in model.J})
+    else:
+        model.e_ps = pyo.Var(model.H, domain=pyo.NonNegativeReals)
+        model.n_ps = pyo.Var(model.J, within=pyo.NonNegativeIntegers,
+                             bounds=lambda m, j: (0, int(area_tejado[j])))
+
+        def solar_rule(m, h):
+            return m.e_ps[h] <= sum(m.g[h, j] * m.n_ps[j] for j in m.J) * 0.2225
+        model.SolarLimit = pyo.Constraint(model.H, rule=solar_rule)
+
+    def p_maxima(m, h):
+        if m.climatizacion[h] == 'Calefaccion':
+            return (m.e_ps[h] + m.e_red[h] - m.vertido_ps[h]) * cop <= m.p_bdc
+        return (m.e_ps[h] + m.e_red[h] - m.vertido_ps[h]) * err <= m.p_bdc
+    model.p_max = pyo.Constraint(model.H, rule=p_maxima)
+
+    def balance_rule(m, h):
+        if m.climatizacion[h] == 'Calefaccion':
+            return (m.e_red[h] + m.e_ps[h] - m.vertido_ps[h]) * cop == m.q_ct[h]
+        return (m.e_red[h] + m.e_ps[h] - m.vertido_ps[h]) * err * -1 == m.q_ct[h]
+    model.Balance = pyo.Constraint(model.H, rule=balance_rule)
+
+    def coste_operativo(m):
+        return sum(m.e_red[h] * m.precio[h] for h in m.H)
+    model.opex = pyo.Expression(rule=coste_operativo)
+    model.n_bdc = pyo.Expression(expr=math.ceil(
+        datos['Aire acondicionado']['habitaciones'] / datos['Aire acondicionado']['split']))
+    model.c_bdc = pyo.Expression(expr=0.24778 * model.p_bdc)
+    model.Coste_ud_interior = pyo.Expression(
+        expr=datos['Aire acondicionado']['habitaciones'] * datos['Aire acondicionado']['precio Ud. Interior'])
+    model.c_ps = pyo.Expression(expr=311 * sum(model.n_ps[j] for j in model.J))
+    model.capex = pyo.Expression(expr=model.c_bdc + model.Coste_ud_interior + model.c_ps + c_i)
+    model.OBJ = pyo.Objective(expr=model.opex + model.capex / datos['Bomba de calor']['Ciclo de vida'],
+                              sense=pyo.minimize)
+    return model
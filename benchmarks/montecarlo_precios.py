@@ -0,0 +1,76 @@
+"""Tiempo de evaluación de trayectorias de precios con productos de matrices frente a un bucle por trayectoria
+
+Los sistemas de gas y de aire acondicionado se dimensionan una vez con datos sintéticos (solución analítica,
+sin solver) y su coste total anual se evalúa en trayectorias de precios generadas por bootstrap de los precios
+de partida (ver optimizador.escenarios):
+    bucle:    un producto escalar por trayectoria y sistema
+    matrices: evaluar_trayectorias, dos productos de matrices por lote de trayectorias
+También se da el tiempo total de costes_escenarios, que incluye la generación de las trayectorias.
+
+Uso: python -m benchmarks.montecarlo_precios [--horas 8760] [--escenarios 5000] [--lote 500]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.datos_sinteticos import datos_sinteticos
+from optimizador.configuracion import cargar_configuracion
+from optimizador.escenarios import (consumos_sistema, costes_escenarios, evaluar_trayectorias, opciones_escenarios,
+                                    trayectorias_precios)
+
+SISTEMAS = ('Gas', 'Aire acondicionado')
+
+
+def evaluar_bucle(consumos, precios_luz, precios_gas):
+    """Coste de cada sistema en cada trayectoria con un producto escalar por trayectoria y sistema
+
+    :param consumos: Diccionario {sistema: resultado de consumos_sistema}
+    :param precios_luz: Matriz escenarios x horas de precios eléctricos
+    :param precios_gas: Matriz escenarios x horas de precios del gas
+    """
+    costes = np.empty((len(precios_luz), len(consumos)))
+    for i, (luz, gas) in enumerate(zip(precios_luz, precios_gas)):
+        for k, consumo in enumerate(consumos.values()):
+            costes[i, k] = luz @ consumo['luz'] + gas @ consumo['gas'] + consumo['anualidad']
+    return costes
+
+
+def main():
+    """Compara las dos evaluaciones sobre las mismas trayectorias y mide la evaluación completa por lotes"""
+    parser = argparse.ArgumentParser(description="Evaluación de trayectorias de precios por lotes")
+    parser.add_argument('--horas', type=int, default=8760, help="Horas de la serie")
+    parser.add_argument('--escenarios', type=int, default=5000, help="Número de trayectorias")
+    parser.add_argument('--lote', type=int, default=500, help="Trayectorias de cada producto de matrices")
+    argumentos = parser.parse_args()
+
+    configuracion = cargar_configuracion()
+    df, irradiacion = datos_sinteticos(argumentos.horas, 2)
+    consumos = {nuevo: consumos_sistema(nuevo, df, irradiacion, [0, 0], 2, 'Gas', True, configuracion)
+                for nuevo in SISTEMAS}
+    opciones = {**opciones_escenarios(configuracion.datos), 'lote': argumentos.lote}
+    precio_luz = df['precio_luz'].to_numpy()
+    precio_gas = df['precio_gas'].to_numpy()
+
+    precios = trayectorias_precios(precio_luz, precio_gas, argumentos.lote, np.random.default_rng(0), opciones)
+    inicio = time.perf_counter()
+    bucle = evaluar_bucle(consumos, *precios)
+    t_bucle = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    matrices = evaluar_trayectorias(consumos, *precios)
+    t_matrices = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    costes_escenarios(consumos, precio_luz, precio_gas, opciones, argumentos.escenarios)
+    t_total = time.perf_counter() - inicio
+
+    print(f"{argumentos.horas} horas, {len(SISTEMAS)} sistemas")
+    print(f"{'Evaluación':<36}{'Tiempo [ms]':>13}")
+    print(f"{f'bucle ({argumentos.lote} trayectorias)':<36}{1000 * t_bucle:>13.1f}")
+    print(f"{f'matrices ({argumentos.lote} trayectorias)':<36}{1000 * t_matrices:>13.1f}")
+    print(f"{f'costes_escenarios ({argumentos.escenarios})':<36}{1000 * t_total:>13.1f}")
+    print(f"Aceleración de la evaluación: {t_bucle / t_matrices:.1f}x. "
+          f"Diferencia máxima: {np.abs(bucle - matrices).max():.2e} €")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Tiempo y coste de la aerotermia de alta con refrigeración resuelta en dos pasos o en un solo modelo
+
+Con datos sintéticos de calefacción y refrigeración se compara:
+    dos pasos: la aerotermia en las horas de calefacción y después el aire acondicionado en las de refrigeración
+               con las placas de la aerotermia fijadas, como antes de estudio_conjunto
+    conjunto:  aerotermia, aire acondicionado y placas compartidas en un solo modelo (optimizar_conjunto)
+Los dos usan la irradiación de las horas de cada temporada y cuentan las placas una sola vez; la inversión con
+las placas contadas dos veces, como la sumaba antes calculo_sistema, se muestra aparte.
+
+Con --precio-placas y --escala-refrigeracion se puede encarecer las placas y aumentar las cargas de
+refrigeración, los casos en los que las placas que convienen a la calefacción sola no son las mejores.
+
+Uso: python -m benchmarks.refrigeracion_conjunta [--horas 8760] [--precio-placas 600] [--escala-refrigeracion 3]
+    [--solver appsi_highs]
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from benchmarks.datos_sinteticos import datos_sinteticos
+from optimizador.configuracion import cargar_configuracion, variar_configuracion
+from optimizador.sistemas.construccion import temporadas
+from optimizador.sistemas.estudio_aerotermia import optimizar_aerotermia
+from optimizador.sistemas.estudio_aire_acondicionado import optimizar_aire_acondicionado
+from optimizador.sistemas.estudio_conjunto import optimizar_conjunto
+
+TIPO = 'Aerotermia de alta'
+
+
+def dos_pasos(df, irradiacion, placas, aguas, c_i, c_aire, datos):
+    """Aerotermia y después aire acondicionado con las placas de la aerotermia"""
+    (df_calefaccion, irradiacion_calefaccion), (df_refrigeracion, irradiacion_refrigeracion) = temporadas(
+        df, irradiacion)
+    calefaccion = optimizar_aerotermia(TIPO, df_calefaccion, irradiacion_calefaccion, placas, aguas, c_i, datos)
+    refrigeracion = optimizar_aire_acondicionado(df_refrigeracion, irradiacion_refrigeracion, placas,
+                                                 calefaccion['n_ps'], aguas, c_aire, datos)
+    # La inversión del aire acondicionado con placas fijadas incluye otra vez su precio
+    repetidas = datos['Placas solares']['precio'] * calefaccion['n_ps'].sum()
+    return calefaccion, {**refrigeracion, 'capex': refrigeracion['capex'] - repetidas}, repetidas
+
+
+def conjunto(df, irradiacion, placas, aguas, c_i, c_aire, datos):
+    """Aerotermia, aire acondicionado y placas en un solo modelo"""
+    solucion = optimizar_conjunto(TIPO, df, irradiacion, placas, aguas, c_i, c_aire, datos)
+    return solucion['calefaccion'], solucion['refrigeracion'], 0.0
+
+
+def main():
+    """Compara la resolución en dos pasos con el modelo conjunto"""
+    parser = argparse.ArgumentParser(description="Aerotermia con refrigeración en dos pasos o en un solo modelo")
+    parser.add_argument('--horas', type=int, default=8760, help="Horas de la serie")
+    parser.add_argument('--precio-placas', type=float, default=None, help="Precio de cada placa [€]")
+    parser.add_argument('--escala-refrigeracion', type=float, default=1.0,
+                        help="Factor de las cargas de refrigeración")
+    parser.add_argument('--solver', default='appsi_highs', help="Solver de los modelos")
+    argumentos = parser.parse_args()
+
+    cambios = {'Solver.nombre': argumentos.solver}
+    if argumentos.precio_placas is not None:
+        cambios['Placas solares.precio'] = argumentos.precio_placas
+    configuracion = variar_configuracion(cargar_configuracion(), cambios)
+    datos = configuracion.datos
+    df, irradiacion = datos_sinteticos(argumentos.horas, 2)
+    df.loc[df['cargas'] < 0, 'cargas'] *= argumentos.escala_refrigeracion
+    placas, aguas = [60, 60], 2
+    c_i = configuracion.coste_inversion('Gas', TIPO)
+    c_aire = configuracion.coste_inversion('Gas', 'Aire acondicionado')
+    vida = datos['Bomba de calor']['Ciclo de vida']
+
+    resultados = {}
+    for nombre, funcion in (('dos pasos', dos_pasos), ('conjunto', conjunto)):
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            calefaccion, refrigeracion, repetidas = funcion(df, irradiacion, placas, aguas, c_i, c_aire, datos)
+        tiempo = time.perf_counter() - inicio
+        opex = calefaccion['opex'] + refrigeracion['opex']
+        capex = calefaccion['capex'] + refrigeracion['capex']
+        resultados[nombre] = {'tiempo [s]': tiempo, 'opex [€]': opex, 'inversion [€]': capex,
+                              'coste total anual [€]': opex + capex / vida,
+                              'inversion placas dos veces [€]': capex + repetidas,
+                              'placas': int(calefaccion['n_ps'].sum()),
+                              'aerotermia [kW]': calefaccion['p_bdc'] / 1000,
+                              'aire acondicionado [kW]': refrigeracion['p_bdc'] / 1000}
+
+    print(f"{TIPO} con refrigeración, {argumentos.horas} horas, {argumentos.solver}")
+    print(f"{'':<32}{'dos pasos':>12}{'conjunto':>12}")
+    for clave in resultados['dos pasos']:
+        print(f"{clave:<32}{resultados['dos pasos'][clave]:>12.2f}{resultados['conjunto'][clave]:>12.2f}")
+    ahorro = resultados['dos pasos']['coste total anual [€]'] - resultados['conjunto']['coste total anual [€]']
+    print(f"Ahorro del modelo conjunto: {ahorro:.2f} €/año; "
+          f"tiempo {resultados['dos pasos']['tiempo [s]'] / resultados['conjunto']['tiempo [s]']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
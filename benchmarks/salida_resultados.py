@@ -0,0 +1,102 @@
+"""Tiempo de lectura de la solución y tamaño de las tablas de resultados en cada formato
+
+Se resuelve una vez el modelo de aire acondicionado con datos sintéticos y se compara:
+    lectura: la tabla de resultados como hasta ahora (pyo.value por hora y columna, Generacion_solar con un
+             generador por hora) frente a valores_variable y operaciones con vectores
+    salida:  tiempo de escritura y tamaño de resultados_modelo_Aire acondicionado en cada formato de
+             optimizador.salida_resultados, con 2 decimales y sin redondear, frente al .csv actual
+Los formatos parquet y feather se omiten si pyarrow no está instalado.
+
+Uso: python -m benchmarks.salida_resultados [--horas 8760] [--repeticiones 5] [--solver appsi_highs]
+"""
+import argparse
+import importlib.util
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyomo.environ as pyo
+
+from benchmarks.datos_sinteticos import datos_sinteticos
+from optimizador.configuracion import cargar_configuracion, variar_configuracion
+from optimizador.salida_resultados import FORMATOS, guardar_resultados
+from optimizador.sistemas.estudio_aire_acondicionado import modelo_aire_acondicionado
+from optimizador.sistemas.solver import resolver, valores_enteros, valores_variable
+
+
+def tabla_por_horas(model, df, irradiacion):
+    """Tabla de resultados leyendo cada valor con pyo.value, como antes de valores_variable"""
+    n_ps = valores_enteros(model.n_ps)
+    return pd.DataFrame({'Horas': range(len(df)),
+                         'cargas': np.round(df['cargas'].to_numpy(dtype=float), 2),
+                         'e_red': np.round(np.array([pyo.value(model.e_red[h]) for h in model.H]), 2),
+                         'e_ps': np.round(np.array([pyo.value(model.e_ps[h]) for h in model.H]), 2),
+                         'Generacion_solar': (np.round(sum(0.2255 * irradiacion[h] * n_ps), 2)
+                                              for h in range(len(df)))})
+
+
+def tabla_vectorizada(model, df, irradiacion):
+    """Tabla de resultados con valores_variable y operaciones con vectores"""
+    return pd.DataFrame({'Horas': range(len(df)),
+                         'cargas': df['cargas'].to_numpy(dtype=float),
+                         'e_red': valores_variable(model.e_red),
+                         'e_ps': valores_variable(model.e_ps),
+                         'Generacion_solar': (0.2255 * irradiacion[:len(df)] * valores_enteros(model.n_ps)).sum(
+                             axis=1)})
+
+
+def mejor_tiempo(funcion, repeticiones):
+    """Menor tiempo de varias llamadas a la función y su último resultado"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def main():
+    """Resuelve el modelo y compara la lectura de la solución y los formatos de salida"""
+    parser = argparse.ArgumentParser(description="Lectura de la solución y formatos de las tablas de resultados")
+    parser.add_argument('--horas', type=int, default=8760, help="Horas de la serie")
+    parser.add_argument('--repeticiones', type=int, default=5, help="Repeticiones de cada medida")
+    parser.add_argument('--solver', default='appsi_highs', help="Solver del modelo")
+    argumentos = parser.parse_args()
+
+    datos = variar_configuracion(cargar_configuracion(), {'Solver.nombre': argumentos.solver}).datos
+    df, irradiacion = datos_sinteticos(argumentos.horas, 2)
+    irradiacion = irradiacion.to_numpy()
+    model = modelo_aire_acondicionado(df, irradiacion, [60, 60], [0, 0], 2, 0, datos)
+    resolver(model, datos, 'Aire acondicionado')
+
+    t_antes, antes = mejor_tiempo(lambda: tabla_por_horas(model, df, irradiacion), argumentos.repeticiones)
+    t_ahora, ahora = mejor_tiempo(lambda: tabla_vectorizada(model, df, irradiacion), argumentos.repeticiones)
+    diferencia = np.abs(antes.to_numpy(dtype=float) - ahora.round(2).to_numpy(dtype=float)).max()
+    print(f"{argumentos.horas} horas, aire acondicionado con {argumentos.solver}")
+    print(f"Lectura de la solución: por horas {1000 * t_antes:.1f} ms, con vectores {1000 * t_ahora:.1f} ms "
+          f"({t_antes / t_ahora:.1f}x). Diferencia máxima con 2 decimales: {diferencia:.2e}")
+
+    formatos = [f for f in FORMATOS if f in ('csv', 'csv.gz') or importlib.util.find_spec('pyarrow') is not None]
+    if len(formatos) < len(FORMATOS):
+        print("pyarrow no está instalado: se omiten parquet y feather")
+    with tempfile.TemporaryDirectory() as carpeta:
+        inicio = time.perf_counter()
+        antes.to_csv(os.path.join(carpeta, 'referencia.csv'), index=False)
+        t_referencia = time.perf_counter() - inicio
+        referencia = os.path.getsize(os.path.join(carpeta, 'referencia.csv'))
+        print(f"\n{'Formato':<10}{'Decimales':>10}{'Escritura [ms]':>16}{'Tamaño [kB]':>13}{'Frente al .csv':>16}")
+        print(f"{'csv':<10}{'2':>10}{1000 * t_referencia:>16.1f}{referencia / 1024:>13.1f}{'(actual)':>16}")
+        for formato in formatos:
+            for decimales in (2, None):
+                t_escritura, ruta = mejor_tiempo(
+                    lambda f=formato, d=decimales: guardar_resultados(ahora, f'prueba_{d}', carpeta, f, d),
+                    argumentos.repeticiones)
+                tamano = os.path.getsize(ruta)
+                print(f"{formato:<10}{str(decimales or 'no'):>10}{1000 * t_escritura:>16.1f}{tamano / 1024:>13.1f}"
+                      f"{tamano / referencia:>15.2f}x")
+
+
+if __name__ == '__main__':
+    main()
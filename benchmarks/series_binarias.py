@@ -0,0 +1,148 @@
+"""Tiempo de arranque y memoria máxima al cargar las series horarias desde .csv y desde .npy
+
+Se comparan tres formas de llegar al Dataframe de parametros_horarios con los precios, las cargas, la
+temperatura exterior y la irradiación de una vivienda:
+    antes: lectura de los .csv convertida en listas de Python, como hacía optimizador.entradas
+    csv:   lectura de los .csv en vectores float64 (optimizador.entradas sin archivos .npy)
+    npy:   vistas de solo lectura sobre los .npy creados con el importador (optimizador.entradas)
+Los precios son los de Datos/ repetidos hasta el número de horas pedido; las cargas, la temperatura y la
+irradiación son sintéticas. Cada forma se mide en un proceso nuevo para que la memoria residente máxima
+(que incluye los módulos importados) no dependa de las anteriores; además se da el pico de memoria reservada
+por Python y NumPy (tracemalloc).
+
+Uso: python -m benchmarks.series_binarias [--horas 8760] [--aguas 4] [--repeticiones 3]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.datos_sinteticos import datos_sinteticos
+from optimizador.entradas import importar_csv, leer_cargas, leer_irradiacion, leer_precios, leer_temperatura
+from optimizador.metricas import memoria_maxima
+from optimizador.parametros_horarios import parametros_horarios
+
+VARIANTES = ('antes', 'csv', 'npy')
+
+
+def crear_archivos(carpeta, horas, aguas):
+    """Escribe los .csv de la prueba y sus .npy en subcarpetas separadas
+
+    :param carpeta: Carpeta temporal de la prueba
+    :param horas: Número de horas de las series
+    :param aguas: Numero de aguas del tejado
+    """
+    df, irradiacion = datos_sinteticos(horas, aguas)
+    series = {}
+    for nombre in ('Precio_Electrico', 'Precio_Gas'):
+        precios = pd.read_csv(f'Datos/{nombre}.csv', sep=',')
+        series[nombre] = pd.DataFrame({precios.columns[0]: np.resize(precios.iloc[:, 0].to_numpy(), horas),
+                                       precios.columns[1]: np.resize(precios.iloc[:, 1].to_numpy(), horas)})
+    series['cargas'] = df[['cargas']]
+    series['T_exterior'] = df[['T_exterior']]
+    series['irradiacion'] = irradiacion
+    tipos = {'Precio_Electrico': 'precios', 'Precio_Gas': 'precios', 'cargas': 'cargas',
+             'T_exterior': 'temperatura', 'irradiacion': 'irradiacion'}
+    for subcarpeta in ('csv', 'npy'):
+        os.makedirs(os.path.join(carpeta, subcarpeta))
+        for nombre, serie in series.items():
+            serie.to_csv(os.path.join(carpeta, subcarpeta, f'{nombre}.csv'), index=False)
+    for nombre, tipo in tipos.items():
+        ruta = os.path.join(carpeta, 'npy', f'{nombre}.csv')
+        importar_csv(ruta, tipo)
+        os.remove(ruta)
+
+
+def cargar_antes(carpeta):
+    """Lectura de los .csv con conversión a listas, como en la versión anterior de optimizador.entradas
+
+    :param carpeta: Carpeta con los .csv
+    """
+    def precios(nombre):
+        archivo_precio = pd.read_csv(os.path.join(carpeta, nombre), sep=',', usecols=[1]) / 1000
+        return np.array(archivo_precio.iloc[:]).flatten().tolist()
+
+    cargas = np.array(pd.read_csv(os.path.join(carpeta, 'cargas.csv')).iloc[:]).flatten().tolist()
+    t_exterior = pd.read_csv(os.path.join(carpeta, 'T_exterior.csv')).iloc[:, 0].to_numpy()
+    irradiacion = pd.read_csv(os.path.join(carpeta, 'irradiacion.csv'))
+    df = parametros_horarios(precios('Precio_Electrico.csv'), precios('Precio_Gas.csv'), cargas, True, t_exterior)
+    return df, irradiacion
+
+
+def cargar_actual(carpeta, extension):
+    """Lectura con optimizador.entradas de los .csv o de los .npy
+
+    :param carpeta: Carpeta con los archivos
+    :param extension: '.csv' o '.npy'
+    """
+    def ruta(nombre):
+        return os.path.join(carpeta, nombre + extension)
+
+    df = parametros_horarios(leer_precios(ruta('Precio_Electrico')), leer_precios(ruta('Precio_Gas')),
+                             leer_cargas(ruta('cargas')), True, leer_temperatura(ruta('T_exterior')))
+    return df, leer_irradiacion(ruta('irradiacion'))
+
+
+def medir(variante, carpeta):
+    """Carga las series una vez con la variante indicada y devuelve sus medidas
+
+    :param variante: 'antes', 'csv' o 'npy'
+    :param carpeta: Carpeta temporal de la prueba
+    """
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    if variante == 'antes':
+        df, irradiacion = cargar_antes(os.path.join(carpeta, 'csv'))
+    else:
+        df, irradiacion = cargar_actual(os.path.join(carpeta, variante), '.' + variante)
+    # Se recorren todos los valores para que los .npy se lean realmente del disco
+    suma = float(df[['precio_luz', 'precio_gas', 'cargas', 'T_exterior']].to_numpy().sum() +
+                 irradiacion.to_numpy().sum())
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'segundos': segundos, 'pico_mb': pico / 2**20, 'rss_mb': memoria_maxima(), 'suma': suma}
+
+
+def main():
+    """Mide cada variante en procesos nuevos y escribe una tabla con la mediana de las repeticiones"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--horas", type=int, default=8760)
+    parser.add_argument("--aguas", type=int, default=4)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--variante", choices=VARIANTES, help=argparse.SUPPRESS)
+    parser.add_argument("--carpeta", help=argparse.SUPPRESS)
+    argumentos = parser.parse_args()
+
+    if argumentos.variante:
+        print(json.dumps(medir(argumentos.variante, argumentos.carpeta)))
+        return
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        crear_archivos(carpeta, argumentos.horas, argumentos.aguas)
+        print(f"{argumentos.horas} horas, {argumentos.aguas} aguas, mediana de {argumentos.repeticiones} procesos")
+        print(f"{'variante':<8} {'tiempo (ms)':>12} {'pico Python (MB)':>17} {'memoria máx. (MB)':>18}")
+        sumas = {}
+        for variante in VARIANTES:
+            medidas = []
+            for _ in range(argumentos.repeticiones):
+                salida = subprocess.run([sys.executable, '-m', 'benchmarks.series_binarias', '--variante', variante,
+                                         '--carpeta', carpeta], check=True, capture_output=True, text=True).stdout
+                medidas.append(json.loads(salida.splitlines()[-1]))
+            sumas[variante] = medidas[0]['suma']
+            print(f"{variante:<8} {1000 * np.median([m['segundos'] for m in medidas]):>12.1f} "
+                  f"{np.median([m['pico_mb'] for m in medidas]):>17.1f} "
+                  f"{np.median([m['rss_mb'] for m in medidas]):>18.1f}")
+        if not np.allclose(list(sumas.values()), sumas['antes'], rtol=1e-12):
+            print("Las variantes no leen los mismos valores:", sumas)
+
+
+if __name__ == "__main__":
+    main()
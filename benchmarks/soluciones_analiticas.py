@@ -0,0 +1,64 @@
+"""Comprobación de que las soluciones analíticas coinciden con las del solver y comparación de tiempos
+
+Uso: python -m benchmarks.soluciones_analiticas
+"""
+import time
+
+import numpy as np
+import yaml
+
+from benchmarks.datos_sinteticos import datos_sinteticos
+from optimizador.sistemas.estudio_aire_acondicionado import resolver_aire_acondicionado, solucion_aire_acondicionado
+from optimizador.sistemas.estudio_gas import resolver_gas, solucion_gas
+
+
+def comprobar(analitica, solver, tolerancia=1e-6):
+    """Lanza un AssertionError si las dos soluciones no coinciden
+
+    :param analitica: Diccionario con la solución analítica
+    :param solver: Diccionario con la solución del solver
+    :param tolerancia: Tolerancia relativa admitida
+    """
+    for clave, valor in analitica.items():
+        if np.ndim(valor) == 0:
+            assert np.isclose(valor, solver[clave], rtol=tolerancia), f"{clave}: {valor} != {solver[clave]}"
+    assert np.isclose(analitica['opex'] + analitica['capex'], solver['opex'] + solver['capex'], rtol=tolerancia)
+
+
+def cronometrar(funcion, *args):
+    """Ejecuta la función y devuelve su resultado y el tiempo empleado
+
+    :param funcion: Función a ejecutar
+    :param args: Argumentos de la función
+    """
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    """Resuelve cada sistema por los dos caminos, comprueba que coinciden e imprime los tiempos"""
+    with open('datos_tecnicos.yaml', "r", encoding="utf-8") as f:
+        datos = yaml.safe_load(f)
+    aguas = 2
+    df, irradiacion = datos_sinteticos(aguas=aguas)
+    df_gas = df.copy()
+    df_gas['cargas'] = df_gas['cargas'].clip(lower=0)
+    n_ps = [3, 2]
+
+    casos = {
+        'Gas': ((solucion_gas, df_gas, 3036.26, datos),
+                (resolver_gas, df_gas, 3036.26, datos)),
+        'Aire acondicionado (placas fijas)': (
+            (solucion_aire_acondicionado, df, irradiacion, n_ps, aguas, 2401.43, datos),
+            (resolver_aire_acondicionado, df, irradiacion, [60, 60], n_ps, aguas, 2401.43, datos)),
+    }
+    for nombre, (analitico, pyomo) in casos.items():
+        analitica, t_analitica = cronometrar(*analitico)
+        solver, t_solver = cronometrar(*pyomo)
+        comprobar(analitica, solver)
+        print(f"{nombre}: las soluciones coinciden. Analítica {t_analitica:.4f} s, solver {t_solver:.4f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Tiempo de resolución de cada modelo con los solvers instalados
+
+Los precios son los de Datos/Precio_Electrico.csv y Datos/Precio_Gas.csv; las cargas térmicas, la
+temperatura exterior y la irradiación son sintéticas porque el repositorio no incluye archivos reales.
+Los solvers que no están instalados se omiten.
+
+Uso: python -m benchmarks.solvers [--horas 8760] [--solvers scip appsi_highs cbc]
+"""
+import argparse
+import time
+
+import pyomo.environ as pyo
+import yaml
+
+from benchmarks.datos_sinteticos import datos_sinteticos
+from optimizador.entradas import leer_precios
+from optimizador.sistemas.estudio_aerotermia import modelo_aerotermia
+from optimizador.sistemas.estudio_aire_acondicionado import modelo_aire_acondicionado
+from optimizador.sistemas.estudio_gas import modelo_gas
+from optimizador.sistemas.solver import (NO_CONVEXOS, argumentos_solve, comprobar_solver, configuracion_solver,
+                                         crear_solver)
+
+SOLVERS = ('scip', 'appsi_highs', 'cbc', 'appsi_cbc', 'glpk')
+
+
+def modelos(horas, datos):
+    """Funciones que construyen cada modelo con precios reales y cargas sintéticas
+
+    :param horas: Número de horas de la serie
+    :param datos: Datos técnicos de los equipos de climatización
+    """
+    aguas = 2
+    placas = [60, 60]
+    df, irradiacion = datos_sinteticos(horas, aguas)
+    df['precio_luz'] = leer_precios('Datos/Precio_Electrico.csv')[:horas]
+    df['precio_gas'] = leer_precios('Datos/Precio_Gas.csv')[:horas]
+    df_gas = df.copy()
+    df_gas['cargas'] = df_gas['cargas'].clip(lower=0)
+    return {
+        'Gas': lambda lineal: modelo_gas(df_gas, 0, datos),
+        'Aire acondicionado': lambda lineal: modelo_aire_acondicionado(
+            df, irradiacion, placas, [0] * aguas, aguas, 0, datos),
+        'Aerotermia de alta': lambda lineal: modelo_aerotermia(
+            'Aerotermia de alta', df, irradiacion, placas, aguas, 0, datos, lineal=lineal),
+        'Aerotermia de baja': lambda lineal: modelo_aerotermia(
+            'Aerotermia de baja', df, irradiacion, placas, aguas, 0, datos, lineal=lineal),
+    }
+
+
+def main():
+    """Resuelve cada modelo con cada solver disponible e imprime el tiempo y el valor del objetivo"""
+    parser = argparse.ArgumentParser(description="Compara los solvers configurables en datos_tecnicos.yaml")
+    parser.add_argument('--horas', type=int, default=8760, help="Horas de la serie (máximo 8760)")
+    parser.add_argument('--solvers', nargs='+', default=SOLVERS, help="Solvers a comparar")
+    argumentos = parser.parse_args()
+
+    with open('datos_tecnicos.yaml', "r", encoding="utf-8") as f:
+        datos = yaml.safe_load(f)
+    constructores = modelos(argumentos.horas, datos)
+
+    print(f"{'Sistema':<22}{'Solver':<14}{'Formulación':<13}{'Tiempo [s]':>12}{'Objetivo':>16}")
+    for nombre in argumentos.solvers:
+        for sistema, construir in constructores.items():
+            configuracion = configuracion_solver(datos, sistema)
+            configuracion['nombre'] = nombre
+            opt = crear_solver(configuracion)
+            try:
+                comprobar_solver(opt, nombre)
+            except RuntimeError:
+                print(f"{sistema:<22}{nombre:<14}{'no disponible':<13}")
+                continue
+            formulaciones = (True, False) if sistema.startswith('Aerotermia') and nombre in NO_CONVEXOS else (True,)
+            for lineal in formulaciones:
+                model = construir(lineal)
+                inicio = time.perf_counter()
+                opt.solve(model, **argumentos_solve(configuracion))
+                tiempo = time.perf_counter() - inicio
+                formulacion = ('lineal' if lineal else 'bilineal') if sistema.startswith('Aerotermia') else '-'
+                print(f"{sistema:<22}{nombre:<14}{formulacion:<13}{tiempo:>12.2f}{pyo.value(model.OBJ):>16.4f}")
+
+
+if __name__ == '__main__':
+    main()
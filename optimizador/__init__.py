@@ -1,10 +1,17 @@
 """ Módulo para obtener resultados de sistemas de calefacción """
+import os
+
+from optimizador.carpetas import carpeta_ejecucion
+from optimizador.metricas import anotar, medido
 from optimizador.parametros_horarios import parametros_horarios
+from optimizador.progreso import informar
 from optimizador.sistemas import seleccion_sistema
 from .sistemas.estudio_completo import calculo_todas_opciones
 
 
-def inicio_optimizacion(precio_luz, precio_gas, cargas, refri, irradiacion, placas, actual, nuevo, aguas):
+@medido
+def inicio_optimizacion(precio_luz, precio_gas, cargas, refri, irradiacion, placas, actual, nuevo, aguas,
+                        t_exterior=None, carpeta=None, procesos=None):
     """Función que prepara los argumento de entrada para el cálculo
 
     :param precio_luz: Datos de precios eléctricos cargados en el script principal
@@ -16,10 +23,19 @@ def inicio_optimizacion(precio_luz, precio_gas, cargas, refri, irradiacion, plac
     :param actual: Sistema de climatización instalado en la residencia
     :param nuevo: Opción de estudio seleccionado en el script principal
     :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param t_exterior: Temperatura exterior horaria. Si no se indica se lee de Datos/T_exterior.csv
+    :param carpeta: Carpeta en la que se guardan los resultados y las gráficas. Si no se indica se crea una
+        carpeta nueva dentro de Resultados (ver optimizador.carpetas). Nunca se borra su contenido
+    :param procesos: Procesos para estudiar los sistemas con la opción 'Todas' (ver calculo_todas_opciones)
     """
-    df = parametros_horarios(precio_luz, precio_gas, cargas, refri)
+    anotar(actual=actual, nuevo=nuevo, refrigeracion=bool(refri), aguas=aguas)
+    df = parametros_horarios(precio_luz, precio_gas, cargas, refri, t_exterior)
+    if carpeta is None:
+        carpeta = carpeta_ejecucion()
+    os.makedirs(carpeta, exist_ok=True)
+    informar("Carpeta de resultados", carpeta)
     if nuevo != 'Todas':
-        resultado = seleccion_sistema(nuevo, df, irradiacion, placas, aguas, actual, refri)
+        resultado = seleccion_sistema(nuevo, df, irradiacion, placas, aguas, actual, refri, carpeta)
     else:
-        resultado = calculo_todas_opciones(df, irradiacion, placas, aguas, actual, refri)
+        resultado = calculo_todas_opciones(df, irradiacion, placas, aguas, actual, refri, procesos, carpeta)
     return resultado
@@ -0,0 +1,318 @@
+"""Módulo para estudiar cómo cambia la solución óptima con los parámetros técnico-económicos
+
+Uso desde la ruta principal del repositorio:
+    python -m optimizador.barrido cargas.csv --actual Gas --parametro "Placas solares.precio=150:450:7"
+        --parametro "escala.precio_luz=0.8,1,1.2" --salida Resultados_barrido --procesos 4
+
+Cada parámetro es un valor de datos_tecnicos.yaml ('Sección.clave', por ejemplo 'Aerotermia de alta.cop' o
+'Gas.coste potencia'), una ayuda ('ayudas.<sistema>'), un coste de inversión ('inversion.<actual>.<nuevo>') o
+un factor sobre una serie horaria ('escala.precio_luz', 'escala.precio_gas'). Sus valores se dan como lista
+(a,b,c) o como intervalo inicio:fin:n con n valores equiespaciados, y se estudian todas las combinaciones. Con
+--muestras N cada parámetro se da como min:max y se toman N puntos de un hipercubo latino.
+
+Cada punto se estudia con seleccion_sistema para cada sistema y su resultado se añade a <salida>/barrido.csv
+en cuanto termina: una fila por punto y sistema con los valores de los parámetros, los costes y si es el
+sistema óptimo del punto. En las mallas, <salida>/cruces.csv recoge los valores de cada parámetro en los que
+cambia el sistema óptimo con el resto de parámetros fijos, interpolando la diferencia de coste total anual
+entre los dos puntos vecinos.
+
+Los procesos de trabajo conservan los modelos construidos (ver optimizador.sistemas.modelos_vivos): en los
+puntos que solo cambian precios o costes de inversión se actualizan los coeficientes del modelo anterior en
+lugar de construirlo de nuevo.
+"""
+import argparse
+import csv
+import itertools
+import os
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from dotenv import load_dotenv
+
+from optimizador.configuracion import cargar_configuracion, variar_configuracion
+from optimizador.entradas import leer_cargas, leer_precios, leer_temperatura
+from optimizador.graficas import MODOS, esperar_graficas
+from optimizador.lotes import VARIABLES_PROCESO, entorno_restaurado, irradiacion_vivienda
+from optimizador.parametros_horarios import parametros_horarios
+from optimizador.progreso import informar
+from optimizador.sistemas import seleccion_sistema
+from optimizador.sistemas.estudio_completo import SISTEMAS
+
+# Prefijo de los parámetros que multiplican una columna del Dataframe horario
+ESCALA = 'escala.'
+COLUMNAS_RESULTADO = ('sistema', 'optimo', 'coste_operativo', 'inversion', 'coste_total_anual', 'error', 'carpeta')
+
+# Datos del barrido, se cargan una vez por proceso de trabajo
+_comunes = {}
+
+
+def valores_parametro(texto):
+    """Valores de un parámetro dados como lista 'a,b,c', malla 'inicio:fin:n' o intervalo 'min:max'
+
+    :param texto: Valores del parámetro en la línea de comandos
+    :return: Lista de valores o, para un intervalo, tupla (min, max)
+    """
+    partes = texto.split(':')
+    if len(partes) == 3:
+        return np.linspace(float(partes[0]), float(partes[1]), int(partes[2])).tolist()
+    if len(partes) == 2:
+        return (float(partes[0]), float(partes[1]))
+    return [float(valor) for valor in texto.split(',')]
+
+
+def puntos_malla(parametros):
+    """Todas las combinaciones de los valores de los parámetros
+
+    :param parametros: Diccionario {ruta: lista de valores}
+    """
+    rutas = list(parametros)
+    return [dict(zip(rutas, valores)) for valores in itertools.product(*(parametros[r] for r in rutas))]
+
+
+def puntos_hipercubo(intervalos, muestras, semilla=0):
+    """Muestras de un hipercubo latino: cada intervalo se divide en tantos tramos como muestras y cada tramo
+    se usa una sola vez
+
+    :param intervalos: Diccionario {ruta: (min, max)}
+    :param muestras: Número de puntos
+    :param semilla: Semilla del generador aleatorio
+    """
+    rng = np.random.default_rng(semilla)
+    puntos = [{} for _ in range(muestras)]
+    for ruta, (minimo, maximo) in intervalos.items():
+        fracciones = (rng.permutation(muestras) + rng.random(muestras)) / muestras
+        for punto, valor in zip(puntos, minimo + fracciones * (maximo - minimo)):
+            punto[ruta] = float(valor)
+    return puntos
+
+
+def aplicar_punto(df, configuracion, punto):
+    """Datos horarios y configuración de un punto del barrido
+
+    :param df: Dataframe horario de partida
+    :param configuracion: Configuración de partida
+    :param punto: Diccionario {ruta: valor}
+    """
+    escalas = {ruta[len(ESCALA):]: valor for ruta, valor in punto.items() if ruta.startswith(ESCALA)}
+    cambios = {ruta: valor for ruta, valor in punto.items() if not ruta.startswith(ESCALA)}
+    if escalas:
+        df = df.copy()
+        for columna, factor in escalas.items():
+            if columna not in df.columns:
+                raise ValueError(f"No existe la serie horaria {columna}")
+            df[columna] = df[columna].to_numpy(dtype=float) * factor
+    if cambios:
+        configuracion = variar_configuracion(configuracion, cambios)
+    return df, configuracion
+
+
+def importe(texto):
+    """Valor numérico de un importe del diccionario de resultados ('123.4 €')
+
+    :param texto: Importe con el símbolo del euro
+    """
+    return float(str(texto).replace("€", "").strip())
+
+
+def iniciar_proceso(comunes, graficas):
+    """Prepara un proceso de trabajo: guarda los datos del barrido, el modo de gráficas y los modelos vivos
+
+    :param comunes: Diccionario con df, irradiacion, placas, aguas, actual, refri, sistemas, configuracion y salida
+    :param graficas: Modo de gráficas de cada punto (ver optimizador.graficas)
+    """
+    os.environ['MPLBACKEND'] = 'Agg'
+    os.environ['GRAFICAS'] = graficas
+    # Salvo que el archivo .env indique otro número, se conservan los modelos de todos los sistemas
+    load_dotenv(dotenv_path=".env")
+    os.environ.setdefault('MODELOS_VIVOS', str(2 * len(comunes['sistemas'])))
+    _comunes.clear()
+    _comunes.update(comunes)
+
+
+def evaluar_punto(indice, punto):
+    """Estudia todos los sistemas en un punto del barrido
+
+    :param indice: Número del punto
+    :param punto: Diccionario {ruta: valor}
+    :return: Una fila por sistema. Los errores se recogen en la fila en lugar de detener el barrido
+    """
+    carpeta = os.path.join(_comunes['salida'], f"punto_{indice:04d}")
+    os.makedirs(carpeta, exist_ok=True)
+    df, configuracion = aplicar_punto(_comunes['df'], _comunes['configuracion'], punto)
+    filas = []
+    for nuevo in _comunes['sistemas']:
+        fila = {'punto': indice, **punto, 'sistema': nuevo, 'carpeta': carpeta}
+        try:
+            resultado = seleccion_sistema(nuevo, df, _comunes['irradiacion'], _comunes['placas'], _comunes['aguas'],
+                                          _comunes['actual'], _comunes['refri'], carpeta, configuracion)
+            if not isinstance(resultado, dict):
+                raise ValueError(resultado)
+            vida = configuracion.datos['Gas' if nuevo == 'Gas' else 'Bomba de calor']['Ciclo de vida']
+            fila['coste_operativo'] = importe(resultado['Costo operativo anual'])
+            fila['inversion'] = importe(resultado['Inversion'])
+            fila['coste_total_anual'] = fila['coste_operativo'] + fila['inversion'] / vida
+        except Exception as e:  # pylint: disable=W0718
+            fila['error'] = f"{type(e).__name__}: {e}"
+        filas.append(fila)
+    costes = {fila['sistema']: fila['coste_total_anual'] for fila in filas if 'coste_total_anual' in fila}
+    for fila in filas:
+        fila['optimo'] = bool(costes) and fila['sistema'] == min(costes, key=costes.get)
+    return filas
+
+
+def cruces(tabla, rutas):
+    """Valores de cada parámetro en los que cambia el sistema óptimo, con el resto de parámetros fijos
+
+    :param tabla: Dataframe con los resultados del barrido en malla
+    :param rutas: Parámetros del barrido
+    """
+    validas = tabla[tabla['coste_total_anual'].notna()]
+    filas = []
+    for ruta in rutas:
+        otros = [r for r in rutas if r != ruta]
+        grupos = validas.groupby(otros) if otros else [((), validas)]
+        for clave, grupo in grupos:
+            fijos = dict(zip(otros, clave if isinstance(clave, tuple) else (clave,)))
+            costes = grupo.pivot_table(index=ruta, columns='sistema', values='coste_total_anual').dropna()
+            optimo = costes.idxmin(axis=1)
+            for k in range(len(costes) - 1):
+                desde, hasta = optimo.iloc[k], optimo.iloc[k + 1]
+                if desde == hasta:
+                    continue
+                # Diferencia de coste entre los dos sistemas, negativa antes del cruce y positiva después
+                antes = costes[desde].iloc[k] - costes[hasta].iloc[k]
+                despues = costes[desde].iloc[k + 1] - costes[hasta].iloc[k + 1]
+                inicio, fin = costes.index[k], costes.index[k + 1]
+                valor = inicio + (fin - inicio) * antes / (antes - despues) if antes != despues else fin
+                filas.append({'parametro': ruta, 'valor': valor, 'desde': desde, 'hasta': hasta, **fijos})
+    return pd.DataFrame(filas, columns=['parametro', 'valor', 'desde', 'hasta', *rutas])
+
+
+def barrido(df, irradiacion, placas, aguas, actual, refri, parametros, sistemas=SISTEMAS, muestras=None, semilla=0,
+            procesos=None, salida='Resultados_barrido', configuracion=None, graficas='no'):
+    """Estudia los sistemas en cada punto de una malla o de un hipercubo latino de parámetros
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param placas: Área disponible para las placas solares en cada agua del tejado
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param actual: Sistema de climatización instalado en la residencia
+    :param refri: Se quiere refrigeración en el sistema
+    :param parametros: Diccionario {ruta: lista de valores} o, con muestras, {ruta: (min, max)}
+    :param sistemas: Sistemas que se comparan en cada punto
+    :param muestras: Número de puntos del hipercubo latino. Por defecto se recorre la malla completa
+    :param semilla: Semilla del hipercubo latino
+    :param procesos: Número de puntos que se estudian a la vez. Por defecto uno por núcleo
+    :param salida: Carpeta de resultados. Cada punto se guarda en salida/punto_<n>
+    :param configuracion: Configuración de partida. Por defecto la de cargar_configuracion
+    :param graficas: Modo de gráficas de cada punto. Por defecto no se generan
+    :return: Dataframe con una fila por punto y sistema y Dataframe de cruces (vacío con hipercubo latino)
+    """
+    rutas = list(parametros)
+    puntos = puntos_hipercubo(parametros, muestras, semilla) if muestras else puntos_malla(parametros)
+    comunes = {'df': df, 'irradiacion': irradiacion, 'placas': placas, 'aguas': aguas, 'actual': actual,
+               'refri': refri, 'sistemas': list(sistemas), 'salida': salida,
+               'configuracion': configuracion or cargar_configuracion()}
+    # Se comprueban los parámetros antes de lanzar ningún cálculo
+    for punto in puntos[:1]:
+        aplicar_punto(df.iloc[:1], comunes['configuracion'], punto)
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+    os.makedirs(salida, exist_ok=True)
+    ruta_tabla = os.path.join(salida, 'barrido.csv')
+    columnas = ['punto', *rutas, *COLUMNAS_RESULTADO]
+
+    filas = []
+    with open(ruta_tabla, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.DictWriter(f, fieldnames=columnas)
+        escritor.writeheader()
+
+        def guardar(filas_punto):
+            escritor.writerows(filas_punto)
+            f.flush()
+            filas.extend(filas_punto)
+            informar("Barrido", f"punto {len(filas) // len(sistemas)} de {len(puntos)}")
+
+        if procesos <= 1:
+            with entorno_restaurado((*VARIABLES_PROCESO, 'MODELOS_VIVOS')):
+                iniciar_proceso(comunes, graficas)
+                for indice, punto in enumerate(puntos):
+                    guardar(evaluar_punto(indice, punto))
+                esperar_graficas()
+        else:
+            with ProcessPoolExecutor(max_workers=procesos, initializer=iniciar_proceso,
+                                     initargs=(comunes, graficas)) as pool:
+                futuros = [pool.submit(evaluar_punto, indice, punto) for indice, punto in enumerate(puntos)]
+                for futuro in as_completed(futuros):
+                    guardar(futuro.result())
+
+    orden = {nuevo: i for i, nuevo in enumerate(sistemas)}
+    tabla = pd.DataFrame(filas, columns=columnas)
+    tabla = tabla.sort_values(['punto', 'sistema'], key=lambda c: c.map(orden) if c.name == 'sistema' else c)
+    tabla.to_csv(ruta_tabla, index=False)
+    if muestras:
+        tabla_cruces = pd.DataFrame(columns=['parametro', 'valor', 'desde', 'hasta', *rutas])
+    else:
+        tabla_cruces = cruces(tabla, rutas)
+    tabla_cruces.to_csv(os.path.join(salida, 'cruces.csv'), index=False)
+    return tabla.reset_index(drop=True), tabla_cruces
+
+
+def main(argumentos=None):
+    """Punto de entrada de la línea de comandos
+
+    :param argumentos: Lista de argumentos. Por defecto se toman de sys.argv
+    """
+    parser = argparse.ArgumentParser(description="Sensibilidad de la solución óptima a los parámetros técnicos y "
+                                                 "económicos")
+    parser.add_argument("cargas", help="Archivo de cargas térmicas de la vivienda")
+    parser.add_argument("--actual", required=True, help="Sistema de climatización instalado")
+    parser.add_argument("--sistemas", nargs='+', default=list(SISTEMAS),
+                        choices=[*SISTEMAS, 'Aire acondicionado'], help="Sistemas que se comparan")
+    parser.add_argument("--parametro", action="append", required=True, metavar="RUTA=VALORES",
+                        help="Parámetro y valores: a,b,c o inicio:fin:n (min:max con --muestras). Se repite por "
+                             "cada parámetro")
+    parser.add_argument("--muestras", type=int, default=None, help="Puntos de un hipercubo latino")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla del hipercubo latino")
+    parser.add_argument("--refrigeracion", action="store_true", help="La vivienda necesita refrigeración")
+    parser.add_argument("--irradiacion", help="Archivo .csv o .npy con la irradiación de cada agua")
+    parser.add_argument("--latitud", type=float)
+    parser.add_argument("--longitud", type=float)
+    parser.add_argument("--azimut", type=int, default=0)
+    parser.add_argument("--aguas", type=int, default=1)
+    parser.add_argument("--area", help="Área de tejado de cada agua separada por comas")
+    parser.add_argument("--precio-luz", default="Datos/Precio_Electrico.csv", help="Archivo de precios eléctricos")
+    parser.add_argument("--precio-gas", default="Datos/Precio_Gas.csv", help="Archivo de precios del gas")
+    parser.add_argument("--temperatura", default="Datos/T_exterior.csv", help="Archivo de temperatura exterior")
+    parser.add_argument("--salida", default="Resultados_barrido", help="Carpeta de resultados")
+    parser.add_argument("--procesos", type=int, default=None, help="Puntos estudiados a la vez")
+    parser.add_argument("--graficas", choices=MODOS, default="no", help="Modo de gráficas de cada punto")
+    args = parser.parse_args(argumentos)
+
+    parametros = {}
+    for texto in args.parametro:
+        ruta, _, valores = texto.partition('=')
+        parametros[ruta.strip()] = valores_parametro(valores)
+    vivienda = {clave: valor for clave, valor in {'irradiacion': args.irradiacion, 'latitud': args.latitud,
+                                                  'longitud': args.longitud, 'azimut': args.azimut,
+                                                  'aguas': args.aguas, 'area': args.area}.items()
+                if valor is not None}
+    irradiacion, placas, aguas = irradiacion_vivienda(vivienda)
+    df = parametros_horarios(leer_precios(args.precio_luz), leer_precios(args.precio_gas), leer_cargas(args.cargas),
+                             args.refrigeracion, leer_temperatura(args.temperatura))
+    tabla, tabla_cruces = barrido(df, irradiacion, placas, aguas, args.actual, args.refrigeracion, parametros,
+                                  args.sistemas, args.muestras, args.semilla, args.procesos, args.salida,
+                                  graficas=args.graficas)
+    errores = tabla['error'].notna().sum()
+    print(f"{tabla['punto'].nunique()} puntos estudiados ({errores} cálculos con error). Resultados en "
+          f"{os.path.join(args.salida, 'barrido.csv')}")
+    for _, fila in tabla_cruces.iterrows():
+        print(f"  {fila['parametro']} = {fila['valor']:.4g}: {fila['desde']} -> {fila['hasta']}")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
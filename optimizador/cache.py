@@ -0,0 +1,60 @@
+"""Módulo con utilidades comunes para las cachés en disco del optimizador"""
+import hashlib
+import json
+import os
+
+
+def clave_cache(*partes):
+    """Huella SHA-256 de los datos que identifican una entrada de la caché
+
+    :param partes: Objetos serializables en JSON que determinan el contenido de la entrada
+    """
+    texto = json.dumps(partes, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+def ruta_cache(carpeta, clave, extension):
+    """Ruta del archivo de una entrada. Se reparte en subcarpetas por el prefijo de la clave
+
+    :param carpeta: Carpeta raíz de la caché
+    :param clave: Huella de la entrada
+    :param extension: Extensión del archivo (con punto)
+    """
+    return os.path.join(carpeta, clave[:2], clave + extension)
+
+
+def marcar_uso(ruta):
+    """Actualiza la fecha de modificación de una entrada para que cuente como usada recientemente
+
+    :param ruta: Ruta del archivo de la entrada
+    """
+    try:
+        os.utime(ruta)
+    except OSError:
+        pass
+
+
+def desalojar(carpeta, limite_bytes):
+    """Elimina las entradas usadas hace más tiempo hasta que la caché ocupa menos del límite (LRU)
+
+    :param carpeta: Carpeta raíz de la caché
+    :param limite_bytes: Tamaño máximo de la caché en bytes
+    """
+    entradas = []
+    for raiz, _, archivos in os.walk(carpeta):
+        for nombre in archivos:
+            ruta = os.path.join(raiz, nombre)
+            try:
+                estado = os.stat(ruta)
+            except OSError:
+                continue
+            entradas.append((estado.st_mtime, estado.st_size, ruta))
+    total = sum(tamano for _, tamano, _ in entradas)
+    for _, tamano, ruta in sorted(entradas):
+        if total <= limite_bytes:
+            break
+        try:
+            os.remove(ruta)
+        except OSError:
+            continue
+        total -= tamano
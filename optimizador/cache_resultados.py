@@ -0,0 +1,138 @@
+"""Módulo con la caché en disco de los resultados de cada sistema de climatización
+
+Cada entrada guarda el diccionario de resultados y los archivos que el cálculo deja en la carpeta de
+resultados. La clave es la huella de los datos horarios, la irradiación, las opciones de la vivienda y el
+contenido de los archivos de configuración, de modo que cambiar cualquiera de ellos invalida la entrada.
+"""
+import copy
+import gzip
+import hashlib
+import os
+import pickle
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from dotenv import load_dotenv
+
+from optimizador.cache import clave_cache, desalojar, marcar_uso, ruta_cache
+from optimizador.configuracion import cargar_configuracion
+from optimizador.graficas import modo_temporal, procesar_datos_graficas
+from optimizador.progreso import informar
+from optimizador.salida_resultados import opciones_salida
+
+# Se incrementa cuando cambia el formato de las entradas o la forma de calcular los resultados
+VERSION_CACHE = 2
+
+
+def configuracion_cache_resultados():
+    """Carpeta y tamaño máximo de la caché de resultados definidos en el archivo .env
+
+    Con CACHE_RESULTADOS=0 (o vacío) la caché queda desactivada y la carpeta devuelta es None.
+    """
+    load_dotenv(dotenv_path=".env")
+    carpeta = os.getenv("CACHE_RESULTADOS", os.path.join(".cache", "resultados"))
+    if carpeta.strip().lower() in ("", "0", "no"):
+        carpeta = None
+    limite = float(os.getenv("CACHE_RESULTADOS_MB", "500")) * 1024 ** 2
+    return carpeta, limite
+
+
+def huella_datos(df, irradiacion):
+    """Huella SHA-256 del Dataframe horario (valores e índice) y de la irradiación
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    """
+    huella = hashlib.sha256()
+    huella.update(",".join(map(str, df.columns)).encode("utf-8"))
+    huella.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    irradiacion = np.ascontiguousarray(np.asarray(irradiacion, dtype=float))
+    huella.update(str(irradiacion.shape).encode("utf-8"))
+    huella.update(irradiacion.tobytes())
+    return huella.hexdigest()
+
+
+def huella_configuracion(configuracion=None):
+    """Huella del contenido de los archivos de configuración, del solver utilizado y del formato de los resultados
+
+    :param configuracion: Configuración del cálculo. Por defecto la de cargar_configuracion
+    """
+    if configuracion is None:
+        configuracion = cargar_configuracion()
+    huella = hashlib.sha256()
+    for huella_archivo in configuracion.huellas:
+        huella.update(huella_archivo)
+    huella.update(str(os.getenv("RUTA_ARCHIVO")).encode("utf-8"))
+    # Los archivos guardados en la entrada dependen del formato de las tablas de resultados
+    huella.update(str(opciones_salida()).encode("utf-8"))
+    return huella.hexdigest()
+
+
+def leer_entrada(ruta):
+    """Lee una entrada de la caché. Devuelve None si no existe o está dañada
+
+    :param ruta: Ruta del archivo de la entrada
+    """
+    try:
+        with gzip.open(ruta, "rb") as f:
+            entrada = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    marcar_uso(ruta)
+    return entrada
+
+
+def guardar_entrada(ruta, entrada):
+    """Guarda una entrada en la caché de forma atómica
+
+    :param ruta: Ruta del archivo de la entrada
+    :param entrada: Diccionario con el resultado y los archivos generados
+    """
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(ruta))
+    with os.fdopen(descriptor, "wb") as f, gzip.GzipFile(fileobj=f, mode="wb", compresslevel=3) as comprimido:
+        pickle.dump(entrada, comprimido, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporal, ruta)
+
+
+def resultado_en_cache(partes, calcular, carpeta, nombre="", configuracion=None):
+    """Devuelve el resultado de calcular(carpeta) reutilizando una ejecución anterior con los mismos datos
+
+    Sin entrada en la caché el cálculo se hace en una carpeta temporal con las gráficas diferidas, de modo
+    que la entrada solo contiene los resultados y los datos de las gráficas. En ambos casos los archivos
+    se copian a la carpeta de resultados y las gráficas se generan según el modo configurado.
+
+    :param partes: Objetos serializables en JSON que, junto con la configuración, identifican el cálculo
+    :param calcular: Función que recibe la carpeta de resultados y devuelve el diccionario de resultados
+    :param carpeta: Carpeta en la que se guardan los resultados y las gráficas
+    :param nombre: Nombre del cálculo en los avisos de progreso
+    :param configuracion: Configuración del cálculo. Por defecto la de cargar_configuracion
+    """
+    directorio, limite = configuracion_cache_resultados()
+    if directorio is None:
+        return calcular(carpeta)
+    os.makedirs(carpeta, exist_ok=True)
+    ruta = ruta_cache(directorio, clave_cache(VERSION_CACHE, partes, huella_configuracion(configuracion)), ".pkl.gz")
+    entrada = leer_entrada(ruta) if os.path.exists(ruta) else None
+    if entrada is None:
+        with tempfile.TemporaryDirectory(dir=carpeta) as temporal, modo_temporal('diferido'):
+            resultado = calcular(temporal)
+            archivos = {}
+            for archivo in sorted(os.listdir(temporal)):
+                with open(os.path.join(temporal, archivo), "rb") as f:
+                    archivos[archivo] = f.read()
+        entrada = {'resultado': resultado, 'archivos': archivos}
+        guardar_entrada(ruta, entrada)
+        desalojar(directorio, limite)
+    else:
+        informar(f"Resultado {nombre} recuperado de la caché" if nombre else "Resultado recuperado de la caché")
+
+    for archivo, contenido in entrada['archivos'].items():
+        with open(os.path.join(carpeta, archivo), "wb") as f:
+            f.write(contenido)
+    for archivo in entrada['archivos']:
+        if archivo.startswith("datos_graficas_"):
+            procesar_datos_graficas(os.path.join(carpeta, archivo))
+    return copy.deepcopy(entrada['resultado'])
@@ -0,0 +1,41 @@
+"""Módulo con las carpetas de resultados de cada ejecución
+
+Cada cálculo sin carpeta indicada guarda sus resultados en una subcarpeta nueva de Resultados con la fecha y
+la hora de inicio, de modo que varios cálculos en el mismo proceso o en paralelo no se sobrescriben ni borran
+los archivos de otros.
+"""
+import os
+import time
+
+CARPETA_RESULTADOS = 'Resultados'
+
+
+def carpeta_ejecucion(raiz=CARPETA_RESULTADOS):
+    """Crea la carpeta de resultados de una ejecución y devuelve su ruta
+
+    El nombre es la fecha y la hora de inicio; si otra ejecución ya la creó se añade un número.
+
+    :param raiz: Carpeta en la que se crean las carpetas de cada ejecución
+    """
+    os.makedirs(raiz, exist_ok=True)
+    marca = time.strftime("%Y%m%d_%H%M%S")
+    numero = 1
+    while True:
+        carpeta = os.path.join(raiz, marca if numero == 1 else f"{marca}_{numero}")
+        try:
+            # mkdir falla si la carpeta existe, también cuando otro proceso la crea a la vez
+            os.mkdir(carpeta)
+            return carpeta
+        except FileExistsError:
+            numero += 1
+
+
+def ultima_ejecucion(raiz=CARPETA_RESULTADOS):
+    """Carpeta de la ejecución más reciente, o la propia raíz si no contiene ninguna
+
+    :param raiz: Carpeta en la que se crean las carpetas de cada ejecución
+    """
+    if not os.path.isdir(raiz):
+        return raiz
+    carpetas = [entrada.path for entrada in os.scandir(raiz) if entrada.is_dir()]
+    return max(carpetas, key=os.path.getmtime) if carpetas else raiz
@@ -0,0 +1,157 @@
+"""Módulo con la configuración del optimizador: datos técnicos, costes de inversión y ayudas
+
+Los archivos datos_tecnicos.yaml, Datos/inversion.csv y Datos/ayudas.csv se leen una sola vez por proceso
+y se guardan en un objeto inmutable que se pasa a cada cálculo. Si la fecha de modificación de alguno de
+ellos cambia, la siguiente llamada a cargar_configuracion los vuelve a leer.
+
+Los estudios de sensibilidad (ver optimizador.barrido) parten de esta configuración y cambian algunos valores
+con variar_configuracion, que devuelve una copia con otra huella sin modificar la original.
+"""
+import hashlib
+import json
+import os
+
+from dataclasses import dataclass, replace
+from functools import lru_cache
+
+import pandas as pd
+import yaml
+
+ARCHIVOS_CONFIGURACION = ('datos_tecnicos.yaml', 'Datos/inversion.csv', 'Datos/ayudas.csv')
+
+
+class DiccionarioCongelado(dict):
+    """Diccionario de solo lectura. Se serializa en JSON y con pickle igual que un diccionario normal"""
+
+    def _solo_lectura(self, *args, **kwargs):
+        raise TypeError("La configuración es de solo lectura: haga una copia con dict() para modificarla")
+
+    __setitem__ = __delitem__ = __ior__ = _solo_lectura
+    clear = pop = popitem = setdefault = update = _solo_lectura
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
+def congelar(valor):
+    """Copia de solo lectura de un valor leído del yaml: diccionarios y listas anidados
+
+    :param valor: Diccionario, lista o valor simple
+    """
+    if isinstance(valor, dict):
+        return DiccionarioCongelado({clave: congelar(v) for clave, v in valor.items()})
+    if isinstance(valor, (list, tuple)):
+        return tuple(congelar(v) for v in valor)
+    return valor
+
+
+@dataclass(frozen=True)
+class Configuracion:
+    """Datos técnicos, costes de inversión por sistema actual y nuevo, ayudas por sistema nuevo y huella
+    SHA-256 del contenido de cada archivo de configuración"""
+    datos: DiccionarioCongelado
+    inversion: DiccionarioCongelado
+    ayudas: DiccionarioCongelado
+    huellas: tuple
+
+    def coste_inversion(self, actual, nuevo):
+        """Coste de instalación del sistema nuevo cuando se sustituye el actual
+
+        :param actual: Sistema de climatización instalado en la residencia
+        :param nuevo: Sistema de climatización que se estudia
+        """
+        return self.inversion[actual][nuevo]
+
+    def inversion_neta(self, actual, nuevo):
+        """Coste de instalación descontadas las ayudas, nunca negativo
+
+        :param actual: Sistema de climatización instalado en la residencia
+        :param nuevo: Sistema de climatización que se estudia
+        """
+        return max(self.coste_inversion(actual, nuevo) - self.ayudas[nuevo], 0)
+
+
+@lru_cache(maxsize=4)
+def _configuracion_guardada(rutas, marcas):  # pylint: disable=W0613
+    """Lee los archivos de configuración. Las fechas de modificación solo forman parte de la clave
+
+    :param rutas: Rutas absolutas de datos_tecnicos.yaml, inversion.csv y ayudas.csv
+    :param marcas: Fecha de modificación y tamaño de cada archivo
+    """
+    huellas = []
+    for ruta in rutas:
+        with open(ruta, "rb") as f:
+            huellas.append(hashlib.sha256(f.read()).digest())
+    ruta_datos, ruta_inversion, ruta_ayudas = rutas
+    with open(ruta_datos, "r", encoding="utf-8") as f:
+        datos = yaml.safe_load(f)
+    inversion = pd.read_csv(ruta_inversion, sep=';', index_col=0).astype(float)
+    ayudas = pd.read_csv(ruta_ayudas, sep=';').astype(float)
+    return Configuracion(
+        datos=congelar(datos),
+        inversion=congelar({actual: fila.to_dict() for actual, fila in inversion.iterrows()}),
+        ayudas=congelar({nuevo: float(ayudas[nuevo].iloc[0]) for nuevo in ayudas.columns}),
+        huellas=tuple(huellas))
+
+
+def ruta_valor(tabla, ruta):
+    """Claves anidadas de un valor de la configuración indicado como 'Sección.clave'
+
+    Las claves pueden contener puntos ('Aire acondicionado.precio Ud. Interior'): en cada nivel se toma la
+    clave existente más larga.
+
+    :param tabla: Diccionario en el que se busca
+    :param ruta: Claves separadas por puntos
+    """
+    partes = ruta.split('.')
+    claves = []
+    nivel = tabla
+    while partes:
+        for n in range(len(partes), 0, -1):
+            clave = '.'.join(partes[:n])
+            if isinstance(nivel, dict) and clave in nivel:
+                break
+        else:
+            raise KeyError(f"La configuración no contiene {ruta}")
+        claves.append(clave)
+        nivel = nivel[clave]
+        partes = partes[n:]
+    if isinstance(nivel, dict):
+        raise KeyError(f"{ruta} es una sección de la configuración, no un valor")
+    return claves
+
+
+def con_valor(tabla, claves, valor):
+    """Copia de un diccionario anidado con un valor cambiado
+
+    :param tabla: Diccionario original, que no se modifica
+    :param claves: Claves anidadas del valor
+    :param valor: Valor nuevo
+    """
+    copia = dict(tabla)
+    copia[claves[0]] = valor if len(claves) == 1 else con_valor(tabla[claves[0]], claves[1:], valor)
+    return copia
+
+
+def variar_configuracion(configuracion, cambios):
+    """Copia de la configuración con algunos valores cambiados
+
+    :param configuracion: Configuración de partida, que no se modifica
+    :param cambios: Diccionario {ruta: valor}. La ruta es 'Sección.clave' de datos_tecnicos.yaml
+        ('Placas solares.precio'), 'ayudas.<sistema nuevo>' o 'inversion.<sistema actual>.<sistema nuevo>'
+    """
+    tablas = {'datos': configuracion.datos, 'inversion': configuracion.inversion, 'ayudas': configuracion.ayudas}
+    for ruta, valor in cambios.items():
+        tabla, resto = ruta.split('.', 1) if ruta.split('.', 1)[0] in ('inversion', 'ayudas') else ('datos', ruta)
+        tablas[tabla] = con_valor(tablas[tabla], ruta_valor(tablas[tabla], resto), valor)
+    # La huella de los cambios se añade a la de los archivos para que la caché de resultados los distinga
+    texto = json.dumps(cambios, sort_keys=True, default=str, ensure_ascii=False)
+    return replace(configuracion, **{tabla: congelar(valores) for tabla, valores in tablas.items()},
+                   huellas=configuracion.huellas + (hashlib.sha256(texto.encode("utf-8")).digest(),))
+
+
+def cargar_configuracion():
+    """Configuración de la carpeta de trabajo, leída de los archivos solo la primera vez o cuando alguno cambia"""
+    rutas = tuple(os.path.abspath(ruta) for ruta in ARCHIVOS_CONFIGURACION)
+    estados = (os.stat(ruta) for ruta in rutas)
+    return _configuracion_guardada(rutas, tuple((estado.st_mtime_ns, estado.st_size) for estado in estados))
@@ -0,0 +1,188 @@
+"""Módulo para leer los archivos de entrada del optimizador
+
+Las series horarias (precios, cargas, temperatura exterior e irradiación) se leen de archivos .csv o de su
+versión binaria .npy (float64), que se abre con np.load(mmap_mode='r'): el vector devuelto es una vista de
+solo lectura sobre el archivo, sin analizar texto ni copiarlo en memoria. La versión binaria se crea una vez
+con el importador de este módulo:
+    python -m optimizador.entradas precios Datos/Precio_Electrico.csv Datos/Precio_Gas.csv
+    python -m optimizador.entradas cargas cargas.csv
+    python -m optimizador.entradas temperatura Datos/T_exterior.csv
+    python -m optimizador.entradas irradiacion irradiacion.csv
+Cada .csv se convierte en un .npy con el mismo nombre y en la misma carpeta. Al leer un .csv se usa su .npy
+si existe y es más reciente; también se puede indicar directamente la ruta del .npy.
+"""
+import argparse
+import os
+import tempfile
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+EXTENSION_BINARIA = '.npy'
+
+
+def ruta_binaria(ruta):
+    """Ruta del archivo .npy que corresponde a un .csv
+
+    :param ruta: Ruta del archivo .csv
+    """
+    return os.path.splitext(ruta)[0] + EXTENSION_BINARIA
+
+
+def cargar_binario(ruta):
+    """Vista float64 de solo lectura sobre un archivo .npy, sin copiarlo en memoria
+
+    :param ruta: Ruta del archivo .npy
+    """
+    serie = np.load(ruta, mmap_mode='r', allow_pickle=False)
+    if serie.dtype != np.float64:
+        raise ValueError(f"{ruta} no contiene una serie float64 ({serie.dtype})")
+    return serie
+
+
+def leer_serie(ruta, leer_csv):
+    """Serie horaria de un archivo .npy o .csv
+
+    :param ruta: Ruta del archivo .npy o .csv. Si existe un .npy más reciente (o el .csv no existe) con el
+        mismo nombre se lee este
+    :param leer_csv: Función que lee el .csv y devuelve un vector float64
+    """
+    if not ruta.endswith(EXTENSION_BINARIA):
+        binario = ruta_binaria(ruta)
+        if os.path.exists(binario) and (not os.path.exists(ruta)
+                                        or os.path.getmtime(binario) >= os.path.getmtime(ruta)):
+            ruta = binario
+    if ruta.endswith(EXTENSION_BINARIA):
+        return cargar_binario(ruta)
+    return leer_csv(ruta)
+
+
+def precios_csv(ruta):
+    """Precios de un .csv (segunda columna, en €/MWh) en €/kWh
+
+    :param ruta: Ruta del archivo .csv de precios eléctricos o gasistas
+    """
+    return pd.read_csv(ruta, sep=',', usecols=[1]).to_numpy(dtype=float).ravel() / 1000
+
+
+def cargas_csv(ruta):
+    """Cargas térmicas de un .csv: todos sus valores fila a fila
+
+    :param ruta: Ruta del archivo .csv de cargas térmicas
+    """
+    return pd.read_csv(ruta).to_numpy(dtype=float).ravel()
+
+
+def temperatura_csv(ruta):
+    """Temperatura exterior de un .csv (primera columna)
+
+    :param ruta: Ruta del archivo .csv de temperaturas
+    """
+    return pd.read_csv(ruta).iloc[:, 0].to_numpy(dtype=float)
+
+
+def irradiacion_csv(ruta):
+    """Irradiación de un .csv con una columna por agua del tejado, en W/m²
+
+    :param ruta: Ruta del archivo .csv de irradiación
+    """
+    return pd.read_csv(ruta).to_numpy(dtype=float)
+
+
+def leer_precios(ruta):
+    """Lee un archivo de precios horarios y lo devuelve en €/kWh
+
+    :param ruta: Ruta del archivo .csv de precios eléctricos o gasistas (en €/MWh) o de su .npy (en €/kWh)
+    """
+    return leer_serie(ruta, precios_csv)
+
+
+def leer_cargas(ruta):
+    """Lee un archivo de cargas térmicas horarias
+
+    :param ruta: Ruta del archivo .csv o .npy de cargas térmicas
+    """
+    return leer_serie(ruta, cargas_csv)
+
+
+def leer_temperatura(ruta='Datos/T_exterior.csv'):
+    """Lee la temperatura exterior horaria a lo largo de un año
+
+    :param ruta: Ruta del archivo .csv o .npy de temperaturas
+    """
+    return leer_serie(ruta, temperatura_csv)
+
+
+def leer_irradiacion(ruta):
+    """Lee la irradiación incidente en cada agua del tejado, con el mismo formato que calculo_irradiacion
+
+    :param ruta: Ruta del archivo .csv o .npy con una columna por agua
+    """
+    irradiacion = leer_serie(ruta, irradiacion_csv)
+    irradiacion = irradiacion.reshape(len(irradiacion), -1)
+    return pd.DataFrame(irradiacion, columns=[f'cara_{j}' for j in range(irradiacion.shape[1])], copy=False)
+
+
+@lru_cache(maxsize=8)
+def _temperatura_guardada(ruta, modificacion):  # pylint: disable=W0613
+    """Temperatura leída una vez por versión del archivo. La fecha de modificación solo forma parte de la clave
+
+    :param ruta: Ruta absoluta del archivo .csv o .npy de temperaturas
+    :param modificacion: Fecha de modificación del archivo o de su versión binaria, la más reciente
+    """
+    temperatura = leer_temperatura(ruta)
+    temperatura.flags.writeable = False
+    return temperatura
+
+
+def temperatura_exterior(ruta='Datos/T_exterior.csv'):
+    """Temperatura exterior horaria leída del archivo solo la primera vez o cuando el archivo cambia
+
+    El vector devuelto es de solo lectura porque se comparte entre todas las llamadas.
+
+    :param ruta: Ruta del archivo .csv o .npy de temperaturas
+    """
+    ruta = os.path.abspath(ruta)
+    binario = ruta_binaria(ruta)
+    modificacion = max((os.path.getmtime(r) for r in (ruta, binario) if os.path.exists(r)), default=None)
+    return _temperatura_guardada(ruta, modificacion)
+
+
+LECTORES_CSV = {'precios': precios_csv, 'cargas': cargas_csv, 'temperatura': temperatura_csv,
+                'irradiacion': irradiacion_csv}
+
+
+def importar_csv(ruta, tipo):
+    """Convierte un .csv en su versión binaria .npy y devuelve la ruta creada
+
+    :param ruta: Ruta del archivo .csv
+    :param tipo: Tipo de serie: 'precios', 'cargas', 'temperatura' o 'irradiacion'
+    """
+    serie = np.ascontiguousarray(LECTORES_CSV[tipo](ruta), dtype=np.float64)
+    destino = ruta_binaria(ruta)
+    # Se escribe en un temporal y se renombra para que nunca se lea un archivo a medias
+    descriptor, temporal = tempfile.mkstemp(suffix=EXTENSION_BINARIA, dir=os.path.dirname(os.path.abspath(ruta)))
+    with os.fdopen(descriptor, "wb") as f:
+        np.save(f, serie, allow_pickle=False)
+    os.replace(temporal, destino)
+    return destino
+
+
+def main(argumentos=None):
+    """Importador de la línea de comandos
+
+    :param argumentos: Lista de argumentos. Por defecto se toman de sys.argv
+    """
+    parser = argparse.ArgumentParser(description="Convierte series horarias .csv en archivos binarios .npy")
+    parser.add_argument("tipo", choices=sorted(LECTORES_CSV), help="Tipo de serie de los archivos")
+    parser.add_argument("archivos", nargs='+', help="Archivos .csv")
+    args = parser.parse_args(argumentos)
+    for ruta in args.archivos:
+        destino = importar_csv(ruta, args.tipo)
+        print(f"{ruta} -> {destino} ({os.path.getsize(destino) / 1024:.0f} kB)")
+
+
+if __name__ == "__main__":
+    main()
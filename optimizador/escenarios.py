@@ -0,0 +1,417 @@
+"""Módulo para evaluar los sistemas dimensionados frente a miles de trayectorias de precios de la luz y del gas
+
+Uso desde la ruta principal del repositorio:
+    python -m optimizador.escenarios cargas.csv --actual Gas --escenarios 5000 --salida Resultados_escenarios
+
+Cada sistema se dimensiona una sola vez con los precios de partida. Como con los equipos fijados el consumo
+horario de electricidad y de gas no depende del precio, el coste de cada trayectoria es un producto escalar:
+las trayectorias se agrupan en matrices (una fila por trayectoria) y el coste de todos los sistemas en todas
+ellas se obtiene con dos productos de matrices por lote, sin construir ni resolver ningún modelo más.
+
+Las trayectorias se generan con la sección 'Escenarios de precios' de datos_tecnicos.yaml:
+    bootstrap: bloques de varios días de los precios históricos, desplazados como mucho unos días respecto a
+               su fecha para conservar la estacionalidad. La luz y el gas se toman de las mismas horas.
+    ruido:     los precios históricos multiplicados por un factor lognormal independiente en cada hora.
+En los dos métodos cada trayectoria se multiplica además por un nivel anual lognormal de media 1, distinto
+para la luz y para el gas y correlacionado entre ambos.
+
+Con --dimensionado N se resuelve además el modelo estocástico de cada sistema: los equipos son comunes a N
+trayectorias encadenadas, cada una con su operación horaria y peso 1/N en el coste operativo.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from optimizador.configuracion import cargar_configuracion
+from optimizador.entradas import leer_cargas, leer_precios, leer_temperatura
+from optimizador.lotes import irradiacion_vivienda
+from optimizador.parametros_horarios import parametros_horarios
+from optimizador.progreso import informar
+from optimizador.serie_temporal import (HORAS_DIA, ajustar_irradiacion, anios_horizonte, filas_dia, paso_horas,
+                                        peso_periodo)
+from optimizador.sistemas.construccion import mascara_calefaccion, temporadas
+from optimizador.sistemas.estudio_aerotermia import aerotermia_por_partes, optimizar_aerotermia
+from optimizador.sistemas.estudio_aire_acondicionado import optimizar_aire_acondicionado
+from optimizador.sistemas.estudio_completo import SISTEMAS
+from optimizador.sistemas.estudio_conjunto import optimizar_conjunto
+from optimizador.sistemas.estudio_gas import optimizar_gas
+
+# Valores de la sección 'Escenarios de precios' que no figuren en datos_tecnicos.yaml
+OPCIONES_POR_DEFECTO = {'escenarios': 2000, 'metodo': 'bootstrap', 'bloque': 7, 'ventana': 15,
+                        'dispersion anual luz': 0.15, 'dispersion anual gas': 0.20, 'correlacion': 0.6,
+                        'dispersion horaria': 0.10, 'lote': 500, 'semilla': 0}
+METODOS = ('bootstrap', 'ruido')
+# Datos de los equipos que se conservan de cada solución
+EQUIPOS = ('p_gas', 'p_bdc', 'v_dep', 'n_ps')
+
+
+def opciones_escenarios(datos):
+    """Opciones de la sección 'Escenarios de precios' completadas con los valores por defecto
+
+    :param datos: Datos técnicos de los equipos de climatización
+    """
+    opciones = {**OPCIONES_POR_DEFECTO, **(datos.get('Escenarios de precios') or {})}
+    if opciones['metodo'] not in METODOS:
+        raise ValueError(f"Método de escenarios desconocido: {opciones['metodo']}")
+    return opciones
+
+
+def consumo_sistema(nuevo, df, irradiacion, placas, n_ps, aguas, c_i, datos):
+    """Solución de un sistema y electricidad y gas que consume en cada hora del Dataframe
+
+    :param nuevo: Sistema a dimensionar ('Gas', 'Aire acondicionado' o un tipo de aerotermia)
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param placas: Área disponible para las placas solares en cada agua del tejado
+    :param n_ps: Placas ya instaladas en cada agua (solo aire acondicionado)
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param c_i: Coste invariable de la instalacion del nuevo sistema de climatización
+    :param datos: Datos técnicos de los equipos de climatización
+    """
+    luz = np.zeros(len(df))
+    gas = np.zeros(len(df))
+    if nuevo == 'Gas':
+        solucion = optimizar_gas(df, c_i, datos)
+        gas[:] = solucion['q_cg']
+    elif nuevo == 'Aire acondicionado':
+        solucion = optimizar_aire_acondicionado(df, irradiacion, placas, n_ps, aguas, c_i, datos)
+        luz[:] = solucion['e_red']
+    else:
+        # El modelo de aerotermia no opera la primera hora de la serie
+        solucion = optimizar_aerotermia(nuevo, df, irradiacion, placas, aguas, c_i, datos)
+        luz[1:] = solucion['e_red']
+    return solucion, luz, gas
+
+
+def consumos_sistema(nuevo, df, irradiacion, placas, aguas, actual, refri, configuracion=None):
+    """Dimensiona un sistema como calculo_sistema y devuelve sus consumos horarios y su coste de inversión
+
+    :param nuevo: Opción de estudio seleccionado
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param placas: Área disponible para las placas solares en cada agua del tejado
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param actual: Sistema de climatización instalado en la residencia
+    :param refri: Se quiere refrigeración en el sistema
+    :param configuracion: Configuración devuelta por cargar_configuracion. Por defecto la de la carpeta de trabajo
+    :return: Diccionario con los vectores horarios luz y gas, la inversión, su anualidad (inversión de cada
+        equipo entre su ciclo de vida) y los equipos dimensionados. Los consumos de cada fila van multiplicados
+        por peso_periodo, de modo que su producto escalar con los precios es el coste operativo anual
+    """
+    if configuracion is None:
+        configuracion = cargar_configuracion()
+    datos = configuracion.datos
+    irradiacion = ajustar_irradiacion(irradiacion, df)
+    coste = configuracion.coste_inversion(actual, nuevo)
+    luz = np.zeros(len(df))
+    gas = np.zeros(len(df))
+    partes = []
+    coste_aire = configuracion.coste_inversion(actual, 'Aire acondicionado')
+    calefaccion = mascara_calefaccion(df)
+    if refri and nuevo == 'Aerotermia de alta' and not aerotermia_por_partes(df, datos):
+        # Aerotermia, aire acondicionado y placas compartidas en un solo modelo, como en calculo_sistema
+        solucion = optimizar_conjunto(nuevo, df, irradiacion, placas, aguas, coste, coste_aire, datos)
+        # El modelo de aerotermia no opera la primera hora de las de calefacción
+        luz_calefaccion = np.zeros(int(calefaccion.sum()))
+        luz_calefaccion[1:] = solucion['calefaccion']['e_red']
+        luz[calefaccion] = luz_calefaccion
+        luz[~calefaccion] = solucion['refrigeracion']['e_red']
+        partes.extend([(nuevo, solucion['calefaccion']), ('Aire acondicionado', solucion['refrigeracion'])])
+    elif refri and nuevo in ('Gas', 'Aerotermia de alta'):
+        # Calefacción con el sistema nuevo y refrigeración con aire acondicionado, como en calculo_sistema
+        (df_calefaccion, irradiacion_calefaccion), (df_refrigeracion, irradiacion_refrigeracion) = temporadas(
+            df, irradiacion)
+        solucion, luz[calefaccion], gas[calefaccion] = consumo_sistema(
+            nuevo, df_calefaccion, irradiacion_calefaccion, placas, [0]*aguas, aguas, coste, datos)
+        partes.append((nuevo, solucion))
+        n_ps = [0]*aguas if nuevo == 'Gas' else solucion['n_ps']
+        solucion, luz[~calefaccion], gas[~calefaccion] = consumo_sistema(
+            'Aire acondicionado', df_refrigeracion, irradiacion_refrigeracion, placas, n_ps, aguas, coste_aire, datos)
+        # Las placas de la aerotermia ya están pagadas en su inversión
+        solucion = {**solucion, 'capex': solucion['capex'] - datos['Placas solares']['precio'] * np.sum(n_ps)}
+        partes.append(('Aire acondicionado', solucion))
+    else:
+        c_i = configuracion.inversion_neta(actual, nuevo) if nuevo == 'Gas' else coste
+        solucion, luz[:], gas[:] = consumo_sistema(nuevo, df, irradiacion, placas, [0]*aguas, aguas, c_i, datos)
+        partes.append((nuevo, solucion))
+    peso = peso_periodo(df)
+    return {'luz': luz * peso, 'gas': gas * peso,
+            'inversion': sum(float(solucion['capex']) for _, solucion in partes),
+            'anualidad': sum(float(solucion['capex']) / datos['Gas' if nombre == 'Gas' else 'Bomba de calor']
+                             ['Ciclo de vida'] for nombre, solucion in partes),
+            'equipos': {nombre: {clave: np.asarray(solucion[clave]).tolist() for clave in EQUIPOS if clave in solucion}
+                        for nombre, solucion in partes}}
+
+
+def indices_bootstrap(horas, escenarios, rng, bloque, ventana, dia=HORAS_DIA):
+    """Horas históricas de las que se toma el precio de cada hora de cada trayectoria
+
+    El año se divide en bloques de 'bloque' días y cada bloque se copia de otro que empieza a la misma hora
+    del día y como mucho 'ventana' días antes o después.
+
+    :param horas: Número de horas de las trayectorias
+    :param escenarios: Número de trayectorias
+    :param rng: Generador aleatorio de NumPy
+    :param bloque: Días de cada bloque
+    :param ventana: Desfase máximo de cada bloque. Unidades: días
+    :param dia: Filas de cada día (ver optimizador.serie_temporal.filas_dia)
+    :return: Matriz de enteros escenarios x horas
+    """
+    largo = int(bloque) * dia
+    inicios = np.arange(0, horas, largo)
+    desfases = rng.integers(-int(ventana), int(ventana) + 1, size=(escenarios, len(inicios))) * dia
+    ultimo = max(horas - largo, 0) // dia * dia
+    origenes = np.clip(inicios + desfases, 0, ultimo)
+    indices = (origenes[:, :, None] + np.arange(largo)).reshape(escenarios, -1)[:, :horas]
+    return np.minimum(indices, horas - 1)
+
+
+def niveles_anuales(escenarios, rng, opciones):
+    """Factores lognormales de media 1 del nivel anual de la luz y del gas, correlacionados entre sí
+
+    :param escenarios: Número de trayectorias
+    :param rng: Generador aleatorio de NumPy
+    :param opciones: Opciones devueltas por opciones_escenarios
+    """
+    z_luz, z_otro = rng.standard_normal((2, escenarios))
+    rho = float(opciones['correlacion'])
+    z_gas = rho * z_luz + np.sqrt(1 - rho**2) * z_otro
+    sigma_luz = float(opciones['dispersion anual luz'])
+    sigma_gas = float(opciones['dispersion anual gas'])
+    return np.exp(sigma_luz * z_luz - sigma_luz**2 / 2), np.exp(sigma_gas * z_gas - sigma_gas**2 / 2)
+
+
+def trayectorias_precios(precio_luz, precio_gas, escenarios, rng, opciones):
+    """Matrices escenarios x horas con trayectorias de precios de la luz y del gas
+
+    :param precio_luz: Serie horaria de precios eléctricos de partida
+    :param precio_gas: Serie horaria de precios del gas de partida
+    :param escenarios: Número de trayectorias
+    :param rng: Generador aleatorio de NumPy
+    :param opciones: Opciones devueltas por opciones_escenarios
+    """
+    precio_luz = np.asarray(precio_luz, dtype=float)
+    precio_gas = np.asarray(precio_gas, dtype=float)
+    if opciones['metodo'] == 'bootstrap':
+        indices = indices_bootstrap(len(precio_luz), escenarios, rng, opciones['bloque'], opciones['ventana'],
+                                    opciones.get('filas dia', HORAS_DIA))
+        luz, gas = precio_luz[indices], precio_gas[indices]
+    else:
+        sigma = float(opciones['dispersion horaria'])
+        ruido = np.exp(sigma * rng.standard_normal((2, escenarios, len(precio_luz))) - sigma**2 / 2)
+        luz, gas = precio_luz * ruido[0], precio_gas * ruido[1]
+    nivel_luz, nivel_gas = niveles_anuales(escenarios, rng, opciones)
+    luz *= nivel_luz[:, None]
+    gas *= nivel_gas[:, None]
+    return luz, gas
+
+
+def evaluar_trayectorias(consumos, precios_luz, precios_gas):
+    """Coste total anual de cada sistema en cada trayectoria con dos productos de matrices
+
+    :param consumos: Diccionario {sistema: resultado de consumos_sistema}
+    :param precios_luz: Matriz escenarios x horas de precios eléctricos
+    :param precios_gas: Matriz escenarios x horas de precios del gas
+    :return: Matriz escenarios x sistemas
+    """
+    luz = np.column_stack([consumo['luz'] for consumo in consumos.values()])
+    gas = np.column_stack([consumo['gas'] for consumo in consumos.values()])
+    anualidad = np.array([consumo['anualidad'] for consumo in consumos.values()])
+    return precios_luz @ luz + precios_gas @ gas + anualidad
+
+
+def costes_escenarios(consumos, precio_luz, precio_gas, opciones, escenarios=None, semilla=None):
+    """Coste total anual de cada sistema en trayectorias de precios generadas por lotes
+
+    Solo se guarda en memoria un lote de trayectorias a la vez, de modo que el número de trayectorias no
+    está limitado por la memoria.
+
+    :param consumos: Diccionario {sistema: resultado de consumos_sistema}
+    :param precio_luz: Serie horaria de precios eléctricos de partida
+    :param precio_gas: Serie horaria de precios del gas de partida
+    :param opciones: Opciones devueltas por opciones_escenarios
+    :param escenarios: Número de trayectorias. Por defecto el de las opciones
+    :param semilla: Semilla del generador. Por defecto la de las opciones
+    :return: Dataframe con una fila por trayectoria y una columna por sistema
+    """
+    escenarios = int(escenarios or opciones['escenarios'])
+    lote = max(int(opciones['lote']), 1)
+    rng = np.random.default_rng(opciones['semilla'] if semilla is None else semilla)
+    costes = np.empty((escenarios, len(consumos)))
+    for inicio in range(0, escenarios, lote):
+        fin = min(inicio + lote, escenarios)
+        costes[inicio:fin] = evaluar_trayectorias(consumos, *trayectorias_precios(precio_luz, precio_gas,
+                                                                                  fin - inicio, rng, opciones))
+        informar("Escenarios de precios", f"{fin} de {escenarios}")
+    return pd.DataFrame(costes, columns=list(consumos))
+
+
+def resumen_costes(costes, deterministas, percentiles=(5, 50, 95)):
+    """Distribución del coste total anual de cada sistema
+
+    :param costes: Dataframe devuelto por costes_escenarios
+    :param deterministas: Coste total anual de cada sistema con los precios de partida
+    :param percentiles: Percentiles que se incluyen en el resumen
+    """
+    optimo = costes.idxmin(axis=1)
+    resumen = pd.DataFrame({'determinista': pd.Series(deterministas), 'media': costes.mean(),
+                            'desviacion': costes.std()})
+    for p in percentiles:
+        resumen[f'p{p:g}'] = costes.quantile(p / 100)
+    resumen['probabilidad_optimo'] = optimo.value_counts(normalize=True).reindex(costes.columns, fill_value=0.0)
+    resumen.index.name = 'sistema'
+    return resumen
+
+
+def dimensionado_estocastico(nuevo, df, irradiacion, placas, aguas, actual, refri, precios_luz, precios_gas,
+                             configuracion=None):
+    """Dimensiona un sistema para varias trayectorias de precios a la vez
+
+    Las trayectorias se encadenan en un único Dataframe con las cargas y la temperatura repetidas y el precio
+    dividido entre el número de trayectorias, de modo que los equipos son comunes y el coste operativo es la
+    media de las trayectorias. Cada trayectoria tiene su propia operación horaria.
+
+    :param nuevo: Opción de estudio seleccionado
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param placas: Área disponible para las placas solares en cada agua del tejado
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param actual: Sistema de climatización instalado en la residencia
+    :param refri: Se quiere refrigeración en el sistema
+    :param precios_luz: Matriz trayectorias x horas de precios eléctricos
+    :param precios_gas: Matriz trayectorias x horas de precios del gas
+    :param configuracion: Configuración devuelta por cargar_configuracion. Por defecto la de la carpeta de trabajo
+    :return: Resultado de consumos_sistema con el coste total anual de cada trayectoria en 'costes'
+    """
+    n, horas = precios_luz.shape
+    if not refri:
+        # Sin refrigeración las horas de frío no tienen coste, como en parametros_horarios
+        precios_luz = precios_luz * mascara_calefaccion(df)
+    encadenado = pd.concat([df] * n)
+    encadenado.index = pd.date_range(start=df.index[0], freq=pd.Timedelta(hours=paso_horas(df)), periods=n * horas)
+    # Cada trayectoria cubre el horizonte de df: el peso de cada fila no cambia al encadenarlas
+    encadenado.attrs.update(paso=paso_horas(df), anios=anios_horizonte(df))
+    encadenado['precio_luz'] = precios_luz.ravel() / n
+    encadenado['precio_gas'] = precios_gas.ravel() / n
+    irradiacion = np.tile(np.asarray(ajustar_irradiacion(irradiacion, df), dtype=float)[:horas], (n, 1))
+    informar(f"Dimensionado estocástico {nuevo}", f"{n} trayectorias")
+    consumos = consumos_sistema(nuevo, encadenado, irradiacion, placas, aguas, actual, refri, configuracion)
+    consumos['costes'] = ((precios_luz * consumos['luz'].reshape(n, horas)).sum(axis=1) +
+                          (precios_gas * consumos['gas'].reshape(n, horas)).sum(axis=1) + consumos['anualidad'])
+    return consumos
+
+
+def escenarios_sistemas(df, irradiacion, placas, aguas, actual, refri, sistemas=SISTEMAS, precio_luz=None,
+                        precio_gas=None, escenarios=None, dimensionado=0, salida='Resultados_escenarios',
+                        configuracion=None):
+    """Dimensiona cada sistema y evalúa su coste total anual en trayectorias de precios
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param placas: Área disponible para las placas solares en cada agua del tejado
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param actual: Sistema de climatización instalado en la residencia
+    :param refri: Se quiere refrigeración en el sistema
+    :param sistemas: Sistemas que se comparan
+    :param precio_luz: Serie de precios eléctricos de la que se generan las trayectorias. Por defecto la de df,
+        que sin refrigeración tiene a cero las horas de frío
+    :param precio_gas: Serie de precios del gas de la que se generan las trayectorias. Por defecto la de df
+    :param escenarios: Número de trayectorias. Por defecto el de datos_tecnicos.yaml
+    :param dimensionado: Trayectorias del dimensionado estocástico de cada sistema. 0 para no hacerlo
+    :param salida: Carpeta en la que se guardan las tablas
+    :param configuracion: Configuración devuelta por cargar_configuracion. Por defecto la de la carpeta de trabajo
+    :return: Dataframe de costes por trayectoria, Dataframe resumen y, con dimensionado, Dataframe del
+        dimensionado estocástico
+    """
+    if configuracion is None:
+        configuracion = cargar_configuracion()
+    opciones = {**opciones_escenarios(configuracion.datos), 'filas dia': filas_dia(df)}
+    precio_luz = df['precio_luz'].to_numpy(dtype=float) if precio_luz is None else np.asarray(precio_luz, float)
+    precio_gas = df['precio_gas'].to_numpy(dtype=float) if precio_gas is None else np.asarray(precio_gas, float)
+    if len(precio_luz) != len(df) or len(precio_gas) != len(df):
+        raise ValueError("Las series de precios no tienen la longitud de los datos horarios")
+
+    consumos = {}
+    for nuevo in sistemas:
+        informar(f"Escenarios de precios {nuevo}", "dimensionado")
+        consumos[nuevo] = consumos_sistema(nuevo, df, irradiacion, placas, aguas, actual, refri, configuracion)
+        if not refri:
+            consumos[nuevo]['luz'] = consumos[nuevo]['luz'] * mascara_calefaccion(df)
+    deterministas = evaluar_trayectorias(consumos, df['precio_luz'].to_numpy(dtype=float)[None, :],
+                                         df['precio_gas'].to_numpy(dtype=float)[None, :])[0]
+    costes = costes_escenarios(consumos, precio_luz, precio_gas, opciones, escenarios)
+    resumen = resumen_costes(costes, dict(zip(consumos, deterministas)))
+    os.makedirs(salida, exist_ok=True)
+    costes.to_csv(os.path.join(salida, 'costes_escenarios.csv'), index_label='escenario')
+    resumen.to_csv(os.path.join(salida, 'resumen_escenarios.csv'))
+    if not dimensionado:
+        return costes, resumen
+
+    # Trayectorias propias del dimensionado estocástico, distintas de las de la evaluación
+    rng = np.random.default_rng(int(opciones['semilla']) + 1)
+    precios_luz, precios_gas = trayectorias_precios(precio_luz, precio_gas, int(dimensionado), rng, opciones)
+    filas = []
+    for nuevo in sistemas:
+        estocastico = dimensionado_estocastico(nuevo, df, irradiacion, placas, aguas, actual, refri, precios_luz,
+                                               precios_gas, configuracion)
+        # Los equipos deterministas operan igual con cualquier precio: su coste es directo
+        referencia = evaluar_trayectorias({nuevo: consumos[nuevo]}, precios_luz, precios_gas)[:, 0]
+        for nombre, resultado in (('determinista', consumos[nuevo]), ('estocastico', estocastico)):
+            costes_dimensionado = referencia if nombre == 'determinista' else estocastico['costes']
+            filas.append({'sistema': nuevo, 'dimensionado': nombre, 'inversion': resultado['inversion'],
+                          'coste_medio': float(np.mean(costes_dimensionado)),
+                          'coste_maximo': float(np.max(costes_dimensionado)),
+                          'equipos': resultado['equipos']})
+    tabla = pd.DataFrame(filas)
+    tabla.to_csv(os.path.join(salida, 'dimensionado_escenarios.csv'), index=False)
+    return costes, resumen, tabla
+
+
+def main(argumentos=None):
+    """Punto de entrada de la línea de comandos
+
+    :param argumentos: Lista de argumentos. Por defecto se toman de sys.argv
+    """
+    parser = argparse.ArgumentParser(description="Coste de los sistemas dimensionados en trayectorias de precios")
+    parser.add_argument("cargas", help="Archivo de cargas térmicas de la vivienda")
+    parser.add_argument("--actual", required=True, help="Sistema de climatización instalado")
+    parser.add_argument("--sistemas", nargs='+', default=list(SISTEMAS),
+                        choices=[*SISTEMAS, 'Aire acondicionado'], help="Sistemas que se comparan")
+    parser.add_argument("--escenarios", type=int, default=None, help="Trayectorias de precios evaluadas")
+    parser.add_argument("--dimensionado", type=int, default=0,
+                        help="Trayectorias del dimensionado estocástico de cada sistema")
+    parser.add_argument("--refrigeracion", action="store_true", help="La vivienda necesita refrigeración")
+    parser.add_argument("--irradiacion", help="Archivo .csv o .npy con la irradiación de cada agua")
+    parser.add_argument("--latitud", type=float)
+    parser.add_argument("--longitud", type=float)
+    parser.add_argument("--azimut", type=int, default=0)
+    parser.add_argument("--aguas", type=int, default=1)
+    parser.add_argument("--area", help="Área de tejado de cada agua separada por comas")
+    parser.add_argument("--precio-luz", default="Datos/Precio_Electrico.csv", help="Archivo de precios eléctricos")
+    parser.add_argument("--precio-gas", default="Datos/Precio_Gas.csv", help="Archivo de precios del gas")
+    parser.add_argument("--temperatura", default="Datos/T_exterior.csv", help="Archivo de temperatura exterior")
+    parser.add_argument("--salida", default="Resultados_escenarios", help="Carpeta de resultados")
+    args = parser.parse_args(argumentos)
+
+    vivienda = {clave: valor for clave, valor in {'irradiacion': args.irradiacion, 'latitud': args.latitud,
+                                                  'longitud': args.longitud, 'azimut': args.azimut,
+                                                  'aguas': args.aguas, 'area': args.area}.items()
+                if valor is not None}
+    irradiacion, placas, aguas = irradiacion_vivienda(vivienda)
+    precio_luz = leer_precios(args.precio_luz)
+    precio_gas = leer_precios(args.precio_gas)
+    df = parametros_horarios(precio_luz, precio_gas, leer_cargas(args.cargas), args.refrigeracion,
+                             leer_temperatura(args.temperatura))
+    tablas = escenarios_sistemas(df, irradiacion, placas, aguas, args.actual, args.refrigeracion, args.sistemas,
+                                 precio_luz, precio_gas, args.escenarios, args.dimensionado, args.salida)
+    print(f"{len(tablas[0])} trayectorias de precios. Resultados en {args.salida}")
+    print(tablas[1].round(2).to_string())
+    if args.dimensionado:
+        print(tablas[2].drop(columns='equipos').round(2).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
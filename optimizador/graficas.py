@@ -0,0 +1,215 @@
+"""Módulo para generar las gráficas de funcionamiento de cada sistema de climatización
+
+Las gráficas son una etapa posterior al cálculo. El modo se elige con la variable GRAFICAS del archivo .env:
+    inmediato      se dibujan al terminar cada cálculo (comportamiento por defecto)
+    segundo_plano  se dibujan en un proceso aparte mientras el programa continúa
+    diferido       solo se guardan los datos en datos_graficas_<sistema>.csv para dibujarlas más tarde con
+                   python -m optimizador.graficas <carpeta> (por defecto la última carpeta de Resultados)
+    no             no se generan
+matplotlib y seaborn solo se importan cuando de verdad se dibuja.
+"""
+import glob
+import multiprocessing
+import os
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import pandas as pd
+
+from dotenv import load_dotenv
+
+from optimizador.carpetas import ultima_ejecucion
+from optimizador.progreso import informar
+
+MODOS = ('inmediato', 'segundo_plano', 'diferido', 'no')
+
+# Proceso en el que se dibujan las gráficas en modo segundo_plano
+_pool = None
+# Modo que sustituye temporalmente al del archivo .env (ver modo_temporal)
+_modo = None
+
+
+def modo_graficas():
+    """Modo de generación de gráficas definido en el archivo .env o en las variables de entorno"""
+    if _modo is not None:
+        return _modo
+    load_dotenv(dotenv_path=".env")
+    modo = os.getenv("GRAFICAS", "inmediato").strip().lower()
+    if modo not in MODOS:
+        raise ValueError(f"Modo de gráficas desconocido: {modo}. Opciones: {', '.join(MODOS)}")
+    return modo
+
+
+def formato(sistema):
+    """Columnas, color y nombres de archivo de las gráficas de cada sistema
+
+    :param sistema: 'Gas', 'Aire acondicionado' o el tipo de aerotermia
+    """
+    if sistema == 'Gas':
+        return {'total': 'Q_cg', 'horaria': ['Q_cg'], 'mensual': ['Q_cg'], 'color': 'grey', 'ajustar': False,
+                'archivos': ('Todos los datos Gas.png', 'Discriminación horaria gas.png',
+                             'Discriminación mensual Gas.png')}
+    if sistema == 'Aire acondicionado':
+        return {'total': 'Q_ac', 'horaria': ['Q_ac,el', 'Q_ac,ps'], 'mensual': ['Q_ac'], 'color': 'red',
+                'ajustar': False,
+                'archivos': ('Todos los datos Aire acondicionado.png',
+                             'Discriminación horaria Aire acondicionado.png',
+                             'Discriminación mensual Aire acondicionado.png')}
+    return {'total': 'Q_bdc', 'horaria': ['Q_dep', 'Q_bdc,el', 'Q_bdc,ps'], 'mensual': ['Q_bdc'], 'color': None,
+            'ajustar': True,
+            'archivos': (f'Todos los datos {sistema}.png', f'Discriminación horaria {sistema}.png',
+                         f'Discriminación mensual {sistema}.png')}
+
+
+def dibujar_graficas(datos, sistema, carpeta):
+    """Dibuja la energía horaria, la media por hora del día y la media mensual de un sistema
+
+    :param datos: Dataframe con índice horario y las columnas de energía del sistema
+    :param sistema: 'Gas', 'Aire acondicionado' o el tipo de aerotermia
+    :param carpeta: Carpeta en la que se guardan las imágenes
+    """
+    import matplotlib.pyplot as plt  # pylint: disable=C0415
+    import seaborn as sns  # pylint: disable=C0415
+
+    opciones = formato(sistema)
+    color = {'color': opciones['color']} if opciones['color'] else {}
+    todos, horaria, mensual = (os.path.join(carpeta, archivo) for archivo in opciones['archivos'])
+
+    sns.scatterplot(data=datos, x=datos.index, y=opciones['total'], s=9, **color)
+    plt.ylabel('Energia [W·h]')
+    plt.xlabel("Año")
+    plt.savefig(todos)
+    plt.close()
+
+    data = datos.groupby(by=datos.index.hour)[opciones['horaria']].mean()
+    data.reset_index(inplace=True)
+    data = pd.melt(data, id_vars=data.columns[0], value_vars=opciones['horaria'])
+    g = sns.FacetGrid(data, col="variable", sharey=False)
+    g.map(sns.barplot, data.columns[0], "value", **color)
+    g.set_titles(col_template="{col_name}")
+    g.set_axis_labels("Hora del día", "Energia [W·h]")
+    for ax in g.axes.flatten():
+        ax.tick_params(axis='x', labelsize=7)
+        plt.setp(ax.get_xticklabels(), rotation=90)
+    if opciones['ajustar']:
+        g.figure.tight_layout(pad=1)
+    plt.savefig(horaria)
+    plt.close()
+
+    data = datos.groupby(by=datos.index.month)[opciones['mensual']].mean()
+    data.reset_index(inplace=True)
+    data = pd.melt(data, id_vars=data.columns[0], value_vars=opciones['mensual'])
+    g = sns.FacetGrid(data, col="variable", sharey=False)
+    g.map(sns.barplot, data.columns[0], "value", **color)
+    g.set_titles(col_template="{col_name}")
+    g.set_axis_labels("Mes del año", "Energia [W·h]")
+    if opciones['ajustar']:
+        g.figure.tight_layout(pad=1)
+    plt.savefig(mensual)
+    plt.close()
+    informar(f"Gráficas {sistema} guardadas")
+
+
+@contextmanager
+def modo_temporal(modo):
+    """Cambia el modo de gráficas del proceso actual mientras dura el bloque with
+
+    :param modo: Uno de MODOS
+    """
+    global _modo  # pylint: disable=W0603
+    anterior = _modo
+    _modo = modo
+    try:
+        yield
+    finally:
+        _modo = anterior
+
+
+def guardar_datos_graficas(datos, sistema, carpeta):
+    """Guarda los datos necesarios para dibujar las gráficas de un sistema más adelante
+
+    :param datos: Dataframe con índice horario y las columnas de energía del sistema
+    :param sistema: 'Gas', 'Aire acondicionado' o el tipo de aerotermia
+    :param carpeta: Carpeta de resultados
+    """
+    ruta = os.path.join(carpeta, f"datos_graficas_{sistema}.csv")
+    datos.to_csv(ruta, index_label='Fecha')
+    return ruta
+
+
+def graficas_desde_archivo(ruta):
+    """Dibuja las gráficas a partir de un archivo datos_graficas_<sistema>.csv
+
+    :param ruta: Ruta del archivo guardado por guardar_datos_graficas
+    """
+    datos = pd.read_csv(ruta, index_col='Fecha', parse_dates=['Fecha'], float_precision='round_trip')
+    sistema = os.path.basename(ruta)[len("datos_graficas_"):-len(".csv")]
+    dibujar_graficas(datos, sistema, os.path.dirname(ruta))
+
+
+def generar_graficas(datos, sistema, carpeta, modo=None):
+    """Etapa de gráficas de un cálculo según el modo elegido
+
+    :param datos: Dataframe con índice horario y las columnas de energía del sistema
+    :param sistema: 'Gas', 'Aire acondicionado' o el tipo de aerotermia
+    :param carpeta: Carpeta de resultados
+    :param modo: Uno de MODOS. Por defecto se toma de modo_graficas()
+    """
+    modo = modo or modo_graficas()
+    if modo == 'inmediato':
+        dibujar_graficas(datos, sistema, carpeta)
+    elif modo != 'no':
+        return procesar_datos_graficas(guardar_datos_graficas(datos, sistema, carpeta), modo)
+    return None
+
+
+def procesar_datos_graficas(ruta, modo=None):
+    """Etapa de gráficas a partir de datos ya guardados, según el modo elegido
+
+    En los modos inmediato y no el archivo de datos se elimina, igual que si no se hubiera guardado.
+
+    :param ruta: Ruta del archivo guardado por guardar_datos_graficas
+    :param modo: Uno de MODOS. Por defecto se toma de modo_graficas()
+    """
+    global _pool  # pylint: disable=W0603
+    modo = modo or modo_graficas()
+    # Un proceso de trabajo no espera a sus propios procesos al terminar: dentro de él se dibuja directamente
+    if modo == 'segundo_plano' and multiprocessing.parent_process() is not None:
+        modo = 'inmediato'
+    if modo == 'segundo_plano':
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=1)
+        return _pool.submit(graficas_desde_archivo, ruta)
+    if modo == 'inmediato':
+        graficas_desde_archivo(ruta)
+    if modo in ('inmediato', 'no'):
+        os.remove(ruta)
+    return None
+
+
+def esperar_graficas():
+    """Espera a que terminen las gráficas que se están dibujando en segundo plano"""
+    global _pool  # pylint: disable=W0603
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
+
+
+def graficas_carpeta(carpeta):
+    """Dibuja las gráficas de todos los datos guardados en una carpeta de resultados
+
+    :param carpeta: Carpeta de resultados con archivos datos_graficas_<sistema>.csv, en ella o en las
+        subcarpetas de cada sistema
+    """
+    rutas = sorted(glob.glob(os.path.join(glob.escape(carpeta), "**", "datos_graficas_*.csv"), recursive=True))
+    for ruta in rutas:
+        graficas_desde_archivo(ruta)
+    return rutas
+
+
+if __name__ == "__main__":
+    for carpeta_resultados in sys.argv[1:] or [ultima_ejecucion()]:
+        for archivo in graficas_carpeta(carpeta_resultados):
+            print(f"Gráficas generadas para {archivo}")
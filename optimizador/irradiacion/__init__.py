@@ -1,26 +1,79 @@
 """Modúlo para el cálculo de irradiación de un residencia particular"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import pandas as pd
 
-from optimizador.irradiacion.irradiacion import obtener_datos_pvgis
+from optimizador.irradiacion.irradiacion import obtener_datos_pvgis, sesion_pvgis
+from optimizador.metricas import anotar, medido
+from optimizador.serie_temporal import opciones_serie
 
 
-def calculo_irradiacion(latitud, longitud, azimut, aguas):
-    """Calculo de la radiación incidente en cada una de las caras del tejado de la vivienda
+def azimut_caras(azimut, aguas):
+    """Azimut de cada una de las caras del tejado empezando por la principal
 
-    :param latitud: Latitud de la vivienda
-    :param longitud: Longitud de la vivienda
     :param azimut: Azimut de una de las aguas
     :param aguas: nº de aguas de la vivienda
     """
     cont = 0
-    irradiacion = pd.DataFrame()
+    caras = []
     for i in range(aguas):
         cara = azimut+360/aguas*i
         if cara > 180:
             cont += 1
             cara = azimut-360/aguas*(cont)
-        datos_horarios = obtener_datos_pvgis(int(latitud), int(longitud), cara)
-        df_resultado = pd.DataFrame(datos_horarios)  # Unidades: W/m^2
+        caras.append(cara)
+    return caras
+
+
+def orientacion(cara):
+    """Azimut equivalente en el intervalo [-180, 180). Dos caras con la misma orientación dan los mismos datos
+
+    :param cara: Azimut de la cara del tejado
+    """
+    return (cara + 180) % 360 - 180
+
+
+@medido
+def calculo_irradiacion(latitud, longitud, azimut, aguas, concurrencia=4, anio=None):
+    """Calculo de la radiación incidente en cada una de las caras del tejado de la vivienda
+
+    Las caras se descargan a la vez con una sesión HTTP compartida y las que tienen la misma orientación
+    solo se consultan una vez.
+
+    :param latitud: Latitud de la vivienda
+    :param longitud: Longitud de la vivienda
+    :param azimut: Azimut de una de las aguas
+    :param aguas: nº de aguas de la vivienda
+    :param concurrencia: Número máximo de descargas simultáneas
+    :param anio: Año de la serie horaria de PVGIS. Por defecto el de la sección Serie temporal
+    """
+    if anio is None:
+        anio = opciones_serie()['anio irradiacion']
+    caras = azimut_caras(azimut, aguas)
+    consultas = {}
+    for cara in caras:
+        consultas.setdefault(orientacion(cara), cara)
+    anotar(aguas=aguas, consultas=len(consultas))
+
+    datos, errores = {}, {}
+    sesion = sesion_pvgis(conexiones=concurrencia)
+    with sesion, ThreadPoolExecutor(max_workers=max(1, min(concurrencia, len(consultas)))) as pool:
+        futuros = {pool.submit(obtener_datos_pvgis, int(latitud), int(longitud), cara, sesion=sesion,
+                               anio=anio): clave
+                   for clave, cara in consultas.items()}
+        for futuro in as_completed(futuros):
+            try:
+                datos[futuros[futuro]] = futuro.result()
+            except Exception as e:  # pylint: disable=W0718
+                errores[futuros[futuro]] = e
+    if errores:
+        detalle = "; ".join(f"cara_{i} (azimut {cara}º): {errores[orientacion(cara)]}"
+                            for i, cara in enumerate(caras) if orientacion(cara) in errores)
+        raise ConnectionError(f"No se pudo obtener la irradiación de PVGIS. {detalle}")
+
+    irradiacion = pd.DataFrame()
+    for i, cara in enumerate(caras):
+        df_resultado = pd.DataFrame(datos[orientacion(cara)])  # Unidades: W/m^2
         irradiacion.insert(i, f'cara_{i}', df_resultado['Gb(i)'] + df_resultado['Gd(i)'] + df_resultado['Gr(i)'])
     # resultado.to_csv(r'C:\Users\mnbay\Desktop\PVGIS.csv', index=False)
     return irradiacion
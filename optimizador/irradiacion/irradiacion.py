@@ -1,20 +1,94 @@
 """Módulo pra el cálculo de la radiación incidente horaria durante un año"""
+import os
+import tempfile
+
+import numpy as np
 import requests
 
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from optimizador.cache import clave_cache, desalojar, marcar_uso, ruta_cache
+
+URL_PVGIS = "https://re.jrc.ec.europa.eu/api/seriescalc"
+
+
+def sesion_pvgis(conexiones=4, reintentos=3, espera=0.5):
+    """Sesión HTTP con un conjunto de conexiones reutilizables y reintentos con espera exponencial
+
+    :param conexiones: Número máximo de conexiones simultáneas con el servidor
+    :param reintentos: Número de reintentos ante errores de conexión o respuestas 429/5xx
+    :param espera: Factor de espera entre reintentos en segundos (0.5, 1, 2...)
+    """
+    reintento = Retry(total=reintentos, backoff_factor=espera, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=("GET",), raise_on_status=False)
+    adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=conexiones, max_retries=reintento)
+    sesion = requests.Session()
+    sesion.mount("http://", adaptador)
+    sesion.mount("https://", adaptador)
+    return sesion
+
+
+def configuracion_cache():
+    """Carpeta, tamaño máximo y modo sin conexión de la caché de PVGIS definidos en el archivo .env"""
+    load_dotenv(dotenv_path=".env")
+    carpeta = os.getenv("CACHE_PVGIS", os.path.join(".cache", "pvgis"))
+    limite = float(os.getenv("CACHE_PVGIS_MB", "200")) * 1024 ** 2
+    sin_conexion = os.getenv("PVGIS_SIN_CONEXION", "0").lower() in ("1", "true", "si", "sí")
+    return carpeta, limite, sin_conexion
+
 
-def obtener_datos_pvgis(lat, lon, azimut):
+def leer_cache(ruta):
+    """Lee una descarga guardada en la caché como un diccionario de columnas
+
+    :param ruta: Ruta del archivo .npz de la entrada
+    """
+    with np.load(ruta, allow_pickle=False) as archivo:
+        datos = {columna: archivo[columna] for columna in archivo.files}
+    marcar_uso(ruta)
+    return datos
+
+
+def guardar_cache(ruta, horario):
+    """Guarda por columnas en formato binario comprimido la serie horaria descargada de PVGIS
+
+    :param ruta: Ruta del archivo .npz de la entrada
+    :param horario: Lista de diccionarios con los datos horarios devueltos por la API
+    """
+    columnas = {columna: np.array([fila[columna] for fila in horario]) for columna in horario[0]}
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    # Se escribe en un temporal y se renombra para que otro proceso nunca lea una entrada a medias
+    descriptor, temporal = tempfile.mkstemp(suffix=".npz", dir=os.path.dirname(ruta))
+    with os.fdopen(descriptor, "wb") as f:
+        np.savez_compressed(f, **columnas)
+    os.replace(temporal, ruta)
+    return columnas
+
+
+def obtener_datos_pvgis(lat, lon, azimut, sin_conexion=None, sesion=None, anio=2023):
     """Función para la descargar datos de PVGIS vía API
 
+    Las descargas se guardan en una caché local identificada por todos los parámetros de la consulta, de
+    modo que repetir el cálculo para el mismo emplazamiento no vuelve a acceder a la red.
+
     :param lat: Latitud de la vivienda
     :param lon: Longitud de la vivienda
     :param azimut: Azimut de una de las aguas
+    :param sin_conexion: Si es True solo se lee la caché. Por defecto se toma PVGIS_SIN_CONEXION del .env
+    :param sesion: Sesión HTTP con la que se hace la consulta. Por defecto se crea una con reintentos
+    :param anio: Año de la serie horaria de PVGIS
+    :return: Diccionario con una columna por cada magnitud horaria de PVGIS
     """
-    url = "https://re.jrc.ec.europa.eu/api/seriescalc"
+    carpeta, limite, sin_conexion_env = configuracion_cache()
+    if sin_conexion is None:
+        sin_conexion = sin_conexion_env
+    url = os.getenv("PVGIS_URL", URL_PVGIS)
     params = {
         "lat": lat,
         "lon": lon,
-        "startyear": 2023,
-        "endyear": 2023,
+        "startyear": int(anio),
+        "endyear": int(anio),
         "outputformat": "json",
         "angle": 37,  # si decidiera yo la inclinación
         "aspect": azimut,
@@ -28,14 +102,20 @@ def obtener_datos_pvgis(lat, lon, azimut):
         "hourly": 1
     }
 
-    response = requests.get(url, params=params, timeout=10)
-
-    if response.status_code == 200:
-        data = response.json()
-        # En el supuesto de que optimice inclinación:
-        # angle_optimo = data["inputs"]["mounting_system"]["fixed"]["slope"]["value"]
-        return data["outputs"]["hourly"]
+    ruta = ruta_cache(carpeta, clave_cache(url, params), ".npz")
+    if os.path.exists(ruta):
+        return leer_cache(ruta)
+    if sin_conexion:
+        raise ConnectionError(f"Modo sin conexión: no hay datos de PVGIS en caché para {params}")
 
-    else:
-        print(f"Error en la solicitud: {response.status_code}")
-        return None
+    if sesion is None:
+        sesion = sesion_pvgis(conexiones=1)
+    response = sesion.get(url, params=params, timeout=10)
+    # Si tras los reintentos la respuesta sigue sin ser correcta se lanza requests.HTTPError
+    response.raise_for_status()
+    data = response.json()
+    # En el supuesto de que optimice inclinación:
+    # angle_optimo = data["inputs"]["mounting_system"]["fixed"]["slope"]["value"]
+    datos = guardar_cache(ruta, data["outputs"]["hourly"])
+    desalojar(carpeta, limite)
+    return datos
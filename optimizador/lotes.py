@@ -0,0 +1,227 @@
+"""Módulo para optimizar en lote varias viviendas sin interfaz gráfica
+
+Uso desde la ruta principal del repositorio:
+    python -m optimizador.lotes viviendas.csv --salida Resultados_lote --procesos 4
+
+El manifiesto es un .csv con una fila por vivienda y las columnas:
+    id, cargas, actual, nuevo                       (obligatorias)
+    refrigeracion, latitud, longitud, azimut, aguas, area, irradiacion   (opcionales)
+La columna area contiene el área de tejado de cada agua separada por comas, igual que en la interfaz
+(por ejemplo "62,98,62,98"). La columna irradiacion es la ruta de un .csv o .npy con la irradiación ya
+calculada, una columna por agua (ver optimizador.entradas); si se indica no se usan latitud, longitud, azimut
+ni aguas. Si no se indica latitud ni irradiacion la vivienda se estudia sin placas solares.
+"""
+import argparse
+import os
+import traceback
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from optimizador import inicio_optimizacion
+from optimizador.entradas import leer_cargas, leer_irradiacion, leer_precios, leer_temperatura
+from optimizador.graficas import MODOS, esperar_graficas
+from optimizador.irradiacion import calculo_irradiacion
+
+COLUMNAS_OBLIGATORIAS = ('id', 'cargas', 'actual', 'nuevo')
+# Variables de entorno que fija iniciar_proceso en cada proceso de trabajo
+VARIABLES_PROCESO = ('MPLBACKEND', 'GRAFICAS')
+
+# Datos comunes a todas las viviendas, se cargan una vez por proceso de trabajo
+_comunes = {}
+
+
+def leer_manifiesto(ruta):
+    """Lee el manifiesto de viviendas y lo devuelve como una lista de diccionarios
+
+    :param ruta: Ruta del archivo .csv del manifiesto. Las rutas de cargas e irradiación relativas se toman
+        desde su carpeta
+    """
+    manifiesto = pd.read_csv(ruta, dtype={'id': str, 'area': str, 'cargas': str, 'irradiacion': str})
+    faltan = [c for c in COLUMNAS_OBLIGATORIAS if c not in manifiesto.columns]
+    if faltan:
+        raise ValueError(f"Faltan columnas en el manifiesto {ruta}: {', '.join(faltan)}")
+    repetidos = manifiesto['id'][manifiesto['id'].duplicated()].unique()
+    if len(repetidos):
+        raise ValueError(f"Identificadores repetidos en el manifiesto {ruta}: {', '.join(repetidos)}")
+    carpeta = os.path.dirname(os.path.abspath(ruta))
+    viviendas = []
+    for fila in manifiesto.to_dict('records'):
+        vivienda = {clave: valor for clave, valor in fila.items() if not pd.isna(valor)}
+        vivienda['cargas'] = os.path.join(carpeta, vivienda['cargas'])
+        if 'irradiacion' in vivienda:
+            vivienda['irradiacion'] = os.path.join(carpeta, vivienda['irradiacion'])
+        viviendas.append(vivienda)
+    return viviendas
+
+
+def datos_comunes(precio_luz, precio_gas, temperatura):
+    """Carga una sola vez los precios y la temperatura exterior que comparten todas las viviendas
+
+    :param precio_luz: Ruta del archivo de precios eléctricos
+    :param precio_gas: Ruta del archivo de precios del gas
+    :param temperatura: Ruta del archivo de temperatura exterior
+    """
+    return {
+        'precio_luz': leer_precios(precio_luz),
+        'precio_gas': leer_precios(precio_gas),
+        't_exterior': leer_temperatura(temperatura)
+    }
+
+
+@contextmanager
+def entorno_restaurado(nombres):
+    """Devuelve las variables de entorno a su valor anterior al salir del bloque with
+
+    Con un solo proceso la preparación de los procesos de trabajo se ejecuta en el del llamador, que recupera
+    su entorno al terminar.
+
+    :param nombres: Nombres de las variables
+    """
+    anteriores = {nombre: os.environ.get(nombre) for nombre in nombres}
+    try:
+        yield
+    finally:
+        for nombre, valor in anteriores.items():
+            if valor is None:
+                os.environ.pop(nombre, None)
+            else:
+                os.environ[nombre] = valor
+
+
+def iniciar_proceso(comunes, graficas):
+    """Prepara un proceso de trabajo: guarda los datos comunes y el modo de gráficas, sin pantalla
+
+    :param comunes: Diccionario devuelto por datos_comunes
+    :param graficas: Modo de gráficas (ver optimizador.graficas)
+    """
+    os.environ['MPLBACKEND'] = 'Agg'
+    os.environ['GRAFICAS'] = graficas
+    _comunes.clear()
+    _comunes.update(comunes)
+
+
+def texto(valor):
+    """Convierte un valor del resultado en texto para la tabla agregada
+
+    :param valor: Valor del diccionario de resultados
+    """
+    if isinstance(valor, np.ndarray):
+        return ','.join(str(v) for v in np.round(valor.astype(float), 2))
+    return valor
+
+
+def irradiacion_vivienda(vivienda):
+    """Irradiación, área de tejado de cada agua y número de aguas de una vivienda
+
+    :param vivienda: Diccionario con las columnas irradiacion o latitud, longitud, azimut, aguas y area del
+        manifiesto. Sin irradiacion ni latitud la vivienda no tiene placas solares
+    """
+    if 'irradiacion' in vivienda:
+        irradiacion = leer_irradiacion(vivienda['irradiacion'])
+        return irradiacion, [int(x) for x in str(vivienda['area']).split(',')], irradiacion.shape[1]
+    if 'latitud' in vivienda:
+        aguas = int(vivienda.get('aguas', 1))
+        irradiacion = calculo_irradiacion(vivienda['latitud'], vivienda['longitud'], int(vivienda.get('azimut', 0)),
+                                          aguas)
+        return irradiacion, [int(x) for x in str(vivienda['area']).split(',')], aguas
+    return pd.DataFrame({'cara_0': [0]*8760}), [0], 1
+
+
+def optimizar_vivienda(vivienda, salida):
+    """Optimiza una vivienda del manifiesto y guarda sus resultados en su propia carpeta
+
+    :param vivienda: Diccionario con una fila del manifiesto
+    :param salida: Carpeta donde se crea una subcarpeta por vivienda
+    :return: Fila de la tabla agregada. Los errores se recogen en la fila en lugar de detener el lote
+    """
+    carpeta = os.path.join(salida, str(vivienda['id']))
+    fila = {'id': vivienda['id'], 'nuevo': vivienda['nuevo'], 'carpeta': carpeta}
+    try:
+        irradiacion, placas, aguas = irradiacion_vivienda(vivienda)
+        refri = str(vivienda.get('refrigeracion', '')).strip().lower() in ('1', 'true', 'si', 'sí')
+        resultado = inicio_optimizacion(_comunes['precio_luz'], _comunes['precio_gas'],
+                                        leer_cargas(vivienda['cargas']), refri, irradiacion, placas,
+                                        vivienda['actual'], vivienda['nuevo'], aguas,
+                                        t_exterior=_comunes['t_exterior'], carpeta=carpeta, procesos=1)
+        if not isinstance(resultado, dict):
+            raise ValueError(resultado)
+        fila['estado'] = 'correcto'
+        fila.update({clave: texto(valor) for clave, valor in resultado.items()})
+    except Exception as e:  # pylint: disable=W0718
+        fila['estado'] = 'error'
+        fila['error'] = f"{type(e).__name__}: {e}"
+        os.makedirs(carpeta, exist_ok=True)
+        with open(os.path.join(carpeta, 'error.txt'), "w", encoding="utf-8") as f:
+            f.write(traceback.format_exc())
+    return fila
+
+
+def optimizar_lote(manifiesto, salida='Resultados_lote', precio_luz='Datos/Precio_Electrico.csv',
+                   precio_gas='Datos/Precio_Gas.csv', temperatura='Datos/T_exterior.csv', procesos=None,
+                   graficas='diferido'):
+    """Optimiza todas las viviendas de un manifiesto y escribe una tabla con los resultados agregados
+
+    :param manifiesto: Ruta del manifiesto .csv o lista de diccionarios con las viviendas
+    :param salida: Carpeta de resultados. Cada vivienda se guarda en salida/<id> y la tabla en salida/resultados.csv
+    :param precio_luz: Ruta del archivo de precios eléctricos común a todas las viviendas
+    :param precio_gas: Ruta del archivo de precios del gas común a todas las viviendas
+    :param temperatura: Ruta del archivo de temperatura exterior común a todas las viviendas
+    :param procesos: Número de viviendas que se optimizan a la vez. Por defecto uno por núcleo
+    :param graficas: Modo de gráficas de cada vivienda. Por defecto solo se guardan sus datos
+    :return: Dataframe con una fila por vivienda
+    """
+    viviendas = leer_manifiesto(manifiesto) if isinstance(manifiesto, (str, os.PathLike)) else list(manifiesto)
+    comunes = datos_comunes(precio_luz, precio_gas, temperatura)
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+    os.makedirs(salida, exist_ok=True)
+
+    if procesos <= 1:
+        with entorno_restaurado(VARIABLES_PROCESO):
+            iniciar_proceso(comunes, graficas)
+            filas = [optimizar_vivienda(vivienda, salida) for vivienda in viviendas]
+            esperar_graficas()
+    else:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=iniciar_proceso,
+                                 initargs=(comunes, graficas)) as pool:
+            filas = list(pool.map(optimizar_vivienda, viviendas, [salida]*len(viviendas)))
+
+    resultados = pd.DataFrame(filas)
+    # El error y la carpeta de cada vivienda se dejan al final de la tabla
+    resultados = resultados.reindex(columns=[c for c in resultados.columns if c not in ('error', 'carpeta')] +
+                                    ['error', 'carpeta'])
+    resultados.to_csv(os.path.join(salida, 'resultados.csv'), index=False)
+    return resultados
+
+
+def main(argumentos=None):
+    """Punto de entrada de la línea de comandos
+
+    :param argumentos: Lista de argumentos. Por defecto se toman de sys.argv
+    """
+    parser = argparse.ArgumentParser(description="Optimización económica en lote de varias viviendas")
+    parser.add_argument("manifiesto", help="Archivo .csv con una fila por vivienda")
+    parser.add_argument("--salida", default="Resultados_lote", help="Carpeta de resultados")
+    parser.add_argument("--precio-luz", default="Datos/Precio_Electrico.csv", help="Archivo de precios eléctricos")
+    parser.add_argument("--precio-gas", default="Datos/Precio_Gas.csv", help="Archivo de precios del gas")
+    parser.add_argument("--temperatura", default="Datos/T_exterior.csv", help="Archivo de temperatura exterior")
+    parser.add_argument("--procesos", type=int, default=None, help="Viviendas optimizadas a la vez")
+    parser.add_argument("--graficas", choices=MODOS, default="diferido",
+                        help="Modo de gráficas. Con 'diferido' se dibujan después con python -m optimizador.graficas")
+    args = parser.parse_args(argumentos)
+    resultados = optimizar_lote(args.manifiesto, args.salida, args.precio_luz, args.precio_gas,
+                                args.temperatura, args.procesos, args.graficas)
+    errores = resultados[resultados['estado'] == 'error']
+    print(f"{len(resultados) - len(errores)} de {len(resultados)} viviendas optimizadas. "
+          f"Resultados en {os.path.join(args.salida, 'resultados.csv')}")
+    for _, fila in errores.iterrows():
+        print(f"  {fila['id']}: {fila['error']}")
+    return 1 if len(errores) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
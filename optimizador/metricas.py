@@ -0,0 +1,219 @@
+"""Módulo para medir el tiempo, la memoria y el solver de cada etapa del cálculo
+
+Cada etapa medida (inicio_optimizacion, parametros_horarios, calculo_irradiacion, calculo_*, construcción de los
+modelos y solver) produce una métrica: un diccionario con la etapa, la etapa que la contiene, el tiempo de reloj
+y de CPU, la memoria residente máxima del proceso hasta ese momento y los campos propios de la etapa (sistema,
+tamaño del modelo, estado del solver, gap, nodos...). Las métricas se envían al sumidero registrado con
+registrar_sumidero o, si no hay ninguno, se añaden como líneas JSON al archivo indicado en el archivo .env.
+
+Variables opcionales del archivo .env:
+    METRICAS          archivo .jsonl en el que se añade una línea por etapa. Sin valor no se mide nada
+    PERFILES          carpeta en la que se guarda un perfil de cProfile (.prof) de cada etapa perfilada
+    PERFILES_ETAPAS   etapas que se perfilan separadas por comas. Por defecto todas (solo la más externa
+                      si se anidan, porque cProfile no admite dos perfiles a la vez)
+En lugar de cProfile se puede usar otro perfilador, por ejemplo uno de muestreo, con registrar_perfilador.
+
+Resumen de un archivo de métricas desde la ruta principal del repositorio:
+    python -m optimizador.metricas metricas.jsonl
+"""
+import argparse
+import cProfile
+import json
+import os
+import time
+
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from functools import wraps
+
+import pandas as pd
+
+from dotenv import load_dotenv
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Función que recibe cada métrica. Sin sumidero registrado se usa el archivo METRICAS del .env
+_sumidero = None
+# Función que recibe el nombre de la etapa y devuelve un gestor de contexto que la perfila, o None
+_perfilador = None
+# Métricas de las etapas en curso, de la más externa a la más interna
+_pila = []
+_perfil_activo = False
+
+
+def registrar_sumidero(sumidero):
+    """Registra la función que recibe las métricas del proceso actual
+
+    :param sumidero: Función con un argumento (diccionario de la métrica) o None para volver al archivo del .env
+    """
+    global _sumidero  # pylint: disable=W0603
+    _sumidero = sumidero
+
+
+def registrar_perfilador(perfilador):
+    """Registra el perfilador de las etapas del proceso actual
+
+    :param perfilador: Función que recibe el nombre de la etapa y devuelve un gestor de contexto que la perfila
+        (o None para no perfilarla). Con None se vuelve a cProfile según el .env
+    """
+    global _perfilador  # pylint: disable=W0603
+    _perfilador = perfilador
+
+
+def escribir_linea(ruta, metrica):
+    """Añade una métrica como línea JSON al final de un archivo
+
+    :param ruta: Ruta del archivo .jsonl
+    :param metrica: Diccionario de la métrica
+    """
+    carpeta = os.path.dirname(ruta)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    # Una sola escritura por línea para que los procesos de trabajo no mezclen sus métricas
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write(json.dumps(metrica, ensure_ascii=False, default=str) + "\n")
+
+
+def sumidero_actual():
+    """Función que recibe las métricas o None si no se mide nada"""
+    if _sumidero is not None:
+        return _sumidero
+    load_dotenv(dotenv_path=".env")
+    ruta = os.getenv("METRICAS", "").strip()
+    return (lambda metrica: escribir_linea(ruta, metrica)) if ruta else None
+
+
+def metricas_activas():
+    """Indica si hay un sumidero de métricas. Sirve para no calcular campos costosos cuando no se miden"""
+    return sumidero_actual() is not None
+
+
+def memoria_maxima():
+    """Memoria residente máxima del proceso en MB, o None si el sistema operativo no la da"""
+    # En Linux ru_maxrss se hereda del proceso padre; VmHWM empieza de cero en cada proceso
+    if os.path.exists('/proc/self/status'):
+        with open('/proc/self/status', encoding='utf-8') as f:
+            for linea in f:
+                if linea.startswith('VmHWM:'):
+                    return int(linea.split()[1]) / 1024
+    if resource is not None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return None
+
+
+@contextmanager
+def perfil_cprofile(etapa, carpeta):
+    """Perfila una etapa con cProfile y guarda el perfil en la carpeta
+
+    :param etapa: Nombre de la etapa
+    :param carpeta: Carpeta de los archivos .prof
+    """
+    global _perfil_activo  # pylint: disable=W0603
+    os.makedirs(carpeta, exist_ok=True)
+    perfil = cProfile.Profile()
+    _perfil_activo = True
+    perfil.enable()
+    try:
+        yield
+    finally:
+        perfil.disable()
+        _perfil_activo = False
+        marca = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        perfil.dump_stats(os.path.join(carpeta, f"{etapa}_{os.getpid()}_{marca}.prof"))
+
+
+def perfil_etapa(etapa):
+    """Gestor de contexto que perfila la etapa según el perfilador registrado o el .env
+
+    :param etapa: Nombre de la etapa
+    """
+    if _perfilador is not None:
+        return _perfilador(etapa) or nullcontext()
+    carpeta = os.getenv("PERFILES", "").strip()
+    etapas = [e.strip() for e in os.getenv("PERFILES_ETAPAS", "").split(",") if e.strip()]
+    if not carpeta or _perfil_activo or (etapas and etapa not in etapas):
+        return nullcontext()
+    return perfil_cprofile(etapa, carpeta)
+
+
+@contextmanager
+def medir(etapa, **campos):
+    """Mide el bloque with como una etapa y envía su métrica al terminar, también si termina con un error
+
+    :param etapa: Nombre de la etapa
+    :param campos: Campos propios de la etapa. El bloque puede añadir más al diccionario que devuelve
+    """
+    sumidero = sumidero_actual()
+    metrica = {'etapa': etapa, **campos}
+    if sumidero is None:
+        with perfil_etapa(etapa):
+            yield metrica
+        return
+    metrica.update({'padre': _pila[-1]['etapa'] if _pila else None, 'pid': os.getpid(),
+                    'inicio': datetime.now().isoformat(timespec='milliseconds')})
+    _pila.append(metrica)
+    reloj, cpu = time.perf_counter(), time.process_time()
+    try:
+        with perfil_etapa(etapa):
+            yield metrica
+    except BaseException as e:
+        metrica['error'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        metrica['segundos'] = time.perf_counter() - reloj
+        metrica['cpu_segundos'] = time.process_time() - cpu
+        metrica['rss_max_mb'] = memoria_maxima()
+        _pila.pop()
+        sumidero(metrica)
+
+
+def medido(funcion):
+    """Decorador que mide cada llamada a la función como una etapa con su nombre
+
+    :param funcion: Función medida
+    """
+    @wraps(funcion)
+    def envoltura(*args, **kwargs):
+        with medir(funcion.__name__):
+            return funcion(*args, **kwargs)
+    return envoltura
+
+
+def anotar(**campos):
+    """Añade campos a la métrica de la etapa en curso más interna. Sin etapas medidas no hace nada
+
+    :param campos: Campos de la métrica
+    """
+    if _pila:
+        _pila[-1].update(campos)
+
+
+def resumen_metricas(ruta):
+    """Tiempo total, medio y máximo y memoria máxima de cada etapa de un archivo de métricas
+
+    :param ruta: Archivo .jsonl escrito por el sumidero por defecto
+    """
+    tabla = pd.read_json(ruta, lines=True)
+    agrupado = tabla.groupby(['etapa', *(['sistema'] if 'sistema' in tabla.columns else [])], dropna=False)
+    return agrupado.agg(llamadas=('segundos', 'size'), total_s=('segundos', 'sum'), medio_s=('segundos', 'mean'),
+                        maximo_s=('segundos', 'max'), rss_max_mb=('rss_max_mb', 'max')
+                        ).sort_values('total_s', ascending=False)
+
+
+def main(argumentos=None):
+    """Punto de entrada de la línea de comandos
+
+    :param argumentos: Lista de argumentos. Por defecto se toman de sys.argv
+    """
+    parser = argparse.ArgumentParser(description="Resumen por etapa de un archivo de métricas")
+    parser.add_argument("metricas", help="Archivo .jsonl de métricas")
+    args = parser.parse_args(argumentos)
+    print(resumen_metricas(args.metricas).round(3).to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,31 +1,70 @@
 """Módulo que prepara un dataframe con los parametros que entran en el solver"""
-import os
-import shutil
+import numpy as np
 import pandas as pd
 
+from pandas.tseries.frequencies import to_offset
 
-def parametros_horarios(precio_luz, precio_gas, cargas, refrigeracion):
+from optimizador.entradas import temperatura_exterior
+from optimizador.metricas import anotar, medido
+from optimizador.progreso import informar
+from optimizador.serie_temporal import ajustar_serie, anios_horizonte, opciones_serie, repeticiones_hora
+
+# Tipo de la columna climatizacion: un byte por hora en lugar de una cadena
+CLIMATIZACION = pd.CategoricalDtype(['Calefaccion', 'Refrigeracion'])
+
+
+def columna_climatizacion(calefaccion):
+    """Columna climatizacion a partir de la máscara de horas con calefacción
+
+    :param calefaccion: Vector booleano, True en las horas con calefacción
+    """
+    codigos = np.where(np.asarray(calefaccion, dtype=bool), 0, 1).astype(np.int8)
+    return pd.Categorical.from_codes(codigos, dtype=CLIMATIZACION)
+
+
+@medido
+def parametros_horarios(precio_luz, precio_gas, cargas, refrigeracion, t_exterior=None, opciones=None):
     """Adaptación de los datos a un único Dataframe
 
+    Cada serie puede tener el paso de la sección Serie temporal o ser horaria, y con anios > 1 las series de un
+    año se repiten cada año (ver optimizador.serie_temporal).
+
     :param precio_luz: Datos de precios eléctricos cargados en el script principal
     :param precio_gas: Datos de precios de gas cargados en el script principal
     :param cargas: Datos de cargas térmicas cargados en el script principal
-    :param refri: Booleano con el resultado de la casilla refrigeracion del script principal
+    :param refrigeracion: Booleano con el resultado de la casilla refrigeracion del script principal
+    :param t_exterior: Temperatura exterior horaria. Si no se indica se lee de Datos/T_exterior.csv
+    :param opciones: Opciones de la serie temporal. Por defecto las de opciones_serie
     """
-    # Creo la carpeta de resultados
-    if os.path.exists('Resultados'):
-        shutil.rmtree('Resultados')
-    os.makedirs('Resultados', exist_ok=True)
-
-    # Importo los .csv dle script principal y los agrupo en un mismo DataFrame
-    df = pd.DataFrame({'precio_luz': precio_luz, 'precio_gas': precio_gas, 'cargas': cargas})
-    # Importo la que va a ser la temperatura exterior a lo largo de un año
-    df['T_exterior'] = pd.read_csv('Datos/T_exterior.csv')
-    # Introduzco un índice con todas las horas del año 2023 (8760 horas)
-    df.index = pd.date_range(start='01-01-2023', freq='h', periods=8760)
-    # Genero columna auxiliar para saber si necesito calefacción o refrigeración
-    df["climatizacion"] = df["cargas"].apply(lambda x: "Calefaccion" if x >= 0 else "Refrigeracion")
+    series = {'precio_luz': np.asarray(precio_luz, dtype=float),
+              'precio_gas': np.asarray(precio_gas, dtype=float),
+              'cargas': np.asarray(cargas, dtype=float),
+              # Importo la que va a ser la temperatura exterior a lo largo de un año
+              'T_exterior': np.asarray(temperatura_exterior() if t_exterior is None else t_exterior, dtype=float)}
+    if opciones is None:
+        opciones = opciones_serie()
+    paso = float(opciones['paso'])
+    filas = int(opciones['anios']) * max(len(serie) for serie in series.values())
+    try:
+        series = {nombre: ajustar_serie(serie, filas, repeticiones_hora(paso), int(opciones['anios']))
+                  for nombre, serie in series.items()}
+    except ValueError as e:
+        raise ValueError("Los datos horarios no tienen la misma longitud: " +
+                         ", ".join(f"{nombre} {len(serie)}" for nombre, serie in series.items())) from e
+
+    # Horas en las que se necesita calefacción (cargas positivas) o refrigeración
+    calefaccion = series['cargas'] >= 0
     if not refrigeracion:
-        df["cargas"] = df["cargas"].apply(lambda x: 0 if x < 0 else x)
-        df.loc[df["climatizacion"] == "Refrigeracion", "precio_luz"] = 0
+        series['cargas'] = np.where(calefaccion, series['cargas'], 0.0)
+        series['precio_luz'] = np.where(calefaccion, series['precio_luz'], 0.0)
+    # Introduzco un índice con todos los pasos desde la fecha de inicio (por defecto el inicio del año 2023)
+    # copy=False: las columnas son vistas de los vectores recibidos (o de los archivos .npy), no copias
+    frecuencia = to_offset(pd.Timedelta(minutes=paso))
+    df = pd.DataFrame(series, index=pd.date_range(start=opciones['inicio'], freq=frecuencia, periods=filas),
+                      copy=False)
+    df["climatizacion"] = columna_climatizacion(calefaccion)
+    df.attrs['paso'] = paso / 60
+    df.attrs['anios'] = anios_horizonte(df)
+    anotar(horas=len(df), paso=paso, refrigeracion=bool(refrigeracion))
+    informar("Datos horarios preparados")
     return df
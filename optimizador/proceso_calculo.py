@@ -0,0 +1,114 @@
+"""Módulo para ejecutar el optimizador en un proceso aparte que informa de su progreso y se puede cancelar
+
+El proceso de trabajo de la interfaz se mantiene entre un cálculo y el siguiente, de modo que conserva los modelos
+vivos (ver optimizador.sistemas.modelos_vivos): al repetir el cálculo de la misma vivienda con otros precios solo
+se actualizan sus parámetros. Al cancelar se detiene el proceso y el cálculo siguiente parte de uno nuevo.
+"""
+import multiprocessing
+import os
+import signal
+import subprocess
+import traceback
+
+import pandas as pd
+
+from dotenv import load_dotenv
+
+from optimizador import inicio_optimizacion
+from optimizador.irradiacion import calculo_irradiacion
+from optimizador.progreso import informar, registrar
+
+# Modelos vivos del proceso de trabajo de la interfaz salvo que el archivo .env indique otro número: los de gas,
+# aerotermia de alta, aerotermia de baja y aire acondicionado de una misma vivienda
+MODELOS_INTERFAZ = 4
+
+
+def calcular_en_proceso(cola, entrada):
+    """Cálculo completo dentro del proceso de trabajo. Los avisos y el resultado se envían por la cola
+
+    Mensajes enviados: ('progreso', etapa, detalle), ('resultado', diccionario) y ('error', texto).
+
+    :param cola: Cola de multiprocessing compartida con la interfaz
+    :param entrada: Diccionario con los argumentos de inicio_optimizacion. Si incluye latitud, longitud y
+        azimut la irradiación se descarga en el propio proceso
+    """
+    try:
+        entrada = dict(entrada)
+        if entrada.get('latitud') is not None:
+            informar("Descargando irradiación")
+            entrada['irradiacion'] = calculo_irradiacion(entrada.pop('latitud'), entrada.pop('longitud'),
+                                                         entrada.pop('azimut'), entrada['aguas'])
+            informar("Irradiación descargada")
+        else:
+            for clave in ('latitud', 'longitud', 'azimut'):
+                entrada.pop(clave, None)
+            entrada.setdefault('irradiacion', pd.DataFrame({'cara_0': [0]*8760}))
+        cola.put(('resultado', inicio_optimizacion(**entrada)))
+    except Exception as e:  # pylint: disable=W0718
+        traceback.print_exc()
+        cola.put(('error', f"{type(e).__name__}: {e}"))
+
+
+def trabajador_calculo(cola, pedidos):
+    """Proceso de trabajo de la interfaz: resuelve los cálculos que llegan por pedidos hasta recibir None
+
+    :param cola: Cola de multiprocessing por la que se envían los mensajes de cada cálculo (ver calcular_en_proceso)
+    :param pedidos: Cola de multiprocessing por la que llega la entrada de cada cálculo
+    """
+    if os.name == 'posix':
+        # Grupo de procesos propio: al cancelar se detienen también el solver y los procesos auxiliares
+        os.setpgrp()
+    load_dotenv(dotenv_path=".env")
+    os.environ.setdefault('MODELOS_VIVOS', str(MODELOS_INTERFAZ))
+    registrar(lambda etapa, detalle: cola.put(('progreso', etapa, detalle)))
+    for entrada in iter(pedidos.get, None):
+        calcular_en_proceso(cola, entrada)
+
+
+def lanzar_calculo(entrada, trabajador=None):
+    """Envía el cálculo al proceso de trabajo de la interfaz, o a uno nuevo si no hay ninguno vivo
+
+    :param entrada: Ver calcular_en_proceso
+    :param trabajador: Proceso de trabajo devuelto por una llamada anterior
+    :return: Proceso de trabajo, cola por la que llegan sus mensajes y cola por la que recibe los cálculos
+    """
+    if trabajador is None or not trabajador[0].is_alive():
+        contexto = multiprocessing.get_context('spawn')
+        cola = contexto.Queue()
+        pedidos = contexto.Queue()
+        # No es daemon para que pueda lanzar a su vez los procesos de la opción 'Todas'
+        proceso = contexto.Process(target=trabajador_calculo, args=(cola, pedidos))
+        proceso.start()
+        trabajador = (proceso, cola, pedidos)
+    trabajador[2].put(entrada)
+    return trabajador
+
+
+def cerrar_trabajador(trabajador):
+    """Termina el proceso de trabajo de la interfaz, esperando a que acabe el cálculo en curso
+
+    :param trabajador: Proceso de trabajo devuelto por lanzar_calculo, o None
+    """
+    if trabajador is None or not trabajador[0].is_alive():
+        return
+    trabajador[2].put(None)
+    trabajador[0].join(timeout=5)
+    cancelar_calculo(trabajador[0])
+
+
+def cancelar_calculo(proceso):
+    """Detiene el proceso de cálculo junto con el solver y cualquier otro proceso que haya lanzado
+
+    :param proceso: Proceso de trabajo devuelto por lanzar_calculo
+    """
+    if not proceso.is_alive():
+        return
+    if os.name == 'nt':
+        subprocess.run(['taskkill', '/F', '/T', '/PID', str(proceso.pid)], capture_output=True, check=False)
+    else:
+        try:
+            os.killpg(proceso.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            # El proceso aún no había creado su grupo
+            proceso.kill()
+    proceso.join(timeout=5)
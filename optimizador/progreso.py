@@ -0,0 +1,94 @@
+"""Módulo para informar del progreso del cálculo a la interfaz gráfica u otro proceso"""
+import io
+import re
+import sys
+
+from contextlib import contextmanager, redirect_stdout
+
+# Función que recibe (etapa, detalle). Sin destino registrado los avisos se ignoran
+_destino = None
+
+# Resumen final de SCIP (Gap : 0.00 %) y de HiGHS (Gap 0% (tolerance: 1%))
+GAP_FINAL = re.compile(r"^\s*Gap\s*:?\s*(?:([-+\d.eE]+)\s*%|(infinite))")
+# Filas de la tabla de HiGHS: ... BestBound BestSol Gap Cuts InLp Confl. LpIters Time
+FILA_HIGHS = re.compile(r"^.*\s(inf|[-+\d.eE]+%)(?:\s+\d+){4}\s+[\d.]+s\s*$")
+
+
+def registrar(destino):
+    """Registra la función que recibe los avisos de progreso del proceso actual
+
+    :param destino: Función con los argumentos (etapa, detalle) o None para dejar de informar
+    """
+    global _destino  # pylint: disable=W0603
+    _destino = destino
+
+
+def informar(etapa, detalle=""):
+    """Envía un aviso de progreso al destino registrado
+
+    :param etapa: Descripción corta de la etapa del cálculo
+    :param detalle: Información adicional de la etapa (gap del solver, sistema...)
+    """
+    if _destino is not None:
+        _destino(etapa, detalle)
+
+
+def gap_linea(linea):
+    """Gap que muestra una línea del registro de SCIP o HiGHS, o None si la línea no lo contiene
+
+    :param linea: Línea de la salida del solver
+    """
+    final = GAP_FINAL.match(linea)
+    if final:
+        return final.group(1) or final.group(2)
+    highs = FILA_HIGHS.match(linea)
+    if highs:
+        return "Inf" if highs.group(1) == "inf" else highs.group(1).rstrip("%")
+    # Filas de la tabla de SCIP: ... | dualbound | primalbound | gap | compl.
+    columnas = [c.strip() for c in linea.split("|")]
+    if len(columnas) > 3 and (columnas[-2].endswith("%") or columnas[-2] in ("Inf", "--")):
+        return columnas[-2].rstrip("%").strip()
+    return None
+
+
+class SalidaSolver(io.TextIOBase):
+    """Copia la salida del solver en la consola, si se indica, y avisa cada vez que cambia el gap"""
+
+    def __init__(self, consola, etapa):
+        super().__init__()
+        self.consola = consola
+        self.etapa = etapa
+        self.pendiente = ""
+        self.gap = None
+
+    def write(self, s):
+        if self.consola is not None:
+            self.consola.write(s)
+        self.pendiente += s
+        *lineas, self.pendiente = self.pendiente.split("\n")
+        for linea in lineas:
+            gap = gap_linea(linea)
+            if gap is not None and gap != self.gap:
+                self.gap = gap
+                informar(self.etapa, f"gap {gap} %" if gap not in ("Inf", "--", "infinite") else "gap ∞")
+        return len(s)
+
+    def flush(self):
+        if self.consola is not None:
+            self.consola.flush()
+
+
+@contextmanager
+def seguimiento_solver(etapa, consola=True):
+    """Durante el bloque with lee la salida del solver (tee=True) para informar del gap
+
+    :param etapa: Etapa con la que se envían los avisos, por ejemplo 'Resolviendo Gas'
+    :param consola: Copiar la salida del solver en la consola
+    :return: Valor de tee para solve(): la salida solo se pide si se copia en la consola o se lee el gap
+    """
+    informar(etapa)
+    if _destino is None:
+        yield consola
+        return
+    with redirect_stdout(SalidaSolver(sys.stdout if consola else None, etapa)):
+        yield True
@@ -0,0 +1,63 @@
+"""Módulo para guardar las tablas horarias de resultados de cada sistema (resultados_modelo_<sistema>)
+
+El formato y los decimales se eligen con las variables opcionales del archivo .env:
+    FORMATO_RESULTADOS    csv (por defecto), csv.gz, parquet o feather. Parquet y feather necesitan pyarrow
+    DECIMALES_RESULTADOS  decimales de las columnas de números reales (2 por defecto). Con "no" se guardan
+                          con toda la precisión del solver
+"""
+import importlib.util
+import os
+
+from dotenv import load_dotenv
+
+# Formato: extensión del archivo
+FORMATOS = {'csv': '.csv', 'csv.gz': '.csv.gz', 'parquet': '.parquet', 'feather': '.feather'}
+
+
+def opciones_salida():
+    """Formato y decimales de las tablas de resultados definidos en el archivo .env"""
+    load_dotenv(dotenv_path=".env")
+    formato = os.getenv("FORMATO_RESULTADOS", "csv").strip().lower() or "csv"
+    if formato not in FORMATOS:
+        raise ValueError(f"FORMATO_RESULTADOS debe ser uno de {', '.join(FORMATOS)}, no '{formato}'")
+    decimales = os.getenv("DECIMALES_RESULTADOS", "2").strip().lower()
+    return formato, None if decimales in ("", "no") else int(decimales)
+
+
+def redondear(tabla, decimales):
+    """Copia de la tabla con las columnas de números reales redondeadas
+
+    :param tabla: Dataframe de resultados
+    :param decimales: Número de decimales, o None para no redondear
+    """
+    if decimales is None:
+        return tabla
+    reales = tabla.select_dtypes('float').columns
+    return tabla.assign(**{c: tabla[c].round(decimales) for c in reales})
+
+
+def guardar_resultados(tabla, nombre, carpeta, formato=None, decimales=None):
+    """Guarda una tabla de resultados y devuelve la ruta del archivo
+
+    :param tabla: Dataframe de resultados, sin índice
+    :param nombre: Nombre del archivo sin extensión
+    :param carpeta: Carpeta de resultados
+    :param formato: Uno de FORMATOS. Por defecto el del archivo .env
+    :param decimales: Decimales de las columnas reales o None para no redondear. Si no se indica el formato, el
+        formato y los decimales se toman del archivo .env
+    """
+    if formato is None:
+        formato, decimales = opciones_salida()
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de resultados desconocido: {formato}")
+    ruta = os.path.join(carpeta, nombre + FORMATOS[formato])
+    tabla = redondear(tabla, decimales)
+    if formato in ('parquet', 'feather') and importlib.util.find_spec('pyarrow') is None:
+        raise ImportError(f"El formato {formato} necesita pyarrow (pip install pyarrow)")
+    if formato == 'parquet':
+        tabla.to_parquet(ruta, index=False)
+    elif formato == 'feather':
+        tabla.to_feather(ruta)
+    else:
+        tabla.to_csv(ruta, index=False)
+    return ruta
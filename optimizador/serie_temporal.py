@@ -0,0 +1,135 @@
+"""Módulo con el paso y la longitud del horizonte de las series temporales
+
+Todas las filas del Dataframe de parametros_horarios tienen el mismo paso Δt, que puede ser menor que una hora
+(por ejemplo, las cargas cada 15 minutos de un contador inteligente), y el horizonte puede cubrir varios años.
+Las cargas, la energía de los equipos y la irradiación de cada fila son potencias medias durante el paso [W],
+que coinciden con la energía de cada hora [W·h] cuando el paso es de una hora. Por eso:
+    - el coste de operación de una fila es precio · potencia · Δt, dividido entre los años del horizonte
+      para que siga siendo un coste anual comparable con la anualidad de la inversión (peso_periodo)
+    - el balance del depósito de inercia divide su capacidad térmica entre Δt
+    - los días tienen 24 / Δt filas (filas_dia)
+El paso y los años se guardan en df.attrs, que pandas conserva al seleccionar filas, de modo que los
+subconjuntos de calefacción o refrigeración y las ventanas del horizonte rodante los mantienen.
+
+Las opciones están en la sección Serie temporal de datos_tecnicos.yaml.
+"""
+import numpy as np
+import pandas as pd
+
+from optimizador.configuracion import cargar_configuracion
+
+HORAS_ANIO = 8760
+HORAS_DIA = 24
+OPCIONES_POR_DEFECTO = {'inicio': '2023-01-01', 'paso': 60, 'anios': 1, 'anio irradiacion': 2023,
+                        'filas maximas': 8784}
+
+
+def opciones_serie(datos=None):
+    """Opciones de la sección Serie temporal completadas con los valores por defecto
+
+    :param datos: Datos técnicos de datos_tecnicos.yaml. Por defecto los de cargar_configuracion
+    """
+    if datos is None:
+        datos = cargar_configuracion().datos
+    opciones = {clave: valor for clave, valor in (datos.get('Serie temporal') or {}).items() if valor is not None}
+    return {**OPCIONES_POR_DEFECTO, **opciones}
+
+
+def repeticiones_hora(paso):
+    """Filas de cada hora con el paso indicado, o 1 si el paso no divide a la hora
+
+    :param paso: Paso de la serie. Unidades: min
+    """
+    repeticiones = 60 / float(paso)
+    return int(repeticiones) if repeticiones > 1 and repeticiones.is_integer() else 1
+
+
+def ajustar_serie(serie, filas, repeticiones=1, anios=1):
+    """Serie con la longitud del horizonte
+
+    Una serie que ya tiene todas las filas se devuelve sin copiarla. Una serie horaria se repite en cada paso
+    de la hora y una serie de un solo año se repite cada año; la primera que encaje de esas combinaciones es
+    la que se aplica.
+
+    :param serie: Vector (o matriz con una fila por paso, como la irradiación)
+    :param filas: Número de filas del horizonte
+    :param repeticiones: Filas de cada hora (ver repeticiones_hora)
+    :param anios: Años del horizonte
+    """
+    serie = np.asarray(serie)
+    for copias in dict.fromkeys((1, anios)):
+        for repetir in dict.fromkeys((1, repeticiones)):
+            if len(serie) * repetir * copias != filas:
+                continue
+            if repetir > 1:
+                serie = np.repeat(serie, repetir, axis=0)
+            if copias > 1:
+                serie = np.tile(serie, (copias,) + (1,) * (serie.ndim - 1))
+            return serie
+    raise ValueError(f"Una serie de {len(serie)} filas no se puede ajustar a un horizonte de {filas} filas")
+
+
+def paso_horas(df):
+    """Paso Δt de las filas del Dataframe en horas
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    """
+    if 'paso' in df.attrs:
+        return float(df.attrs['paso'])
+    frecuencia = getattr(df.index, 'freq', None)
+    if frecuencia is not None:
+        try:
+            return pd.Timedelta(frecuencia) / pd.Timedelta(hours=1)
+        except ValueError:
+            pass
+    return 1.0
+
+
+def anios_horizonte(df):
+    """Años que cubre el horizonte completo del que procede el Dataframe (al menos uno)
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    """
+    if 'anios' in df.attrs:
+        return float(df.attrs['anios'])
+    return float(max(1, round(len(df) * paso_horas(df) / HORAS_ANIO)))
+
+
+def peso_periodo(df):
+    """Horas de un año medio que representa cada fila: multiplica al precio en el coste de operación anual
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    """
+    return paso_horas(df) / anios_horizonte(df)
+
+
+def filas_dia(df):
+    """Número de filas de cada día
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    """
+    filas = HORAS_DIA / paso_horas(df)
+    if not np.isclose(filas, round(filas)):
+        raise ValueError(f"Un paso de {paso_horas(df)} h no divide al día")
+    return int(round(filas))
+
+
+def ajustar_irradiacion(irradiacion, df):
+    """Irradiación con una fila por fila del Dataframe. La irradiación horaria de PVGIS se repite en cada paso
+    y la de un año en cada año del horizonte; si tiene más filas que el Dataframe se toman las primeras
+
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    """
+    if len(irradiacion) >= len(df):
+        return np.asarray(irradiacion, dtype=float)[:len(df)]
+    return ajustar_serie(np.asarray(irradiacion, dtype=float), len(df), repeticiones_hora(60 * paso_horas(df)),
+                         int(round(anios_horizonte(df))))
+
+
+def filas_maximas(datos):
+    """Filas a partir de las que los modelos se construyen por partes para no superar una memoria fija
+
+    :param datos: Datos técnicos de los equipos de climatización
+    """
+    return int(opciones_serie(datos)['filas maximas'])
@@ -1,33 +1,63 @@
 """Modulo que seleciona la opción de cálculo"""
 import numpy as np
-import pandas as pd
 
-from optimizador.sistemas.estudio_aerotermia import calculo_aerotermia
+from optimizador.cache_resultados import huella_datos, resultado_en_cache
+from optimizador.configuracion import cargar_configuracion
+from optimizador.serie_temporal import ajustar_irradiacion
+from optimizador.sistemas.construccion import temporadas
+from optimizador.sistemas.estudio_aerotermia import aerotermia_por_partes, calculo_aerotermia
 from optimizador.sistemas.estudio_aire_acondicionado import calculo_aire_acondicionado
+from optimizador.sistemas.estudio_conjunto import calculo_conjunto
 from optimizador.sistemas.estudio_gas import calculo_gas
 
 
-def seleccion_sistema(nuevo, df, irradiacion, placas, aguas, actual, refri):
-    """Función que selecciona la poción de estudio seleccionada
+def seleccion_sistema(nuevo, df, irradiacion, placas, aguas, actual, refri, carpeta="Resultados", configuracion=None):
+    """Función que selecciona la poción de estudio seleccionada reutilizando los resultados guardados en caché
 
     :param nuevo: Opción de estudio seleccionado en el script principal
     :param df: Dataframe con todos los parámetros que tienen carácter horario
     :param irradiacion: Resultados de irradiacion incidente en la residencia
     :param placas: Selección de la opción paneles solares
     :param aguas: Numero de aguas del tejado de la residencia en estudio
-    :param inversion: Coste de la instalacion del nuevo sistema de climatización
+    :param actual: Sistema de climatización instalado en la residencia
     :param refri: Booleano con el resultado de la casilla refrigeracion del script principal
+    :param carpeta: Carpeta en la que se guardan los resultados y las gráficas
+    :param configuracion: Configuración devuelta por cargar_configuracion. Por defecto la de la carpeta de trabajo
     """
-    df_inversion = pd.read_csv('Datos/inversion.csv', sep=';', index_col=0)
-    df_ayudas = pd.read_csv('Datos/ayudas.csv', sep=';')
-    inversion = max(df_inversion.loc[actual, nuevo] - df_ayudas[nuevo].iloc[0], 0)
+    partes = ('seleccion_sistema', nuevo, huella_datos(df, irradiacion), np.asarray(placas).tolist(), int(aguas),
+              actual, bool(refri))
+    return resultado_en_cache(partes, lambda destino: calculo_sistema(
+        nuevo, df, irradiacion, placas, aguas, actual, refri, destino, configuracion), carpeta, nuevo, configuracion)
+
+
+def calculo_sistema(nuevo, df, irradiacion, placas, aguas, actual, refri, carpeta="Resultados", configuracion=None):
+    """Función que calcula la opción de estudio seleccionada
+
+    :param nuevo: Opción de estudio seleccionado en el script principal
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param placas: Selección de la opción paneles solares
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param actual: Sistema de climatización instalado en la residencia
+    :param refri: Booleano con el resultado de la casilla refrigeracion del script principal
+    :param carpeta: Carpeta en la que se guardan los resultados y las gráficas
+    :param configuracion: Configuración devuelta por cargar_configuracion. Por defecto la de la carpeta de trabajo
+    """
+    if configuracion is None:
+        configuracion = cargar_configuracion()
+    datos = configuracion.datos
+    # La irradiación horaria de PVGIS se repite en cada paso y en cada año del horizonte
+    irradiacion = ajustar_irradiacion(irradiacion, df)
+    inversion = configuracion.inversion_neta(actual, nuevo)
+    coste = configuracion.coste_inversion(actual, nuevo)
+    coste_aire = configuracion.coste_inversion(actual, 'Aire acondicionado')
     if refri and nuevo == "Gas":
-        df_calefaccion = df.loc[df['climatizacion'] == 'Calefaccion']
-        df_refrigeracion = df.loc[df['climatizacion'] == 'Refrigeracion']
-        resultado_calefaccion = calculo_gas(df_calefaccion, df_inversion.loc[actual, nuevo])
+        # Cada temporada con la irradiación de sus propias horas
+        (df_calefaccion, _), (df_refrigeracion, irradiacion_refrigeracion) = temporadas(df, irradiacion)
+        resultado_calefaccion = calculo_gas(df_calefaccion, coste, carpeta=carpeta, datos=datos)
         resultado_refrigeracion = calculo_aire_acondicionado(
-            df_refrigeracion, irradiacion, placas, [0]*aguas,
-            aguas, df_inversion.loc[actual, 'Aire acondicionado'])
+            df_refrigeracion, irradiacion_refrigeracion, placas, [0]*aguas,
+            aguas, coste_aire, carpeta=carpeta, datos=datos)
         resultado = {
             "Costo operativo anual": f"{
                 np.round(float(resultado_calefaccion["Costo operativo anual"].replace("€", "").strip()) +
@@ -39,15 +69,22 @@ def seleccion_sistema(nuevo, df, irradiacion, placas, aguas, actual, refri):
                                       float(resultado_refrigeracion["Inversion"].replace("€", "").strip())), 2)} €"
         }
     elif nuevo == "Gas" and not refri:
-        resultado = calculo_gas(df, inversion)
+        resultado = calculo_gas(df, inversion, carpeta=carpeta, datos=datos)
+    elif refri and nuevo == "Aerotermia de alta" and not aerotermia_por_partes(df, datos):
+        # Aerotermia, aire acondicionado y placas compartidas dimensionados en un solo modelo
+        resultado = calculo_conjunto(nuevo, df, irradiacion, placas, aguas, coste, coste_aire, carpeta=carpeta,
+                                     datos=datos)
     elif refri and nuevo == "Aerotermia de alta":
-        df_calefaccion = df.loc[df['climatizacion'] == 'Calefaccion']
-        df_refrigeracion = df.loc[df['climatizacion'] == 'Refrigeracion']
+        (df_calefaccion, irradiacion_calefaccion), (df_refrigeracion, irradiacion_refrigeracion) = temporadas(
+            df, irradiacion)
         resultado_calefaccion = calculo_aerotermia(
-            nuevo, df_calefaccion, irradiacion, placas, aguas, df_inversion.loc[actual, nuevo])
+            nuevo, df_calefaccion, irradiacion_calefaccion, placas, aguas, coste, carpeta=carpeta, datos=datos)
         ps = resultado_calefaccion["Placas"]
         resultado_refrigeracion = calculo_aire_acondicionado(
-            df_refrigeracion, irradiacion, placas, ps, aguas, df_inversion.loc[actual, 'Aire acondicionado'])
+            df_refrigeracion, irradiacion_refrigeracion, placas, ps, aguas, coste_aire, carpeta=carpeta,
+            datos=datos)
+        # La inversión del aire acondicionado con las placas fijadas incluye otra vez su precio
+        repetidas = datos['Placas solares']['precio'] * np.sum(ps)
         resultado = {
             "Costo operativo anual": f"{
                 np.round(float(resultado_calefaccion["Costo operativo anual"].replace("€", "").strip()) +
@@ -57,15 +94,16 @@ def seleccion_sistema(nuevo, df, irradiacion, placas, aguas, actual, refri):
             "Potencia Aire acondicionado": resultado_refrigeracion["Potencia Bomba de calor"],
             "Placas": resultado_calefaccion["Placas"],
             "Inversion": f"{np.round((float(resultado_calefaccion["Inversion"].replace("€", "").strip()) +
-                                      float(resultado_refrigeracion["Inversion"].replace("€", "").strip())), 2)} €"
+                                      float(resultado_refrigeracion["Inversion"].replace("€", "").strip()) -
+                                      repetidas), 2)} €"
         }
     elif nuevo == "Aerotermia de alta" and not refri:
-        resultado = calculo_aerotermia(nuevo, df, irradiacion, placas, aguas, df_inversion.loc[actual, nuevo])
+        resultado = calculo_aerotermia(nuevo, df, irradiacion, placas, aguas, coste, carpeta=carpeta, datos=datos)
     elif nuevo == "Aerotermia de baja":
-        resultado = calculo_aerotermia(nuevo, df, irradiacion, placas, aguas, df_inversion.loc[actual, nuevo])
+        resultado = calculo_aerotermia(nuevo, df, irradiacion, placas, aguas, coste, carpeta=carpeta, datos=datos)
     elif nuevo == "Aire acondicionado":
         resultado = calculo_aire_acondicionado(
-            df, irradiacion, placas, [0]*aguas, aguas, df_inversion.loc[actual, nuevo])
+            df, irradiacion, placas, [0]*aguas, aguas, coste, carpeta=carpeta, datos=datos)
     else:
         resultado = 'No se seleciono ninguna opción correcta'
     return resultado
@@ -0,0 +1,167 @@
+"""Módulo con las utilidades comunes para construir los modelos horarios a partir de vectores NumPy"""
+import numpy as np
+import pyomo.environ as pyo
+
+from pyomo.core.expr.numeric_expr import LinearExpression
+
+
+def mascara_calefaccion(df):
+    """Vector booleano con las horas en las que el edificio demanda calefacción
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    """
+    return df['climatizacion'].to_numpy() == 'Calefaccion'
+
+
+def irradiacion_filas(df, irradiacion):
+    """Irradiación como matriz con una fila por fila del Dataframe
+
+    Cada fila de la irradiación corresponde a la fila del Dataframe en la misma posición. Para estudiar solo
+    las horas de calefacción o de refrigeración, el Dataframe y la irradiación se separan juntos con temporadas.
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    """
+    irradiacion = np.asarray(irradiacion, dtype=float)
+    if len(irradiacion) != len(df):
+        raise ValueError(f"La irradiación tiene {len(irradiacion)} filas y el Dataframe {len(df)}: separa las "
+                         f"temporadas con temporadas o ajusta la serie con ajustar_irradiacion")
+    return irradiacion
+
+
+def temporadas(df, irradiacion):
+    """Filas de calefacción y de refrigeración del Dataframe con la irradiación de esas mismas filas
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    """
+    calefaccion = mascara_calefaccion(df)
+    irradiacion = irradiacion_filas(df, irradiacion)
+    return (df.loc[calefaccion], irradiacion[calefaccion]), (df.loc[~calefaccion], irradiacion[~calefaccion])
+
+
+def columna(valores, filas):
+    """Convierte un coeficiente escalar o vectorial en una lista de longitud filas
+
+    :param valores: Escalar, vector NumPy o lista con un valor por fila
+    :param filas: Número de filas del bloque de restricciones
+    """
+    if valores is None:
+        return [None] * filas
+    if np.ndim(valores) == 0:
+        return [float(valores)] * filas
+    if isinstance(valores, np.ndarray) and valores.dtype != object:
+        return valores.astype(float).tolist()
+    return list(valores)
+
+
+def variables(componente, filas):
+    """Lista con la variable que corresponde a cada fila
+
+    :param componente: Variable indexada (se toma en orden), lista de variables o variable escalar
+    :param filas: Número de filas del bloque de restricciones
+    """
+    if isinstance(componente, (list, tuple)):
+        return list(componente)
+    if componente.is_indexed():
+        return list(componente.values())
+    return [componente] * filas
+
+
+def suma_producto(valores, variables_fila):
+    """Expresión lineal Σ coef·var construida sin pasar por la sobrecarga de operadores de pyomo
+
+    :param valores: Vector con los coeficientes
+    :param variables_fila: Variable indexada o lista de variables en el mismo orden que los coeficientes
+    """
+    lista = variables(variables_fila, len(valores))
+    return LinearExpression(constant=0, linear_coefs=columna(valores, len(lista)), linear_vars=lista)
+
+
+def restricciones(model, nombre, conjunto, terminos, inferior=None, superior=None, productos=()):
+    """Añade al modelo un bloque de restricciones  inferior <= Σ coef·var + Σ coef·var·var <= superior
+
+    Cada término es un par (coeficientes, variables) en el que los coeficientes pueden ser un escalar
+    o un vector con un valor por fila, y las variables una variable escalar, una variable indexada o una
+    lista con una variable por fila. Los productos son ternas (coeficientes, variables, variables).
+
+    :param model: Modelo de pyomo en construcción
+    :param nombre: Nombre del componente de restricciones dentro del modelo
+    :param conjunto: Conjunto que indexa las restricciones; cada elemento es una fila
+    :param terminos: Lista de términos lineales
+    :param inferior: Límite inferior por fila (escalar, vector o None)
+    :param superior: Límite superior por fila (escalar, vector o None)
+    :param productos: Lista de términos bilineales
+    """
+    filas = len(conjunto)
+    lineales = [(columna(c, filas), variables(v, filas)) for c, v in terminos]
+    bilineales = [(columna(c, filas), variables(a, filas), variables(b, filas)) for c, a, b in productos]
+    inferior = columna(inferior, filas)
+    superior = columna(superior, filas)
+    posicion = {h: i for i, h in enumerate(conjunto)}
+
+    def regla(_m, h):
+        i = posicion[h]
+        expr = LinearExpression(constant=0, linear_coefs=[c[i] for c, _ in lineales],
+                                linear_vars=[v[i] for _, v in lineales])
+        for c, a, b in bilineales:
+            if c[i]:
+                expr = expr + c[i] * a[i] * b[i]
+        return (inferior[i], expr, superior[i])
+    model.add_component(nombre, pyo.Constraint(conjunto, rule=regla))
+
+
+def parametro(model, nombre, valores, *conjuntos):
+    """Añade al modelo un parámetro mutable con los valores de un vector o una matriz
+
+    Los coeficientes y límites que usan el parámetro se actualizan al cambiar sus valores, sin reconstruir
+    el modelo (ver actualizar_parametro).
+
+    :param model: Modelo de pyomo en construcción
+    :param nombre: Nombre del parámetro dentro del modelo
+    :param valores: Vector con un valor por fila, o matriz con una fila por elemento del primer conjunto
+    :param conjuntos: Conjuntos que indexan el parámetro
+    """
+    model.add_component(nombre, pyo.Param(*conjuntos, mutable=True, initialize=0.0))
+    componente = model.component(nombre)
+    actualizar_parametro(componente, valores)
+    return componente
+
+
+def actualizar_parametro(componente, valores):
+    """Cambia en el sitio los valores de un parámetro creado con parametro
+
+    :param componente: Parámetro mutable del modelo
+    :param valores: Valores nuevos con la misma forma que los originales
+    """
+    valores = np.asarray(valores, dtype=float).ravel()
+    if len(valores) != len(componente):
+        raise ValueError(f"El parámetro {componente.name} tiene {len(componente)} valores y se recibieron "
+                         f"{len(valores)}")
+    for dato, valor in zip(componente.values(), valores.tolist()):
+        dato.set_value(valor)
+
+
+def coeficientes(model, valores, mutable=False):
+    """Coeficientes del coste de inversión del modelo: los propios números o, con mutable, parámetros escalares
+    que se cambian con actualizar_coeficientes sin reconstruir el modelo
+
+    :param model: Modelo de pyomo en construcción
+    :param valores: Diccionario con el nombre y el valor de cada coeficiente
+    :param mutable: Crear un parámetro mutable del modelo por coeficiente
+    """
+    if not mutable:
+        return dict(valores)
+    for nombre, valor in valores.items():
+        model.add_component(nombre, pyo.Param(mutable=True, initialize=float(valor)))
+    return {nombre: model.component(nombre) for nombre in valores}
+
+
+def actualizar_coeficientes(model, valores):
+    """Cambia en el sitio los coeficientes creados con coeficientes(mutable=True)
+
+    :param model: Modelo de pyomo
+    :param valores: Diccionario con el nombre y el valor nuevo de cada coeficiente
+    """
+    for nombre, valor in valores.items():
+        model.component(nombre).set_value(float(valor))
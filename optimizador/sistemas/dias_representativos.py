@@ -0,0 +1,130 @@
+"""Módulo para agregar la serie horaria en días representativos con su peso
+
+La serie se divide en días de 24 / Δt filas consecutivas (ver optimizador.serie_temporal), igual que el
+modelo horario trata las filas como pasos consecutivos. Los días se agrupan con k-medias sobre el precio de la
+luz, las cargas, la temperatura exterior y la irradiación, y cada grupo se representa por su día real más
+cercano al centro. Los días con la mayor carga de calefacción y de refrigeración se conservan siempre como días
+propios para que los equipos se dimensionen con el pico de demanda.
+"""
+import numpy as np
+
+from optimizador.serie_temporal import filas_dia
+
+# Días representativos de la etapa de dimensionado cuando no se indica su número (horizonte rodante o series
+# más largas que 'filas maximas')
+DIAS_POR_DEFECTO = 12
+
+
+def caracteristicas_dias(df, irradiacion, dias):
+    """Matriz con una fila por día y los perfiles horarios normalizados de cada serie
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param dias: Número de días completos de la serie
+    """
+    por_dia = filas_dia(df)
+    filas = dias * por_dia
+    series = [df[columna].to_numpy(dtype=float)[:filas] for columna in ('precio_luz', 'cargas', 'T_exterior')]
+    series.append(np.array(irradiacion, dtype=float)[:filas].sum(axis=1))
+    perfiles = []
+    for serie in series:
+        desviacion = serie.std()
+        perfiles.append(((serie - serie.mean()) / (desviacion if desviacion > 0 else 1)).reshape(dias, por_dia))
+    return np.hstack(perfiles)
+
+
+def kmedias(x, grupos, semilla=0, iteraciones=100):
+    """Agrupación k-medias con inicialización k-means++
+
+    :param x: Matriz con una fila por elemento
+    :param grupos: Número de grupos
+    :param semilla: Semilla del generador aleatorio
+    :param iteraciones: Número máximo de iteraciones
+    :return: Grupo de cada fila y centro de cada grupo
+    """
+    rng = np.random.default_rng(semilla)
+    centros = [x[rng.integers(len(x))]]
+    for _ in range(1, grupos):
+        distancia = ((x[:, None, :] - np.array(centros)[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+        probabilidad = distancia / distancia.sum() if distancia.sum() > 0 else None
+        centros.append(x[rng.choice(len(x), p=probabilidad)])
+    centros = np.array(centros)
+    asignacion = None
+    for _ in range(iteraciones):
+        nueva = ((x[:, None, :] - centros[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+        if asignacion is not None and np.array_equal(nueva, asignacion):
+            break
+        asignacion = nueva
+        for g in range(grupos):
+            if np.any(asignacion == g):
+                centros[g] = x[asignacion == g].mean(axis=0)
+    return asignacion, centros
+
+
+def agrupar_dias(df, irradiacion, n_dias, semilla=0):
+    """Elige los días representativos de la serie
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param n_dias: Número total de días representativos, incluidos los días de carga máxima
+    :param semilla: Semilla de la agrupación
+    :return: Diccionario con el índice de cada día representativo ('dias'), el número de días que
+        representa ('pesos'), el representante de cada día de la serie ('asignacion') y las filas de cada día
+        ('filas')
+    """
+    por_dia = filas_dia(df)
+    completos = len(df) // por_dia
+    if n_dias < 1 or completos < n_dias:
+        raise ValueError(f"No se pueden elegir {n_dias} días representativos en una serie de {len(df)} filas")
+    x = caracteristicas_dias(df, irradiacion, completos)
+
+    cargas = df['cargas'].to_numpy(dtype=float)[:completos * por_dia].reshape(completos, por_dia)
+    extremos = [int(cargas.max(axis=1).argmax())]
+    if cargas.min() < 0:
+        extremos.append(int(cargas.min(axis=1).argmin()))
+    extremos = list(dict.fromkeys(extremos))[:n_dias]
+    resto = np.setdiff1d(np.arange(completos), extremos)
+
+    grupos = n_dias - len(extremos)
+    representantes = list(extremos)
+    asignacion = np.empty(completos, dtype=int)
+    asignacion[extremos] = np.arange(len(extremos))
+    if grupos > 0:
+        grupo, centros = kmedias(x[resto], grupos, semilla)
+        for g in range(grupos):
+            miembros = resto[grupo == g]
+            if len(miembros) == 0:
+                continue
+            # El representante es el día real más cercano al centro del grupo
+            representantes.append(int(miembros[((x[miembros] - centros[g]) ** 2).sum(axis=1).argmin()]))
+            asignacion[miembros] = len(representantes) - 1
+
+    pesos = np.bincount(asignacion, minlength=len(representantes)).astype(float)
+    # Las filas sueltas del final se asignan al representante del último día completo
+    sobrantes = len(df) - completos * por_dia
+    if sobrantes:
+        asignacion = np.append(asignacion, asignacion[-1])
+        pesos[asignacion[-1]] += sobrantes / por_dia
+    return {'dias': np.array(representantes), 'pesos': pesos, 'asignacion': asignacion, 'filas': por_dia}
+
+
+def datos_agrupados(df, irradiacion, agrupacion):
+    """Filas de los días representativos, consecutivas y en el orden de agrupacion['dias']
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param agrupacion: Diccionario devuelto por agrupar_dias
+    """
+    por_dia = agrupacion['filas']
+    filas = (agrupacion['dias'][:, None] * por_dia + np.arange(por_dia)[None, :]).ravel()
+    return df.iloc[filas], np.array(irradiacion, dtype=float)[filas]
+
+
+def expandir(valores, agrupacion, horas):
+    """Serie horaria completa en la que cada día toma los valores de su día representativo
+
+    :param valores: Vector con los valores de cada fila de los días representativos
+    :param agrupacion: Diccionario devuelto por agrupar_dias
+    :param horas: Número de horas de la serie original
+    """
+    return np.asarray(valores, dtype=float).reshape(-1, agrupacion['filas'])[agrupacion['asignacion']].ravel()[:horas]
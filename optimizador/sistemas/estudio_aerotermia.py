@@ -1,77 +1,114 @@
 """Módulo para el cálculo de sistemas de climatización por aerotermia"""
-import os
-import yaml
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import seaborn as sns
 import pyomo.environ as pyo
 
-from dotenv import load_dotenv
+from optimizador.configuracion import cargar_configuracion
+from optimizador.graficas import generar_graficas
+from optimizador.metricas import anotar, medido
+from optimizador.progreso import informar
+from optimizador.salida_resultados import guardar_resultados
+from optimizador.serie_temporal import filas_dia, filas_maximas, paso_horas, peso_periodo
+from optimizador.sistemas.construccion import (actualizar_coeficientes, actualizar_parametro, coeficientes,
+                                               irradiacion_filas, mascara_calefaccion, parametro, restricciones,
+                                               suma_producto)
+from optimizador.sistemas.dias_representativos import DIAS_POR_DEFECTO, agrupar_dias, datos_agrupados, expandir
+from optimizador.sistemas.modelos_vivos import huella_vector, resolver_modelo_vivo
+from optimizador.sistemas.solver import (admite_no_convexos, configuracion_solver, resolver, valores_enteros,
+                                         valores_variable)
 
+# Horas que se conservan de cada ventana cuando la serie supera 'filas maximas' sin horizonte rodante configurado
+VENTANA_POR_DEFECTO = 168
 
-def calculo_aerotermia(tipo, df, irradiacion, placas, aguas, c_i):
-    """Funcion para la optimización económica de sistemas de climatización por aerotermia
+
+def costes_aerotermia(tipo, datos, c_i):
+    """Coeficientes del coste de inversión del modelo de aerotermia
+
+    :param tipo: Módelo de aerotermia seleccionado
+    :param datos: Datos técnicos de los equipos de climatización
+    :param c_i: Coste invariable de la instalacion del nuevo sistema de climatización
+    """
+    return {'coste_bdc': datos[tipo]['coste potencia'], 'coste_dep': datos['Deposito']['coste volumen'],
+            'precio_ps': datos['Placas solares']['precio'], 'coste_fijo': c_i,
+            'vida': datos['Bomba de calor']['Ciclo de vida']}
+
+
+@medido
+def modelo_aerotermia(tipo, df, irradiacion, placas, aguas, c_i, datos, lineal=True, pesos=None, secuencia=None,
+                      t_inicial=None, mutable=False):
+    """Construcción del modelo de optimización de sistemas de climatización por aerotermia
+
+    Con lineal=True la temperatura del depósito se sustituye por el producto vt_dep = v_dep·t_int, de modo
+    que el balance térmico es lineal y el modelo lo resuelve cualquier solver MILP. Es una reformulación
+    exacta: t_int se recupera como vt_dep / v_dep.
+
+    Con pesos el modelo es el de los días representativos (ver dias_representativos): df contiene días de 24
+    horas consecutivas y el coste de operación de cada día se multiplica por su peso. El depósito se encadena
+    entre los días de la serie: vt_inicio es su estado al empezar cada día y vt_dep la variación dentro del día
+    representativo, de modo que el estado en la fila t de un día es retencion^(t+1)·vt_inicio + vt_dep[t] y
+    cada día empieza en el estado con el que termina el anterior, según el orden de secuencia. Los límites de
+    temperatura se imponen con el menor y el mayor estado de inicio de los días de cada representante
+    (vt_min y vt_max), que basta para que se cumplan en todos los días de la serie.
 
     :param tipo: Módelo de aerotermia seleccionado
     :param df: Dataframe con todos los parámetros que tienen carácter horario
     :param irradiacion: Resultados de irradiacion incidente en la residencia
-    :param placas:
+    :param placas: Área disponible para las placas solares en cada agua del tejado
     :param aguas: Numero de aguas del tejado de la residencia en estudio
     :param c_i: Coste invariable de la instalacion del nuevo sistema de climatización
+    :param datos: Datos técnicos de los equipos de climatización
+    :param lineal: Formulación lineal (True) o con productos v_dep·t_int (False)
+    :param pesos: Número de días que representa cada día de df. Solo con la formulación lineal
+    :param secuencia: Día representativo de cada día de la serie, en orden (agrupacion['asignacion']). Necesaria
+        con pesos
+    :param t_inicial: Temperatura del depósito en la primera fila de df, que enlaza con una ventana anterior del
+        horizonte rodante. Por defecto el depósito parte de la temperatura de consigna
+    :param mutable: Precio, cargas, irradiación y coeficientes del coste de inversión como parámetros mutables que
+        se cambian con actualizar_aerotermia
     """
-    # ---------------------------
-    # CARGA DE DATOS (usa tus rutas/objetos)
-    # ---------------------------
-    with open('datos_tecnicos.yaml', "r", encoding="utf-8") as f:
-        datos = yaml.safe_load(f)
-
     horas = len(df)
+    anotar(sistema=tipo, horas=horas, mutable=mutable, lineal=lineal)
+    agregado = pesos is not None
+    if agregado and not lineal:
+        raise ValueError("El modelo de días representativos solo admite la formulación lineal")
+    if agregado and secuencia is None:
+        raise ValueError("El modelo de días representativos necesita la secuencia de días de la serie")
+    # Sin días representativos la primera hora solo fija la condición de contorno del depósito
+    inicio = 0 if agregado else 1
 
     area_tejado = np.array(placas) / (1.909 * 1.134)
 
-    cargas = df["cargas"].to_numpy()
-    precio = df["precio_luz"].to_numpy()
-    t_ext = df['T_exterior'].to_numpy()
-    climatizacion = df['climatizacion'].to_numpy()
+    cargas = df["cargas"].to_numpy(dtype=float)[inicio:]
+    # Coste de cada fila: precio · potencia · Δt, en coste anual (ver optimizador.serie_temporal)
+    precio = df["precio_luz"].to_numpy(dtype=float)[inicio:] * peso_periodo(df)
+    t_ext = df['T_exterior'].to_numpy(dtype=float)[inicio:]
+    calefaccion = mascara_calefaccion(df)[inicio:]
+    if agregado:
+        precio = precio * np.repeat(np.asarray(pesos, dtype=float), filas_dia(df))
 
-    irradiacion = np.array(irradiacion)
+    irradiacion = np.array(irradiacion, dtype=float)[inicio:]
+
+    ef = datos["Deposito"]["eficiencia"]
+    cop = float(datos[tipo]["cop"])
+    err = float(datos[tipo]["err"])
+    t_int_prev = datos[tipo]['temperatura'] if t_inicial is None else float(t_inicial)
+    # Capacidad térmica de cada litro del depósito entre el paso de la serie [W/(L·ºC)]
+    capacidad = 1.136888 / paso_horas(df)
 
     model = pyo.ConcreteModel()
 
     # ---------------------------
     # Sets
     # ---------------------------
-    model.H = pyo.RangeSet(1, horas - 1)
+    model.H = pyo.RangeSet(1, horas - inicio)
     model.J = pyo.RangeSet(0, aguas - 1)
-    # ---------------------------
-    # Parámetros
-    # ---------------------------
-    model.q_ct = pyo.Param(
-        model.H,
-        initialize={h: float(cargas[h]) for h in model.H}
-    )
-    model.t_ext = pyo.Param(
-        model.H,
-        initialize={h: float(t_ext[h]) for h in model.H}
-    )
-    model.climatizacion = pyo.Param(
-        model.H,
-        initialize={h: str(climatizacion[h]) for h in model.H}
-    )
-    model.precio = pyo.Param(
-        model.H,
-        initialize={h: float(precio[h]) for h in model.H}
-    )
-    model.g = pyo.Param(
-        model.H, model.J,
-        initialize={(h, j): float(irradiacion[h][j]) for h in model.H for j in model.J}
-    )
-
-    ef = datos["Deposito"]["eficiencia"]
-    cop = float(datos[tipo]["cop"])
-    err = float(datos[tipo]["err"])
+    if mutable:
+        precio = list(parametro(model, 'precio', precio, model.H).values())
+        cargas = list(parametro(model, 'cargas', cargas, model.H).values())
+        irradiacion = parametro(model, 'irradiacion', irradiacion[:len(model.H), :aguas], model.H, model.J)
+        irradiacion = np.array(list(irradiacion.values()), dtype=object).reshape(-1, aguas)
+    costes = coeficientes(model, costes_aerotermia(tipo, datos, c_i), mutable)
     # ---------------------------
     # Variables
     # ---------------------------
@@ -80,135 +117,418 @@ def calculo_aerotermia(tipo, df, irradiacion, placas, aguas, c_i):
 
     model.e_red = pyo.Var(model.H, bounds=(0, datos["Bomba de calor"]["Limite"]))
     model.e_ps = pyo.Var(model.H, bounds=(0, datos["Bomba de calor"]["Limite"]))
-    model.t_int = pyo.Var(model.H, bounds=(5, 85))
+    if agregado:
+        # Variación de v_dep·t_int dentro de cada día representativo [L·ºC], que puede ser negativa
+        model.vt_dep = pyo.Var(model.H)
+        secuencia = np.asarray(secuencia, dtype=int)
+        model.D = pyo.RangeSet(0, len(pesos) - 1)
+        model.N = pyo.RangeSet(0, len(secuencia) - 1)
+        model.secuencia = pyo.Param(model.N, initialize=dict(enumerate(secuencia.tolist())))
+        # Fracción de v_dep·t_int que conserva el depósito de una fila a la siguiente sin aportes ni cargas
+        model.retencion = pyo.Param(initialize=capacidad / (ef + capacidad))
+        model.vt_inicio = pyo.Var(model.N, bounds=(0, 85 * datos['Deposito']['Limite']))
+        model.vt_min = pyo.Var(model.D, bounds=(0, 85 * datos['Deposito']['Limite']))
+        model.vt_max = pyo.Var(model.D, bounds=(0, 85 * datos['Deposito']['Limite']))
+    elif lineal:
+        # Producto v_dep·t_int [L·ºC]
+        model.vt_dep = pyo.Var(model.H, bounds=(0, 85 * datos['Deposito']['Limite']))
+    else:
+        model.t_int = pyo.Var(model.H, bounds=(5, 85))
 
     model.n_ps = pyo.Var(
         model.J,
         within=pyo.NonNegativeIntegers,
         bounds=lambda m, j: (0, int(area_tejado[j]))
     )
-    # ---------------------------
-    # Condiciones de contorno
-    # ---------------------------
-    model.t_int_prev = pyo.Param(initialize=datos[tipo]['temperatura'])
 
     # ---------------------------
     # Restricciones
     # ---------------------------
-    def solar_rule(m, h):
-        return m.e_ps[h] <= sum(m.g[h, j] * m.n_ps[j] for j in m.J) * datos['Placas solares']['eficiencia']
-    model.SolarLimit = pyo.Constraint(model.H, rule=solar_rule)
+    restricciones(model, 'SolarLimit', model.H,
+                  [(1, model.e_ps)] +
+                  [(-irradiacion[:, j] * datos['Placas solares']['eficiencia'], model.n_ps[j]) for j in model.J],
+                  superior=0)
 
     # Limito la potencia máxima que puede dar la BdC aprovechando electricidad de placas y de red
-    def p_maxima(m, h):
-        if m.climatizacion[h] == 'Calefaccion':
-            return (m.e_ps[h] + m.e_red[h]) * cop <= m.p_bdc
+    rendimiento = np.where(calefaccion, cop, err)
+    restricciones(model, 'p_max', model.H,
+                  [(rendimiento, model.e_ps), (rendimiento, model.e_red), (-1, model.p_bdc)], superior=0)
+
+    # Ecuación del balance térmico en el depósito de inercia. La primera hora parte de la temperatura de
+    # consigna y se calcula siempre con el cop (salvo que enlace con una ventana anterior)
+    signo = np.where(calefaccion, cop, -err)
+    primera = np.arange(horas - inicio) == 0
+    sin_anterior = primera
+    if agregado:
+        # La variación de cada día parte de cero; el estado de inicio del día se suma con vt_inicio
+        por_dia = filas_dia(df)
+        primera = np.zeros(horas - inicio, dtype=bool)
+        sin_anterior = np.arange(horas - inicio) % por_dia == 0
+    elif t_inicial is None:
+        signo[0] = cop
+    t_min = np.where(calefaccion, max(5.0, datos[tipo]['temperatura']), 5.0)
+    t_max = np.where(calefaccion, 85.0, 7.0)
+    if lineal:
+        vt_dep = list(model.vt_dep.values())
+        restricciones(model, 'Balance', model.H,
+                      [(signo, model.e_red), (signo, model.e_ps),
+                       (ef * t_ext + np.where(primera, capacidad * t_int_prev, 0), model.v_dep),
+                       (-(ef + capacidad), vt_dep), (np.where(sin_anterior, 0, capacidad), vt_dep[:1] + vt_dep[:-1])],
+                      inferior=cargas, superior=cargas)
+        if agregado:
+            retencion = pyo.value(model.retencion)
+            # Cada día de la serie empieza en el estado con el que termina el anterior (el último enlaza con el primero)
+            finales = [vt_dep[(d + 1) * por_dia - 1] for d in secuencia]
+            restricciones(model, 'Enlace', model.N,
+                          [(1, [model.vt_inicio[(i + 1) % len(model.N)] for i in model.N]),
+                           (-retencion ** por_dia, model.vt_inicio), (-1, finales)],
+                          inferior=0, superior=0)
+            restricciones(model, 'Inicio_min', model.N,
+                          [(1, model.vt_inicio), (-1, [model.vt_min[d] for d in secuencia])], inferior=0)
+            restricciones(model, 'Inicio_max', model.N,
+                          [(1, model.vt_inicio), (-1, [model.vt_max[d] for d in secuencia])], superior=0)
+            # Estado de cada fila con el menor y el mayor estado de inicio de los días que representa
+            factor = retencion ** (np.arange(horas - inicio) % por_dia + 1)
+            dia = np.arange(horas - inicio) // por_dia
+            vt_bajo = [(1, model.vt_dep), (factor, [model.vt_min[d] for d in dia])]
+            vt_alto = [(1, model.vt_dep), (factor, [model.vt_max[d] for d in dia])]
         else:
-            return (m.e_ps[h] + m.e_red[h]) * err <= m.p_bdc
-    model.p_max = pyo.Constraint(model.H, rule=p_maxima)
-
-    # Ecuación del balance térmico en el depósito de inercia
-    def balance_rule(m, h):
-        if h == 1:
-            return ((m.e_red[h] + m.e_ps[h]) * cop - m.q_ct[h] - m.v_dep * ef * (m.t_int[h] - m.t_ext[h]) ==
-                    m.v_dep * 1.136888 * (m.t_int[h] - m.t_int_prev))
-        if m.climatizacion[h] == 'Calefaccion':
-            return ((m.e_red[h] + m.e_ps[h]) * cop - m.q_ct[h] - m.v_dep * ef * (m.t_int[h] - m.t_ext[h]) ==
-                    m.v_dep * 1.136888 * (m.t_int[h] - m.t_int[h-1]))
-        return ((m.e_red[h] + m.e_ps[h]) * err * -1 - m.q_ct[h] - m.v_dep * ef * (m.t_int[h] - m.t_ext[h]) ==
-                m.v_dep * 1.136888 * (m.t_int[h] - m.t_int[h-1]))
-    model.Balance = pyo.Constraint(model.H, rule=balance_rule)
-
-    # Condición temperatura (No puede bajar/subir de la temperatura operacional)
-    def temp_lim(m, h):
-        if m.climatizacion[h] == 'Calefaccion':
-            return m.t_int[h] >= datos[tipo]['temperatura']
-        elif m.climatizacion[h] == 'Refrigeracion':
-            return m.t_int[h] <= 7.0
-    model.temp = pyo.Constraint(model.H, rule=temp_lim)
+            vt_bajo = vt_alto = [(1, model.vt_dep)]
+        # Límites de temperatura del depósito y condición de temperatura operacional multiplicados por v_dep
+        restricciones(model, 'temp_min', model.H, vt_bajo + [(-t_min, model.v_dep)], inferior=0)
+        restricciones(model, 'temp_max', model.H, vt_alto + [(-t_max, model.v_dep)], superior=0)
+    else:
+        t_int = list(model.t_int.values())
+        restricciones(model, 'Balance', model.H,
+                      [(signo, model.e_red), (signo, model.e_ps),
+                       (ef * t_ext + np.where(primera, capacidad * t_int_prev, 0), model.v_dep)],
+                      inferior=cargas, superior=cargas,
+                      productos=[(-(ef + capacidad), model.v_dep, t_int),
+                                 (np.where(primera, 0, capacidad), model.v_dep, t_int[:1] + t_int[:-1])])
+
+        # Condición temperatura (No puede bajar/subir de la temperatura operacional)
+        restricciones(model, 'temp', model.H, [(1, model.t_int)],
+                      inferior=np.where(calefaccion, datos[tipo]['temperatura'], None),
+                      superior=np.where(calefaccion, None, 7.0))
     # ---------------------------
     # Objetivo (solo operación)
     # ---------------------------
+    model.opex = pyo.Expression(expr=suma_producto(precio, model.e_red))
 
-    def coste_operativo(m):
-        return sum(m.e_red[h] * m.precio[h] for h in m.H)
-    model.opex = pyo.Expression(rule=coste_operativo)
-
-    model.c_bdc = pyo.Expression(expr=0.35849 * model.p_bdc)
-    model.c_dep = pyo.Expression(expr=4.08 * model.v_dep)
-    model.c_ps = pyo.Expression(expr=311 * sum(model.n_ps[j] for j in model.J))
+    model.c_bdc = pyo.Expression(expr=costes['coste_bdc'] * model.p_bdc)
+    model.c_dep = pyo.Expression(expr=costes['coste_dep'] * model.v_dep)
+    model.c_ps = pyo.Expression(expr=costes['precio_ps'] * sum(model.n_ps[j] for j in model.J))
 
     model.capex = pyo.Expression(
-        expr=model.c_bdc + model.c_dep + model.c_ps + c_i
+        expr=model.c_bdc + model.c_dep + model.c_ps + costes['coste_fijo']
     )
 
     model.OBJ = pyo.Objective(
-        expr=model.opex + model.capex / datos['Bomba de calor']['Ciclo de vida'],
+        expr=model.opex + model.capex / costes['vida'],
         sense=pyo.minimize
     )
+    return model
+
+
+def actualizar_aerotermia(model, df, irradiacion, costes=None):
+    """Cambia el precio, las cargas, la irradiación y, si se indican, los coeficientes de coste de un modelo
+    completo construido con mutable=True
+
+    :param model: Modelo de aerotermia sin días representativos ni temperatura inicial
+    :param df: Dataframe horario con la misma longitud, horas de calefacción y temperatura exterior que el del modelo
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param costes: Coeficientes devueltos por costes_aerotermia
+    """
+    actualizar_parametro(model.precio, df["precio_luz"].to_numpy(dtype=float)[1:] * peso_periodo(df))
+    actualizar_parametro(model.cargas, df["cargas"].to_numpy(dtype=float)[1:])
+    actualizar_parametro(model.irradiacion, np.array(irradiacion, dtype=float)[1:len(df), :len(model.J)])
+    if costes is not None:
+        actualizar_coeficientes(model, costes)
+
+
+def estado_dias(model, dias, representantes):
+    """Producto v_dep·t_int en cada fila de los días indicados de la serie, en un modelo de días representativos
+
+    :param model: Modelo de días representativos resuelto
+    :param dias: Índice de cada día en la serie
+    :param representantes: Día representativo de cada uno de ellos
+    """
+    variacion = valores_variable(model.vt_dep).reshape(len(model.D), -1)
+    factor = pyo.value(model.retencion) ** np.arange(1, variacion.shape[1] + 1)
+    return (valores_variable(model.vt_inicio)[dias][:, None] * factor[None, :] + variacion[representantes]).ravel()
+
+
+def temperatura_deposito(model, consigna, serie=False):
+    """Temperatura del depósito en cada hora de la solución
+
+    En un modelo de días representativos cada día representativo se muestra desde el estado del primer día de la
+    serie que representa; con serie=True se devuelve la temperatura de cada fila de la serie completa.
+
+    :param model: Modelo de aerotermia resuelto
+    :param consigna: Temperatura que se asigna a las horas sin depósito (v_dep = 0), en las que no está definida
+    :param serie: En un modelo de días representativos, temperatura de todos los días de la serie
+    """
+    if hasattr(model, 't_int'):
+        return valores_variable(model.t_int)
+    v_dep = pyo.value(model.v_dep)
+    if hasattr(model, 'vt_inicio'):
+        secuencia = valores_variable(model.secuencia).astype(int)
+        if serie:
+            vt_dep = estado_dias(model, np.arange(len(secuencia)), secuencia)
+        else:
+            vt_dep = estado_dias(model, np.unique(secuencia, return_index=True)[1], np.arange(len(model.D)))
+    else:
+        vt_dep = valores_variable(model.vt_dep)
+    if v_dep <= 1e-9:
+        return np.full(len(vt_dep), float(consigna))
+    return vt_dep / v_dep
+
+
+def valores_horarios(model, consigna):
+    """Energía de red, energía solar y temperatura del depósito en cada hora de la solución
+
+    :param model: Modelo de aerotermia resuelto
+    :param consigna: Temperatura que se asigna a las horas sin depósito (ver temperatura_deposito)
+    """
+    return {'e_red': valores_variable(model.e_red),
+            'e_ps': valores_variable(model.e_ps),
+            't_int': temperatura_deposito(model, consigna)}
+
+
+def solucion_modelo(model, consigna):
+    """Equipos, costes y valores horarios de un modelo de aerotermia resuelto
+
+    :param model: Modelo de aerotermia resuelto
+    :param consigna: Temperatura que se asigna a las horas sin depósito (ver temperatura_deposito)
+    """
+    return {'p_bdc': pyo.value(model.p_bdc), 'v_dep': pyo.value(model.v_dep), 'n_ps': valores_enteros(model.n_ps),
+            'opex': pyo.value(model.opex), 'capex': pyo.value(model.capex), **valores_horarios(model, consigna)}
+
+
+def fijar_equipos(model, equipos):
+    """Fija el depósito y las placas del modelo. La potencia de la bomba de calor queda como mínimo y solo
+    aumenta si alguna hora la necesita
+
+    :param model: Modelo de aerotermia sin resolver
+    :param equipos: Diccionario con p_bdc, v_dep y n_ps
+    """
+    model.p_bdc.setlb(equipos['p_bdc'])
+    model.v_dep.fix(equipos['v_dep'])
+    for j, n in zip(model.J, equipos['n_ps']):
+        model.n_ps[j].fix(n)
+
+
+def despacho_horizonte_rodante(tipo, df, irradiacion, placas, aguas, c_i, datos, equipos, ventana, solape,
+                               lineal=True):
+    """Operación con los equipos fijados resuelta por ventanas consecutivas
+
+    Cada ventana resuelve ventana + solape horas, conserva las ventana primeras y la siguiente parte de la
+    temperatura del depósito en la última hora conservada. El tamaño de cada modelo no depende de la longitud
+    de la serie, de modo que memoria y tiempo crecen de forma lineal con el horizonte.
+
+    :param tipo: Módelo de aerotermia seleccionado
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param placas: Área disponible para las placas solares en cada agua del tejado
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param c_i: Coste invariable de la instalacion del nuevo sistema de climatización
+    :param datos: Datos técnicos de los equipos de climatización
+    :param equipos: Diccionario con p_bdc, v_dep y n_ps de la etapa de dimensionado
+    :param ventana: Horas que se conservan de cada ventana
+    :param solape: Horas adicionales que se resuelven para anticipar las siguientes
+    :param lineal: Formulación del modelo de cada ventana
+    """
+    consigna = datos[tipo]['temperatura']
+    irradiacion = np.array(irradiacion, dtype=float)
+    # Las ventanas se recorren en filas de la serie, que con un paso menor de una hora no son horas
+    ventana = max(1, int(round(ventana / paso_horas(df))))
+    solape = int(round(solape / paso_horas(df)))
+    horas = len(df) - 1
+    equipos = dict(equipos)
+    partes = []
+    t_inicial = None
+    inicio = 0
+    while inicio < horas:
+        fin = min(inicio + ventana + solape, horas)
+        # La fila inicio solo fija el estado del depósito con el que empieza la ventana
+        model = modelo_aerotermia(tipo, df.iloc[inicio:fin + 1], irradiacion[inicio:fin + 1], placas, aguas, c_i,
+                                  datos, lineal=lineal, t_inicial=t_inicial)
+        fijar_equipos(model, equipos)
+        informar(f"Operación {tipo}", f"horas {inicio + 1}-{fin} de {horas}")
+        resolver(model, datos, tipo)
+        conservadas = min(ventana, horas - inicio)
+        valores = valores_horarios(model, consigna)
+        partes.append({clave: serie[:conservadas] for clave, serie in valores.items()})
+        equipos['p_bdc'] = pyo.value(model.p_bdc)
+        t_inicial = valores['t_int'][conservadas - 1]
+        inicio += conservadas
+
+    solucion = {clave: np.concatenate([parte[clave] for parte in partes]) for clave in partes[0]}
+    precio = df["precio_luz"].to_numpy(dtype=float)[1:] * peso_periodo(df)
+    # La inversión es la de la última ventana, que tiene la mayor potencia necesaria
+    return {'p_bdc': equipos['p_bdc'], 'v_dep': equipos['v_dep'], 'n_ps': np.asarray(equipos['n_ps']),
+            'opex': float(precio @ solucion['e_red']), 'capex': pyo.value(model.capex), **solucion}
+
+
+def aerotermia_descompuesta(tipo, df, irradiacion, placas, aguas, c_i, datos, lineal=True):
+    """Dimensiona la aerotermia con los días representativos y, si se pide, repite la operación de toda la serie
+    con el depósito y las placas fijados, de una vez o por horizonte rodante. La potencia de la bomba de calor
+    parte de la del modelo reducido y solo aumenta si alguna hora, que los días representativos no recogen, la
+    necesita. Las series más largas que 'filas maximas' se resuelven siempre por horizonte rodante
+
+    :param tipo: Módelo de aerotermia seleccionado
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param placas: Área disponible para las placas solares en cada agua del tejado
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param c_i: Coste invariable de la instalacion del nuevo sistema de climatización
+    :param datos: Datos técnicos de los equipos de climatización
+    :param lineal: Formulación del modelo de operación
+    """
+    consigna = datos[tipo]['temperatura']
+    opciones = datos.get('Dias representativos') or {}
+    rodante = datos.get('Horizonte rodante') or {}
+    agrupacion = agrupar_dias(df, irradiacion, int(opciones.get('dias') or DIAS_POR_DEFECTO),
+                              int(opciones.get('semilla') or 0))
+    df_dias, irradiacion_dias = datos_agrupados(df, irradiacion, agrupacion)
+    reducido = modelo_aerotermia(tipo, df_dias, irradiacion_dias, placas, aguas, c_i, datos,
+                                 pesos=agrupacion['pesos'], secuencia=agrupacion['asignacion'])
+    informar(f"Modelo {tipo} construido", f"{len(agrupacion['dias'])} días representativos")
+    resolver(reducido, datos, tipo)
+    equipos = solucion_modelo(reducido, consigna)
+    ventana = rodante.get('ventana') or (VENTANA_POR_DEFECTO if len(df) > filas_maximas(datos) else None)
+    if ventana:
+        return despacho_horizonte_rodante(tipo, df, irradiacion, placas, aguas, c_i, datos, equipos,
+                                          int(ventana), int(rodante.get('solape') or 0), lineal=lineal)
+    if not opciones.get('despacho completo', True):
+        return {**equipos, **{clave: expandir(equipos[clave], agrupacion, len(df))[1:] for clave in ('e_red', 'e_ps')},
+                't_int': temperatura_deposito(reducido, consigna, serie=True)[1:len(df)]}
+
+    model = modelo_aerotermia(tipo, df, irradiacion, placas, aguas, c_i, datos, lineal=lineal)
+    fijar_equipos(model, equipos)
+    informar(f"Modelo {tipo} construido", "operación de toda la serie")
+    resolver(model, datos, tipo)
+    return solucion_modelo(model, consigna)
+
+
+def aerotermia_por_partes(df, datos):
+    """Indica si la aerotermia se resuelve con días representativos u horizonte rodante en lugar de con un solo
+    modelo de toda la serie
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param datos: Datos técnicos de los equipos de climatización
+    """
+    return bool((datos.get('Dias representativos') or {}).get('dias') or
+                (datos.get('Horizonte rodante') or {}).get('ventana') or len(df) > filas_maximas(datos))
+
+
+def formulacion_lineal(datos, tipo):
+    """Indica si la aerotermia se formula de forma lineal. La formulación bilineal solo se mantiene con los
+    solvers que admiten productos de variables
+
+    :param datos: Datos técnicos de los equipos de climatización
+    :param tipo: Módelo de aerotermia seleccionado
+    """
+    return not (configuracion_solver(datos, tipo).get('formulacion') == 'bilineal' and admite_no_convexos(datos, tipo))
+
+
+def optimizar_aerotermia(tipo, df, irradiacion, placas, aguas, c_i, datos):
+    """Solución del modelo de aerotermia con la formulación y la descomposición configuradas, sin guardar resultados
+
+    :param tipo: Módelo de aerotermia seleccionado
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param placas: Área disponible para las placas solares en cada agua del tejado
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param c_i: Coste invariable de la instalacion del nuevo sistema de climatización
+    :param datos: Datos técnicos de los equipos de climatización
+    """
+    irradiacion = irradiacion_filas(df, irradiacion)
+    bilineal = not formulacion_lineal(datos, tipo)
+    if aerotermia_por_partes(df, datos):
+        return aerotermia_descompuesta(tipo, df, irradiacion, placas, aguas, c_i, datos, lineal=not bilineal)
     # ---------------------------
-    # SOLVER SCIP
+    # SOLVER (ver optimizador.sistemas.solver)
     # ---------------------------
-    load_dotenv(dotenv_path=".env")
-    opt = pyo.SolverFactory(
-        "scip",
-        executable=os.getenv("RUTA_ARCHIVO")
-    )
-    opt.options['limits/gap'] = 0.01
-    opt.solve(model, tee=True)
+    t_ext = df['T_exterior'].to_numpy(dtype=float)
+    partes = (tipo, len(df), paso_horas(df), huella_vector(mascara_calefaccion(df)), huella_vector(t_ext),
+              np.asarray(placas, dtype=float).tolist(), int(aguas), not bilineal)
+    model = resolver_modelo_vivo(
+        partes, lambda mutable: modelo_aerotermia(tipo, df, irradiacion, placas, aguas, c_i, datos,
+                                                  lineal=not bilineal, mutable=mutable),
+        lambda m: actualizar_aerotermia(m, df, irradiacion, costes_aerotermia(tipo, datos, c_i)), datos, tipo)
+    return solucion_modelo(model, datos[tipo]['temperatura'])
+
+
+def guardar_aerotermia(tipo, df, irradiacion, solucion, carpeta, datos):
+    """Guarda los resultados horarios y las gráficas de una solución de aerotermia y devuelve el resumen
+
+    :param tipo: Módelo de aerotermia seleccionado
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param solucion: Solución devuelta por optimizar_aerotermia
+    :param carpeta: Carpeta en la que se guardan los resultados y las gráficas
+    :param datos: Datos técnicos de los equipos de climatización
+    """
+    cargas = df["cargas"].to_numpy(dtype=float)
+    t_ext = df['T_exterior'].to_numpy(dtype=float)
+    climatizacion = df['climatizacion'].to_numpy()
+    ef = datos["Deposito"]["eficiencia"]
+    cop = float(datos[tipo]["cop"])
+    err = float(datos[tipo]["err"])
+
+    irradiacion = irradiacion_filas(df, irradiacion)
     # Guardar estado final
-    df_results = pd.DataFrame({'cargas': (np.round(pyo.value(model.q_ct[h]), 2) for h in model.H),
-                               't_int': (np.round(pyo.value(model.t_int[h]), 2) for h in model.H),
-                               'e_red': (np.round(pyo.value(model.e_red[h]), 2) for h in model.H),
-                               'e_ps': (np.round(pyo.value(model.e_ps[h]), 2) for h in model.H),
-                               'Perdidas_termicas': (np.round(pyo.value(model.v_dep)*ef*(
-                                   pyo.value(model.t_int[h]-t_ext[h])), 2) for h in model.H),
-                               'Generacion_solar': (np.round(sum(0.2255 * irradiacion[h] * np.array(
-                                   list({j: pyo.value(model.n_ps[j]) for j in model.J}.values()))
-                               ), 2) for h in model.H)})
-    df_results.to_csv(f"Resultados/resultados_modelo_{tipo}.csv", index=False)
+    v_dep = solucion['v_dep']
+    t_int = solucion['t_int']
+    df_results = pd.DataFrame({'cargas': cargas[1:],
+                               't_int': t_int,
+                               'e_red': solucion['e_red'],
+                               'e_ps': solucion['e_ps'],
+                               'Perdidas_termicas': v_dep * ef * (t_int - t_ext[1:]),
+                               'Generacion_solar': (0.2255 * irradiacion[1:] * solucion['n_ps']).sum(axis=1)})
+    guardar_resultados(df_results, f"resultados_modelo_{tipo}", carpeta)
+    informar(f"Resultados {tipo} guardados")
     resultado = {
-        "Costo operativo anual": f"{np.round(pyo.value(model.opex), 2)} €",
-        f"Potencia {tipo}": f"{np.round(pyo.value(model.p_bdc)/1000, 2)} kW",
-        "Volumen deposito de inercia": f"{float(np.round(pyo.value(model.v_dep), 2))} L",
-        "Placas": np.array(list({j: pyo.value(model.n_ps[j]) for j in model.J}.values())),
-        "Inversion": f"{float(np.round(pyo.value(model.capex), 2))}  €"
+        "Costo operativo anual": f"{np.round(solucion['opex'], 2)} €",
+        f"Potencia {tipo}": f"{np.round(solucion['p_bdc']/1000, 2)} kW",
+        "Volumen deposito de inercia": f"{float(np.round(v_dep, 2))} L",
+        "Placas": solucion['n_ps'],
+        "Inversion": f"{float(np.round(solucion['capex'], 2))}  €"
     }
     df_results.set_index(df.index[1:], inplace=True)
     df_results['climatizacion'] = climatizacion[1:]
-    df_results["ef"] = df_results["climatizacion"].apply(lambda x: err if x == "Refrigeracion" else cop)
+    df_results["ef"] = np.where(df_results["climatizacion"] == "Refrigeracion", err, cop)
     df_results['Q_bdc,el'] = df_results['e_red'] * df_results['ef']
     df_results['Q_bdc,ps'] = df_results['e_ps'] * df_results['ef']
     df_results['Q_bdc'] = df_results['Q_bdc,el'] + df_results['Q_bdc,ps']
-    df_results['Q_dep'] = pyo.value(model.v_dep) * 1.36888 * (df_results["t_int"])
-    sns.scatterplot(data=df_results, x=df_results.index, y='Q_bdc', s=9)
-    plt.ylabel('Energia [W·h]')
-    plt.xlabel("Año")
-    plt.savefig(f'Resultados/Todos los datos {tipo}.png')
-    plt.close()
-
-    data = df_results.groupby(by=df_results.index.hour)[['Q_dep', 'Q_bdc,el', 'Q_bdc,ps']].mean()
-    data.reset_index(inplace=True)
-    data = pd.melt(data, id_vars=data.columns[0], value_vars=['Q_dep', 'Q_bdc,el', 'Q_bdc,ps'])
-    g = sns.FacetGrid(data, col="variable", sharey=False)
-    g.map(sns.barplot, data.columns[0], "value")
-    g.set_titles(col_template="{col_name}")
-    g.set_axis_labels("Hora del día", "Energia [W·h]")
-    for ax in g.axes.flatten():
-        ax.tick_params(axis='x', labelsize=7)
-        plt.setp(ax.get_xticklabels(), rotation=90)
-    g.figure.tight_layout(pad=1)
-    plt.savefig(f'Resultados/Discriminación horaria {tipo}.png')
-    plt.close()
-
-    data = df_results.groupby(by=df_results.index.month)[['Q_bdc']].mean()
-    data.reset_index(inplace=True)
-    data = pd.melt(data, id_vars=data.columns[0], value_vars=['Q_bdc'])
-    g = sns.FacetGrid(data, col="variable", sharey=False)
-    g.map(sns.barplot, data.columns[0], "value")
-    g.set_titles(col_template="{col_name}")
-    g.set_axis_labels("Mes del año", "Energia [W·h]")
-    g.figure.tight_layout(pad=1)
-    plt.savefig(f'Resultados/Discriminación mensual {tipo}.png')
-    plt.close()
+    df_results['Q_dep'] = v_dep * 1.36888 * (df_results["t_int"])
+    generar_graficas(df_results[['Q_bdc', 'Q_dep', 'Q_bdc,el', 'Q_bdc,ps']], tipo, carpeta)
     return resultado
+
+
+@medido
+def calculo_aerotermia(tipo, df, irradiacion, placas, aguas, c_i, carpeta="Resultados", datos=None):
+    """Funcion para la optimización económica de sistemas de climatización por aerotermia
+
+    :param tipo: Módelo de aerotermia seleccionado
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param placas:
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param c_i: Coste invariable de la instalacion del nuevo sistema de climatización
+    :param carpeta: Carpeta en la que se guardan los resultados y las gráficas
+    :param datos: Datos técnicos de los equipos de climatización. Por defecto los de cargar_configuracion
+    """
+    # ---------------------------
+    # CARGA DE DATOS (usa tus rutas/objetos)
+    # ---------------------------
+    if datos is None:
+        datos = cargar_configuracion().datos
+    anotar(sistema=tipo, horas=len(df))
+
+    irradiacion = irradiacion_filas(df, irradiacion)
+
+    solucion = optimizar_aerotermia(tipo, df, irradiacion, placas, aguas, c_i, datos)
+    informar(f"Solución {tipo} obtenida")
+    return guardar_aerotermia(tipo, df, irradiacion, solucion, carpeta, datos)
@@ -1,41 +1,69 @@
 """Módulo para el cálculo de sistemas de climatización por aire acondicioanado"""
 import math
-import os
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import seaborn as sns
-import yaml
 import pyomo.environ as pyo
 
-from dotenv import load_dotenv
+from optimizador.configuracion import cargar_configuracion
+from optimizador.graficas import generar_graficas
+from optimizador.metricas import anotar, medido
+from optimizador.progreso import informar
+from optimizador.salida_resultados import guardar_resultados
+from optimizador.serie_temporal import filas_dia, filas_maximas, peso_periodo
+from optimizador.sistemas.construccion import (actualizar_coeficientes, actualizar_parametro, coeficientes,
+                                               irradiacion_filas, mascara_calefaccion, parametro, restricciones,
+                                               suma_producto)
+from optimizador.sistemas.dias_representativos import DIAS_POR_DEFECTO, agrupar_dias, datos_agrupados
+from optimizador.sistemas.modelos_vivos import huella_vector, resolver_modelo_vivo
+from optimizador.sistemas.solver import resolver, valores_enteros, valores_variable
 
 
-def calculo_aire_acondicionado(df, irradiacion, area, n_ps, aguas, c_i):
-    """Funcion para la optimización económica de sistemas de climatización por aerotermia
+def costes_aire_acondicionado(datos, c_i):
+    """Coeficientes del coste de inversión del modelo de aire acondicionado
+
+    :param datos: Datos técnicos de los equipos de climatización
+    :param c_i: Coste invariable de la instalacion del nuevo sistema de climatización
+    """
+    return {'coste_bdc': datos['Aire acondicionado']['coste potencia'],
+            'coste_interior': datos['Aire acondicionado']['habitaciones'] *
+            datos['Aire acondicionado']['precio Ud. Interior'],
+            'precio_ps': datos['Placas solares']['precio'], 'coste_fijo': c_i,
+            'vida': datos['Bomba de calor']['Ciclo de vida']}
+
+
+@medido
+def modelo_aire_acondicionado(df, irradiacion, area, n_ps, aguas, c_i, datos, mutable=False, pesos=None):
+    """Construcción del modelo de optimización de sistemas de climatización por aire acondicionado
+
+    Con pesos el modelo es el de los días representativos (ver dias_representativos): el coste de operación de
+    cada día se multiplica por el número de días que representa. Sin depósito, los días no se enlazan entre sí.
 
-    :param tipo: Módelo de aerotermia seleccionado
     :param df: Dataframe con todos los parámetros que tienen carácter horario
     :param irradiacion: Resultados de irradiacion incidente en la residencia
-    :param placas:
+    :param area: Área disponible para las placas solares en cada agua del tejado
+    :param n_ps: Placas solares ya instaladas en cada agua. Si todas son 0 se optimiza su número
     :param aguas: Numero de aguas del tejado de la residencia en estudio
     :param c_i: Coste invariable de la instalacion del nuevo sistema de climatización
+    :param datos: Datos técnicos de los equipos de climatización
+    :param mutable: Precio, cargas, irradiación y coeficientes del coste de inversión como parámetros mutables
+        que se cambian con actualizar_aire_acondicionado
+    :param pesos: Número de días que representa cada día de df
     """
-    # ---------------------------
-    # CARGA DE DATOS (usa tus rutas/objetos)
-    # ---------------------------
-    with open('datos_tecnicos.yaml', "r", encoding="utf-8") as f:
-        datos = yaml.safe_load(f)
-
     horas = len(df)
+    anotar(sistema='Aire acondicionado', horas=horas, mutable=mutable)
 
     area_tejado = np.array(area) / (1.909 * 1.134)
 
-    cargas = df["cargas"].to_numpy()
-    precio = df["precio_luz"].to_numpy()
-    climatizacion = df['climatizacion'].to_numpy()
+    cargas = df["cargas"].to_numpy(dtype=float)
+    # Coste de cada fila: precio · potencia · Δt, en coste anual (ver optimizador.serie_temporal)
+    precio = df["precio_luz"].to_numpy(dtype=float) * peso_periodo(df)
+    calefaccion = mascara_calefaccion(df)
+    if pesos is not None:
+        precio = precio * np.repeat(np.asarray(pesos, dtype=float), filas_dia(df))
 
-    irradiacion = np.array(irradiacion)
+    irradiacion = irradiacion_filas(df, irradiacion)
+    cop = float(datos['Aire acondicionado']["cop"])
+    err = float(datos['Aire acondicionado']["err"])
 
     model = pyo.ConcreteModel()
 
@@ -44,42 +72,29 @@ def calculo_aire_acondicionado(df, irradiacion, area, n_ps, aguas, c_i):
     # ---------------------------
     model.H = pyo.RangeSet(0, horas - 1)
     model.J = pyo.RangeSet(0, aguas - 1)
-    # ---------------------------
-    # Parámetros
-    # ---------------------------
-    model.q_ct = pyo.Param(
-        model.H,
-        initialize={h: float(cargas[h]) for h in model.H}
-    )
-    model.climatizacion = pyo.Param(
-        model.H,
-        initialize={h: str(climatizacion[h]) for h in model.H}
-    )
-    model.precio = pyo.Param(
-        model.H,
-        initialize={h: float(precio[h]) for h in model.H}
-    )
-    model.g = pyo.Param(
-        model.H, model.J,
-        initialize={(h, j): float(irradiacion[h][j]) for h in model.H for j in model.J}
-    )
-    cop = float(datos['Aire acondicionado']["cop"])
-    err = float(datos['Aire acondicionado']["err"])
+    if mutable:
+        precio = list(parametro(model, 'precio', precio, model.H).values())
+        cargas = np.array(list(parametro(model, 'cargas', cargas, model.H).values()), dtype=object)
+        irradiacion = np.array(list(parametro(model, 'irradiacion', irradiacion[:, :aguas], model.H, model.J)
+                                    .values()), dtype=object).reshape(horas, aguas)
+    costes = coeficientes(model, costes_aire_acondicionado(datos, c_i), mutable)
     # ---------------------------
     # Variables
     # ---------------------------
     model.p_bdc = pyo.Var(bounds=(0, datos["Bomba de calor"]["Limite"]))
     model.e_red = pyo.Var(model.H, domain=pyo.NonNegativeReals)
     model.vertido_ps = pyo.Var(model.H, domain=pyo.NonNegativeReals)
+    rendimiento = np.where(calefaccion, cop, err)
+    signo = np.where(calefaccion, cop, -err)
     if sum(n_ps[j] for j in model.J) > 0:
-        model.e_ps = pyo.Param(
-            model.H,
-            initialize={h: float(sum(irradiacion[h, j] * n_ps[j] * datos['Placas solares']['eficiencia']
-                                     for j in model.J)) for h in model.H}
-        )
+        # Con las placas ya dimensionadas la generación solar es un dato de entrada
+        e_ps = irradiacion[:, :aguas] @ (np.array(n_ps[:aguas], dtype=float) * datos['Placas solares']['eficiencia'])
         model.n_ps = pyo.Param(
             model.J, initialize={j: float(n_ps[j]) for j in model.J}
         )
+        terminos_ps = []
+        limite_p_max = -rendimiento * e_ps
+        balance = cargas - signo * e_ps
     else:
         model.e_ps = pyo.Var(model.H, domain=pyo.NonNegativeReals)
         model.n_ps = pyo.Var(
@@ -87,107 +102,271 @@ def calculo_aire_acondicionado(df, irradiacion, area, n_ps, aguas, c_i):
             within=pyo.NonNegativeIntegers,
             bounds=lambda m, j: (0, int(area_tejado[j]))
         )
+        restricciones(model, 'SolarLimit', model.H,
+                      [(1, model.e_ps)] + [(-irradiacion[:, j] * 0.2225, model.n_ps[j]) for j in model.J],
+                      superior=0)
+        terminos_ps = [model.e_ps]
+        limite_p_max = 0
+        balance = cargas
 
     # ---------------------------
     # Restricciones
     # ---------------------------
-        def solar_rule(m, h):
-            return m.e_ps[h] <= sum(m.g[h, j] * m.n_ps[j] for j in m.J) * 0.2225
-        model.SolarLimit = pyo.Constraint(model.H, rule=solar_rule)
-
     # Limito la potencia máxima que puede dar la BdC aprovechando electricidad de placas y de red
-    def p_maxima(m, h):
-        if m.climatizacion[h] == 'Calefaccion':
-            return (m.e_ps[h] + m.e_red[h] - m.vertido_ps[h]) * cop <= m.p_bdc
-        else:
-            return (m.e_ps[h] + m.e_red[h] - m.vertido_ps[h]) * err <= m.p_bdc
-    model.p_max = pyo.Constraint(model.H, rule=p_maxima)
+    restricciones(model, 'p_max', model.H,
+                  [(rendimiento, v) for v in terminos_ps + [model.e_red]] +
+                  [(-rendimiento, model.vertido_ps), (-1, model.p_bdc)],
+                  superior=limite_p_max)
 
     # Ecuación del balance térmico para aire acondicionado
-    def balance_rule(m, h):
-        if m.climatizacion[h] == 'Calefaccion':
-            return (m.e_red[h] + m.e_ps[h] - m.vertido_ps[h]) * cop == m.q_ct[h]
-        return (m.e_red[h] + m.e_ps[h] - m.vertido_ps[h]) * err * -1 == m.q_ct[h]
-    model.Balance = pyo.Constraint(model.H, rule=balance_rule)
+    restricciones(model, 'Balance', model.H,
+                  [(signo, v) for v in terminos_ps + [model.e_red]] + [(-signo, model.vertido_ps)],
+                  inferior=balance, superior=balance)
 
     # ---------------------------
     # Objetivo (solo operación)
     # ---------------------------
-
-    def coste_operativo(m):
-        return sum(m.e_red[h] * m.precio[h] for h in m.H)
-    model.opex = pyo.Expression(rule=coste_operativo)
+    model.opex = pyo.Expression(expr=suma_producto(precio, model.e_red))
     model.n_bdc = pyo.Expression(expr=math.ceil(
         datos['Aire acondicionado']['habitaciones'] / datos['Aire acondicionado']['split']))
-    model.c_bdc = pyo.Expression(expr=0.24778 * model.p_bdc)
-    model.Coste_ud_interior = pyo.Expression(
-        expr=datos['Aire acondicionado']['habitaciones'] * datos['Aire acondicionado']['precio Ud. Interior'])
-    model.c_ps = pyo.Expression(expr=311 * sum(model.n_ps[j] for j in model.J))
+    model.c_bdc = pyo.Expression(expr=costes['coste_bdc'] * model.p_bdc)
+    model.Coste_ud_interior = pyo.Expression(expr=costes['coste_interior'])
+    model.c_ps = pyo.Expression(expr=costes['precio_ps'] * sum(model.n_ps[j] for j in model.J))
 
     model.capex = pyo.Expression(
-        expr=model.c_bdc + model.Coste_ud_interior + model.c_ps + c_i
+        expr=model.c_bdc + model.Coste_ud_interior + model.c_ps + costes['coste_fijo']
     )
 
     model.OBJ = pyo.Objective(
-        expr=model.opex + model.capex / datos['Bomba de calor']['Ciclo de vida'],
+        expr=model.opex + model.capex / costes['vida'],
         sense=pyo.minimize
     )
+    return model
+
+
+def actualizar_aire_acondicionado(model, df, irradiacion, costes=None):
+    """Cambia el precio, las cargas, la irradiación y, si se indican, los coeficientes de coste de un modelo
+    construido con mutable=True
+
+    :param model: Modelo de aire acondicionado
+    :param df: Dataframe horario con la misma longitud y las mismas horas de calefacción que el del modelo
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param costes: Coeficientes devueltos por costes_aire_acondicionado
+    """
+    actualizar_parametro(model.precio, df["precio_luz"].to_numpy(dtype=float) * peso_periodo(df))
+    actualizar_parametro(model.cargas, df["cargas"].to_numpy(dtype=float))
+    actualizar_parametro(model.irradiacion, irradiacion_filas(df, irradiacion)[:, :len(model.J)])
+    if costes is not None:
+        actualizar_coeficientes(model, costes)
+
+
+def placas_fijas(area, n_ps, aguas):
+    """Indica si el número de placas solares está fijado de antemano
+
+    Lo está cuando se reciben placas ya dimensionadas o cuando en ninguna agua del tejado cabe una placa.
+
+    :param area: Área disponible para las placas solares en cada agua del tejado
+    :param n_ps: Placas solares ya instaladas en cada agua
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    """
+    if sum(n_ps[j] for j in range(aguas)) > 0:
+        return True
+    return all(int(a) == 0 for a in np.array(area[:aguas]) / (1.909 * 1.134))
+
+
+def solucion_aire_acondicionado(df, irradiacion, n_ps, aguas, c_i, datos):
+    """Solución analítica del modelo de aire acondicionado con el número de placas fijado
+
+    Sin variables enteras el balance fija en cada hora la electricidad neta que necesita el equipo: lo que
+    no cubren las placas se compra a la red y el excedente se vierte. La potencia es el máximo horario.
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param n_ps: Placas solares instaladas en cada agua
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param c_i: Coste invariable de la instalacion del nuevo sistema de climatización
+    :param datos: Datos técnicos de los equipos de climatización
+    """
+    cargas = df["cargas"].to_numpy(dtype=float)
+    precio = df["precio_luz"].to_numpy(dtype=float)
+    calefaccion = mascara_calefaccion(df)
+    cop = float(datos['Aire acondicionado']["cop"])
+    err = float(datos['Aire acondicionado']["err"])
+    if (precio < 0).any():
+        raise ValueError("Con precios eléctricos negativos el modelo de aire acondicionado no está acotado")
+
+    n_ps = np.array(n_ps[:aguas], dtype=float)
+    e_ps = irradiacion_filas(df, irradiacion)[:, :aguas] @ (n_ps * datos['Placas solares']['eficiencia'])
+    # Electricidad que consume el equipo en cada hora y parte que no cubren las placas
+    consumo = np.where(calefaccion, cargas / cop, -cargas / err)
+    e_red = np.maximum(consumo - e_ps, 0)
+    potencia = np.where(calefaccion, cop, err) * consumo
+    p_bdc = max(float(potencia.max()) if len(potencia) else 0.0, 0.0)
+    if p_bdc > datos["Bomba de calor"]["Limite"]:
+        raise ValueError("La potencia necesaria supera el límite de la bomba de calor")
+
+    costes = costes_aire_acondicionado(datos, c_i)
+    capex = (costes['coste_bdc'] * p_bdc + costes['coste_interior'] + costes['precio_ps'] * n_ps.sum() +
+             costes['coste_fijo'])
+    return {
+        'e_red': e_red,
+        'e_ps': e_ps,
+        'n_ps': n_ps,
+        'p_bdc': p_bdc,
+        'opex': float(e_red @ precio) * peso_periodo(df),
+        'capex': float(capex)
+    }
+
+
+def resolver_aire_acondicionado(df, irradiacion, area, n_ps, aguas, c_i, datos):
+    """Resolución del modelo de aire acondicionado con pyomo
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param area: Área disponible para las placas solares en cada agua del tejado
+    :param n_ps: Placas solares ya instaladas en cada agua. Si todas son 0 se optimiza su número
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param c_i: Coste invariable de la instalacion del nuevo sistema de climatización
+    :param datos: Datos técnicos de los equipos de climatización
+    """
     # ---------------------------
-    # SOLVER SCIP
+    # SOLVER (ver optimizador.sistemas.solver)
     # ---------------------------
-    load_dotenv(dotenv_path=".env")
-    opt = pyo.SolverFactory(
-        "scip",
-        executable=os.getenv("RUTA_ARCHIVO")
-    )
-    opt.solve(model, tee=True)
+    partes = ('Aire acondicionado', len(df), huella_vector(mascara_calefaccion(df)),
+              np.asarray(area, dtype=float).tolist(), np.asarray(n_ps[:aguas], dtype=float).tolist(), int(aguas))
+    model = resolver_modelo_vivo(
+        partes, lambda mutable: modelo_aire_acondicionado(df, irradiacion, area, n_ps, aguas, c_i, datos, mutable),
+        lambda m: actualizar_aire_acondicionado(m, df, irradiacion, costes_aire_acondicionado(datos, c_i)), datos,
+        'Aire acondicionado')
+    if sum(n_ps[j] for j in model.J) > 0:
+        e_ps = irradiacion_filas(df, irradiacion)[:, :aguas] @ (
+            np.array(n_ps[:aguas], dtype=float) * datos['Placas solares']['eficiencia'])
+    else:
+        e_ps = valores_variable(model.e_ps)
+    return {
+        'e_red': valores_variable(model.e_red),
+        'e_ps': e_ps,
+        'n_ps': valores_enteros(model.n_ps),
+        'p_bdc': pyo.value(model.p_bdc),
+        'opex': pyo.value(model.opex),
+        'capex': pyo.value(model.capex)
+    }
+
+
+def aire_acondicionado_descompuesto(df, irradiacion, area, aguas, c_i, datos):
+    """Dimensiona las placas con los días representativos y calcula la operación de toda la serie con la
+    solución analítica. El tamaño del modelo no depende de la longitud de la serie
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param area: Área disponible para las placas solares en cada agua del tejado
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param c_i: Coste invariable de la instalacion del nuevo sistema de climatización
+    :param datos: Datos técnicos de los equipos de climatización
+    """
+    opciones = datos.get('Dias representativos') or {}
+    agrupacion = agrupar_dias(df, irradiacion, int(opciones.get('dias') or DIAS_POR_DEFECTO),
+                              int(opciones.get('semilla') or 0))
+    df_dias, irradiacion_dias = datos_agrupados(df, irradiacion, agrupacion)
+    reducido = modelo_aire_acondicionado(df_dias, irradiacion_dias, area, [0]*aguas, aguas, c_i, datos,
+                                         pesos=agrupacion['pesos'])
+    informar("Modelo Aire acondicionado construido", f"{len(agrupacion['dias'])} días representativos")
+    resolver(reducido, datos, 'Aire acondicionado')
+    return solucion_aire_acondicionado(df, irradiacion, valores_enteros(reducido.n_ps), aguas, c_i, datos)
+
+
+def optimizar_aire_acondicionado(df, irradiacion, area, n_ps, aguas, c_i, datos, metodo="auto"):
+    """Solución del modelo de aire acondicionado con el método indicado, sin guardar resultados
+
+    Con más filas que 'filas maximas' de la sección Serie temporal, el método pyomo dimensiona las placas con
+    los días representativos (ver aire_acondicionado_descompuesto).
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param area: Área disponible para las placas solares en cada agua del tejado
+    :param n_ps: Placas solares ya instaladas en cada agua. Si todas son 0 se optimiza su número
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param c_i: Coste invariable de la instalacion del nuevo sistema de climatización
+    :param datos: Datos técnicos de los equipos de climatización
+    :param metodo: "analitico", "pyomo" o "auto" (analítico siempre que el número de placas esté fijado)
+    """
+    irradiacion = irradiacion_filas(df, irradiacion)
+    if metodo == "auto":
+        metodo = "analitico" if placas_fijas(area, n_ps, aguas) else "pyomo"
+    if metodo == "analitico":
+        if not placas_fijas(area, n_ps, aguas):
+            raise ValueError("La solución analítica necesita el número de placas fijado")
+        return solucion_aire_acondicionado(df, irradiacion, n_ps, aguas, c_i, datos)
+    if metodo == "pyomo":
+        if len(df) > filas_maximas(datos):
+            return aire_acondicionado_descompuesto(df, irradiacion, area, aguas, c_i, datos)
+        return resolver_aire_acondicionado(df, irradiacion, area, n_ps, aguas, c_i, datos)
+    raise ValueError(f"Método de cálculo desconocido: {metodo}")
+
+
+def guardar_aire_acondicionado(df, irradiacion, solucion, carpeta, datos):
+    """Guarda los resultados horarios y las gráficas de una solución de aire acondicionado y devuelve el resumen
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param solucion: Solución devuelta por optimizar_aire_acondicionado
+    :param carpeta: Carpeta en la que se guardan los resultados y las gráficas
+    :param datos: Datos técnicos de los equipos de climatización
+    """
+    cargas = df["cargas"].to_numpy(dtype=float)
+    climatizacion = df['climatizacion'].to_numpy()
+    cop = float(datos['Aire acondicionado']["cop"])
+    err = float(datos['Aire acondicionado']["err"])
+
+    irradiacion = irradiacion_filas(df, irradiacion)
     # Guardar estado final
-    df_results = pd.DataFrame({'Horas': model.H,
-                               'cargas': (np.round(pyo.value(model.q_ct[h]), 2) for h in model.H),
-                               'e_red': (np.round(pyo.value(model.e_red[h]), 2) for h in model.H),
-                               'e_ps': (np.round(pyo.value(model.e_ps[h]), 2) for h in model.H),
-                               'Generacion_solar': (np.round(sum(0.2255 * irradiacion[h] * np.array(
-                                   list({j: pyo.value(model.n_ps[j]) for j in model.J}.values()))
-                               ), 2) for h in model.H)})
-    df_results.to_csv("Resultados/resultados_modelo_Aire acondicionado.csv", index=False)
+    df_results = pd.DataFrame({'Horas': range(len(df)),
+                               'cargas': cargas,
+                               'e_red': solucion['e_red'],
+                               'e_ps': solucion['e_ps'],
+                               'Generacion_solar': (0.2255 * irradiacion * solucion['n_ps']).sum(axis=1)})
+    guardar_resultados(df_results, "resultados_modelo_Aire acondicionado", carpeta)
+    informar("Resultados Aire acondicionado guardados")
     resultado = {
-        "Costo operativo anual": f"{np.round(pyo.value(model.opex), 2)} €",
-        "Potencia Bomba de calor": f"{np.round(pyo.value(model.p_bdc)/1000, 2)} kW",
-        "placas": np.array(list({j: pyo.value(model.n_ps[j]) for j in model.J}.values())),
-        "Inversion": f"{float(np.round(pyo.value(model.capex), 2))} €"
+        "Costo operativo anual": f"{np.round(solucion['opex'], 2)} €",
+        "Potencia Bomba de calor": f"{np.round(solucion['p_bdc']/1000, 2)} kW",
+        "placas": solucion['n_ps'],
+        "Inversion": f"{float(np.round(solucion['capex'], 2))} €"
     }
     df_results.set_index(df.index, inplace=True)
     df_results['climatizacion'] = climatizacion
-    df_results["ef"] = df_results["climatizacion"].apply(lambda x: err if x == "Refrigeracion" else cop)
+    df_results["ef"] = np.where(df_results["climatizacion"] == "Refrigeracion", err, cop)
     df_results['Q_ac,el'] = df_results['e_red'] * df_results['ef']
     df_results['Q_ac,ps'] = df_results['e_ps'] * df_results['ef']
     df_results['Q_ac'] = df_results['Q_ac,el'] + df_results['Q_ac,ps']
-    sns.scatterplot(data=df_results, x=df_results.index, y='Q_ac', s=9, color='red')
-    plt.ylabel('Energia [W·h]')
-    plt.xlabel("Año")
-    plt.savefig('Resultados/Todos los datos Aire acondicionado.png')
-    plt.close()
-
-    data = df_results.groupby(by=df_results.index.hour)[['Q_ac,el', 'Q_ac,ps']].mean()
-    data.reset_index(inplace=True)
-    data = pd.melt(data, id_vars=data.columns[0], value_vars=['Q_ac,el', 'Q_ac,ps'])
-    g = sns.FacetGrid(data, col="variable", sharey=False)
-    g.map(sns.barplot, data.columns[0], "value", color='red')
-    g.set_titles(col_template="{col_name}")
-    g.set_axis_labels("Hora del día", "Energia [W·h]")
-    for ax in g.axes.flatten():
-        ax.tick_params(axis='x', labelsize=7)
-        plt.setp(ax.get_xticklabels(), rotation=90)
-    plt.savefig('Resultados/Discriminación horaria Aire acondicionado.png')
-    plt.close()
-
-    data = df_results.groupby(by=df_results.index.month)[['Q_ac']].mean()
-    data.reset_index(inplace=True)
-    data = pd.melt(data, id_vars=data.columns[0], value_vars=['Q_ac'])
-    g = sns.FacetGrid(data, col="variable", sharey=False)
-    g.map(sns.barplot, data.columns[0], "value", color='red')
-    g.set_titles(col_template="{col_name}")
-    g.set_axis_labels("Mes del año", "Energia [W·h]")
-    plt.savefig('Resultados/Discriminación mensual Aire acondicionado.png')
-    plt.close()
+    generar_graficas(df_results[['Q_ac', 'Q_ac,el', 'Q_ac,ps']], 'Aire acondicionado', carpeta)
     return resultado
+
+
+@medido
+def calculo_aire_acondicionado(df, irradiacion, area, n_ps, aguas, c_i, metodo="auto", carpeta="Resultados",
+                               datos=None):
+    """Funcion para la optimización económica de sistemas de climatización por aire acondicionado
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param area: Área disponible para las placas solares en cada agua del tejado
+    :param n_ps: Placas solares ya instaladas en cada agua. Si todas son 0 se optimiza su número
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param c_i: Coste invariable de la instalacion del nuevo sistema de climatización
+    :param metodo: "analitico", "pyomo" o "auto" (analítico siempre que el número de placas esté fijado)
+    :param carpeta: Carpeta en la que se guardan los resultados y las gráficas
+    :param datos: Datos técnicos de los equipos de climatización. Por defecto los de cargar_configuracion
+    """
+    # ---------------------------
+    # CARGA DE DATOS (usa tus rutas/objetos)
+    # ---------------------------
+    if datos is None:
+        datos = cargar_configuracion().datos
+    anotar(sistema='Aire acondicionado', horas=len(df), metodo=metodo)
+
+    irradiacion = irradiacion_filas(df, irradiacion)
+
+    solucion = optimizar_aire_acondicionado(df, irradiacion, area, n_ps, aguas, c_i, datos, metodo)
+    informar("Solución Aire acondicionado obtenida")
+    return guardar_aire_acondicionado(df, irradiacion, solucion, carpeta, datos)
@@ -1,13 +1,83 @@
 """Módulo para el cálculo de todos los sistemas de climatización del software"""
-import yaml
+import os
+
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 import pandas as pd
 
+from optimizador.configuracion import cargar_configuracion
+from optimizador.metricas import anotar, medido
+from optimizador.salida_resultados import opciones_salida, redondear
 from optimizador.sistemas import seleccion_sistema
+from optimizador.sistemas.frontera_pareto import frontera_sistemas, puntos_frontera
+from optimizador.sistemas.memoria_compartida import compartir_datos, liberar_datos, reconstruir_datos
+
+SISTEMAS = ('Aerotermia de alta', 'Aerotermia de baja', 'Gas')
+
+
+def carpeta_sistema(carpeta, nuevo):
+    """Subcarpeta de resultados de un sistema. Con refrigeración varios sistemas guardan los resultados del aire
+    acondicionado con los mismos nombres de archivo, de modo que cada uno escribe en su propia carpeta
+
+    :param carpeta: Carpeta de resultados del cálculo
+    :param nuevo: Sistema a estudiar
+    """
+    ruta = os.path.join(carpeta, nuevo)
+    os.makedirs(ruta, exist_ok=True)
+    return ruta
+
+
+def estudio_en_proceso(nuevo, descripcion, placas, aguas, actual, refri, carpeta, configuracion):
+    """Ejecuta seleccion_sistema en un proceso de trabajo leyendo los datos de la memoria compartida
+
+    :param nuevo: Sistema a estudiar
+    :param descripcion: Descripción de los datos horarios devuelta por compartir_datos
+    :param placas: Área disponible para las placas solares
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param actual: Sistema de climatización instalado en la residencia
+    :param refri: Se quiere refrigeración en el sistema
+    :param carpeta: Carpeta en la que se guardan los resultados y las gráficas
+    :param configuracion: Configuración leída en el proceso principal
+    """
+    df, irradiacion = reconstruir_datos(descripcion)
+    return seleccion_sistema(nuevo, df, irradiacion, placas, aguas, actual, refri, carpeta, configuracion)
+
+
+def estudiar_sistemas(df, irradiacion, placas, aguas, actual, refri, procesos, carpeta, configuracion):
+    """Estudia cada uno de los sistemas, en paralelo si se dispone de más de un proceso
+
+    Los datos horarios se copian una sola vez en memoria compartida y cada proceso recibe solo su
+    descripción, en lugar de serializar el Dataframe completo para cada sistema. Los resultados y las gráficas
+    de cada sistema se guardan en su subcarpeta (ver carpeta_sistema).
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param placas: Área disponible para las placas solares
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param actual: Sistema de climatización instalado en la residencia
+    :param refri: Se quiere refrigeración en el sistema
+    :param procesos: Número máximo de procesos simultáneos
+    :param carpeta: Carpeta en la que se guardan las subcarpetas de cada sistema
+    :param configuracion: Configuración devuelta por cargar_configuracion
+    """
+    if procesos <= 1:
+        return {nuevo: seleccion_sistema(nuevo, df, irradiacion, placas, aguas, actual, refri,
+                                         carpeta_sistema(carpeta, nuevo), configuracion)
+                for nuevo in SISTEMAS}
+    bloques, descripcion = compartir_datos(df, irradiacion)
+    try:
+        with ProcessPoolExecutor(max_workers=min(procesos, len(SISTEMAS))) as pool:
+            futuros = {nuevo: pool.submit(estudio_en_proceso, nuevo, descripcion, placas, aguas, actual, refri,
+                                          carpeta_sistema(carpeta, nuevo), configuracion)
+                       for nuevo in SISTEMAS}
+            return {nuevo: futuro.result() for nuevo, futuro in futuros.items()}
+    finally:
+        liberar_datos(bloques)
 
 
-def calculo_todas_opciones(df, irradiacion, placas, aguas, actual, refri):
+@medido
+def calculo_todas_opciones(df, irradiacion, placas, aguas, actual, refri, procesos=None, carpeta="Resultados"):
     """ Función del optimizador que evalua todas las posibles alternativas.
 
     :param df: Dataframe con todos los parámetros que tienen carácter horario
@@ -16,17 +86,30 @@ def calculo_todas_opciones(df, irradiacion, placas, aguas, actual, refri):
     :param aguas: Numero de aguas del tejado de la residencia en estudio
     :param actual: Sistema de climatización instalado en la residencia
     :param refri: Se quiere refrigeración en el sistema
+    :param procesos: Número de procesos para estudiar los sistemas a la vez. Por defecto uno por núcleo (máx. 3,
+        sin máximo en los puntos de la frontera de Pareto)
+    :param carpeta: Carpeta en la que se guardan los resultados y las gráficas
     """
-    with open('datos_tecnicos.yaml', "r", encoding="utf-8") as f:
-        datos = yaml.safe_load(f)
+    procesos_frontera = procesos or os.cpu_count() or 1
+    if procesos is None:
+        procesos = min(len(SISTEMAS), os.cpu_count() or 1)
+    anotar(horas=len(df), procesos=procesos)
+    configuracion = cargar_configuracion()
+    datos = configuracion.datos
 
-    resultado_aero_alta = seleccion_sistema('Aerotermia de alta', df, irradiacion, placas, aguas, actual, refri)
+    estudios = estudiar_sistemas(df, irradiacion, placas, aguas, actual, refri, procesos, carpeta, configuracion)
+    # Frontera de Pareto entre inversión y coste de operación (ver optimizador.sistemas.frontera_pareto)
+    if puntos_frontera(datos):
+        frontera = frontera_sistemas(df, irradiacion, placas, aguas, actual, refri, SISTEMAS, puntos_frontera(datos),
+                                     procesos_frontera, configuracion)
+        redondear(frontera, opciones_salida()[1]).to_csv(os.path.join(carpeta, 'Frontera_sistemas.csv'), index=False)
+    resultado_aero_alta = estudios['Aerotermia de alta']
     aero_alta = float(resultado_aero_alta['Costo operativo anual'].replace("€", "").strip(
     )) + float(resultado_aero_alta['Inversion'].replace("€", "").strip())/datos['Bomba de calor']['Ciclo de vida']
-    resultado_aero_baja = seleccion_sistema('Aerotermia de baja', df, irradiacion, placas, aguas, actual, refri)
+    resultado_aero_baja = estudios['Aerotermia de baja']
     aero_baja = float(resultado_aero_baja['Costo operativo anual'].replace("€", "").strip(
     )) + float(resultado_aero_baja['Inversion'].replace("€", "").strip())/datos['Bomba de calor']['Ciclo de vida']
-    resultado_gas = seleccion_sistema("Gas", df, irradiacion, placas, aguas, actual, refri)
+    resultado_gas = estudios['Gas']
     gas = float(resultado_gas['Costo operativo anual'].replace("€", "").strip()) + \
         float(resultado_gas['Inversion'].replace("€", "").strip())/datos['Gas']['Ciclo de vida']
     variables = {'aero_baja': aero_baja, 'aero_alta': aero_alta, 'gas': gas}
@@ -44,6 +127,6 @@ def calculo_todas_opciones(df, irradiacion, placas, aguas, actual, refri):
     df = df.rename(columns={
         'aero_baja': 'Aerotermia Baja Temperatura', 'aero_alta': 'Aerotermia Alta Temperatura', 'gas': 'Caldera Gas'})
     df = df[~df.index.str.contains("Potencia", case=False)]
-    df.to_csv('Resultados/Comparativa_sistemas.csv')
+    df.to_csv(os.path.join(carpeta, 'Comparativa_sistemas.csv'))
 
     return resultados[opt]
@@ -0,0 +1,132 @@
+"""Módulo para el cálculo conjunto de la aerotermia de alta en calefacción y el aire acondicionado en refrigeración
+
+Con refrigeración, la aerotermia de alta cubre las horas de calefacción y el aire acondicionado las de
+refrigeración, y las dos instalaciones comparten las placas del tejado. En lugar de dimensionar primero la
+aerotermia y después el aire acondicionado con sus placas fijadas, un solo modelo contiene los dos (como
+bloques construidos con modelo_aerotermia y modelo_aire_acondicionado) con el mismo número de placas en cada
+agua, y se resuelve una vez minimizando la suma de los costes. Las placas se pagan una sola vez, dentro de la
+inversión de la aerotermia, y cada temporada usa la irradiación de sus propias horas.
+"""
+import numpy as np
+import pyomo.environ as pyo
+
+from optimizador.configuracion import cargar_configuracion
+from optimizador.metricas import anotar, medido
+from optimizador.progreso import informar
+from optimizador.sistemas.construccion import temporadas
+from optimizador.sistemas.estudio_aerotermia import (formulacion_lineal, guardar_aerotermia, modelo_aerotermia,
+                                                     solucion_modelo)
+from optimizador.sistemas.estudio_aire_acondicionado import guardar_aire_acondicionado, modelo_aire_acondicionado
+from optimizador.sistemas.solver import resolver, valores_enteros, valores_variable
+
+
+@medido
+def modelo_conjunto(tipo, df, irradiacion, placas, aguas, c_i, c_aire, datos):
+    """Construcción del modelo conjunto de la aerotermia en calefacción y el aire acondicionado en refrigeración
+
+    :param tipo: Módelo de aerotermia seleccionado
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param placas: Área disponible para las placas solares en cada agua del tejado
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param c_i: Coste invariable de la instalacion de la aerotermia
+    :param c_aire: Coste invariable de la instalacion del aire acondicionado
+    :param datos: Datos técnicos de los equipos de climatización
+    """
+    anotar(sistema=tipo, horas=len(df), conjunto=True)
+    (df_calefaccion, irradiacion_calefaccion), (df_refrigeracion, irradiacion_refrigeracion) = temporadas(
+        df, irradiacion)
+
+    model = pyo.ConcreteModel()
+    model.calefaccion = modelo_aerotermia(tipo, df_calefaccion, irradiacion_calefaccion, placas, aguas, c_i, datos,
+                                          lineal=formulacion_lineal(datos, tipo))
+    # Con n_ps = 0 el aire acondicionado tiene sus propias variables de placas, que se igualan a las de la aerotermia
+    model.refrigeracion = modelo_aire_acondicionado(df_refrigeracion, irradiacion_refrigeracion, placas, [0]*aguas,
+                                                    aguas, c_aire, datos)
+    model.calefaccion.OBJ.deactivate()
+    model.refrigeracion.OBJ.deactivate()
+
+    model.J = pyo.RangeSet(0, aguas - 1)
+    model.Placas = pyo.Constraint(model.J, rule=lambda m, j: m.refrigeracion.n_ps[j] == m.calefaccion.n_ps[j])
+
+    model.opex = pyo.Expression(expr=model.calefaccion.opex + model.refrigeracion.opex)
+    # Las placas son las mismas en las dos temporadas: su precio solo entra en la inversión de la aerotermia
+    model.capex = pyo.Expression(expr=model.calefaccion.capex + model.refrigeracion.capex - model.refrigeracion.c_ps)
+    model.OBJ = pyo.Objective(
+        expr=model.opex + model.capex / datos['Bomba de calor']['Ciclo de vida'],
+        sense=pyo.minimize
+    )
+    return model
+
+
+def optimizar_conjunto(tipo, df, irradiacion, placas, aguas, c_i, c_aire, datos):
+    """Soluciones de la aerotermia y del aire acondicionado resueltas en un solo modelo, sin guardar resultados
+
+    :param tipo: Módelo de aerotermia seleccionado
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param placas: Área disponible para las placas solares en cada agua del tejado
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param c_i: Coste invariable de la instalacion de la aerotermia
+    :param c_aire: Coste invariable de la instalacion del aire acondicionado
+    :param datos: Datos técnicos de los equipos de climatización
+    :return: Soluciones de la calefacción (como optimizar_aerotermia) y de la refrigeración (como
+        optimizar_aire_acondicionado, con la inversión sin las placas)
+    """
+    model = modelo_conjunto(tipo, df, irradiacion, placas, aguas, c_i, c_aire, datos)
+    informar(f"Modelo {tipo} y Aire acondicionado construido")
+    # ---------------------------
+    # SOLVER (ver optimizador.sistemas.solver)
+    # ---------------------------
+    resolver(model, datos, tipo)
+    refrigeracion = model.refrigeracion
+    return {
+        'calefaccion': solucion_modelo(model.calefaccion, datos[tipo]['temperatura']),
+        'refrigeracion': {
+            'e_red': valores_variable(refrigeracion.e_red),
+            'e_ps': valores_variable(refrigeracion.e_ps),
+            'n_ps': valores_enteros(refrigeracion.n_ps),
+            'p_bdc': pyo.value(refrigeracion.p_bdc),
+            'opex': pyo.value(refrigeracion.opex),
+            'capex': pyo.value(refrigeracion.capex - refrigeracion.c_ps)
+        }
+    }
+
+
+@medido
+def calculo_conjunto(tipo, df, irradiacion, placas, aguas, c_i, c_aire, carpeta="Resultados", datos=None):
+    """Funcion para la optimización económica conjunta de la aerotermia en calefacción y el aire acondicionado
+    en refrigeración. Guarda los mismos resultados que calculo_aerotermia y calculo_aire_acondicionado
+
+    :param tipo: Módelo de aerotermia seleccionado
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param placas: Área disponible para las placas solares en cada agua del tejado
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param c_i: Coste invariable de la instalacion de la aerotermia
+    :param c_aire: Coste invariable de la instalacion del aire acondicionado
+    :param carpeta: Carpeta en la que se guardan los resultados y las gráficas
+    :param datos: Datos técnicos de los equipos de climatización. Por defecto los de cargar_configuracion
+    """
+    if datos is None:
+        datos = cargar_configuracion().datos
+    anotar(sistema=tipo, horas=len(df))
+
+    solucion = optimizar_conjunto(tipo, df, irradiacion, placas, aguas, c_i, c_aire, datos)
+    informar(f"Solución {tipo} y Aire acondicionado obtenida")
+    (df_calefaccion, irradiacion_calefaccion), (df_refrigeracion, irradiacion_refrigeracion) = temporadas(
+        df, irradiacion)
+    calefaccion = guardar_aerotermia(tipo, df_calefaccion, irradiacion_calefaccion, solucion['calefaccion'], carpeta,
+                                     datos)
+    refrigeracion = guardar_aire_acondicionado(df_refrigeracion, irradiacion_refrigeracion,
+                                               solucion['refrigeracion'], carpeta, datos)
+    opex = solucion['calefaccion']['opex'] + solucion['refrigeracion']['opex']
+    capex = solucion['calefaccion']['capex'] + solucion['refrigeracion']['capex']
+    return {
+        "Costo operativo anual": f"{np.round(opex, 2)} €",
+        f"Potencia {tipo}": calefaccion[f"Potencia {tipo}"],
+        "Volumen deposito de inercia": calefaccion["Volumen deposito de inercia"],
+        "Potencia Aire acondicionado": refrigeracion["Potencia Bomba de calor"],
+        "Placas": calefaccion["Placas"],
+        "Inversion": f"{np.round(capex, 2)} €"
+    }
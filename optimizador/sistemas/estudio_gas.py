@@ -1,31 +1,47 @@
 """Módulo para el cálculo de sistemas de climatización por gas"""
-import os
-import yaml
 
 import numpy as np
 import pandas as pd
 import pyomo.environ as pyo
-import matplotlib.pyplot as plt
-import seaborn as sns
 
-from dotenv import load_dotenv
+from optimizador.configuracion import cargar_configuracion
+from optimizador.graficas import generar_graficas
+from optimizador.metricas import anotar, medido
+from optimizador.progreso import informar
+from optimizador.sistemas.construccion import (actualizar_coeficientes, actualizar_parametro, coeficientes, parametro,
+                                               restricciones, suma_producto)
+from optimizador.salida_resultados import guardar_resultados
+from optimizador.serie_temporal import peso_periodo
+from optimizador.sistemas.modelos_vivos import resolver_modelo_vivo
+from optimizador.sistemas.solver import valores_variable
 
 
-def calculo_gas(df, c_i):
-    """Funcion para la optimización económica de sistemas de climatización por gas
+def costes_gas(datos, c_i):
+    """Coeficientes del coste de inversión del modelo de gas
 
-    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param datos: Datos técnicos de los equipos de climatización
     :param c_i: Coste invariable de la instalación sin tener en cuenta el precio de la caldera de gas
     """
-    with open('datos_tecnicos.yaml', "r", encoding="utf-8") as f:
-        datos = yaml.safe_load(f)
+    return {'coste_cg': datos['Gas']['coste potencia'], 'coste_fijo': c_i, 'vida': datos['Gas']['Ciclo de vida']}
+
+
+@medido
+def modelo_gas(df, c_i, datos, mutable=False):
+    """Construcción del modelo de optimización de sistemas de climatización por gas
 
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param c_i: Coste invariable de la instalación sin tener en cuenta el precio de la caldera de gas
+    :param datos: Datos técnicos de los equipos de climatización
+    :param mutable: Precio, cargas y coeficientes del coste de inversión como parámetros mutables que se cambian
+        con actualizar_gas
+    """
     horas = len(df)
+    anotar(sistema='Gas', horas=horas, mutable=mutable)
 
-    cargas = df["cargas"].to_numpy()
-    precio = df["precio_gas"].to_numpy()
+    cargas = df["cargas"].to_numpy(dtype=float)
+    # Coste de cada fila: precio · potencia · Δt, en coste anual (ver optimizador.serie_temporal)
+    precio = df["precio_gas"].to_numpy(dtype=float) * peso_periodo(df)
     ef = datos['Gas']['eficiencia']
-    # Asegúrate que t_ext tiene la longitud horas; aquí lo preparo como vector:
 
     model = pyo.ConcreteModel()
 
@@ -33,88 +49,136 @@ def calculo_gas(df, c_i):
     # Sets
     # ---------------------------
     model.H = pyo.RangeSet(0, horas - 1)
-    # ---------------------------
-    # Parámetros
-    # ---------------------------
-    model.q_ct = pyo.Param(
-        model.H,
-        initialize={h: float(cargas[h]) for h in model.H}
-    )
-    model.precio = pyo.Param(
-        model.H,
-        initialize={h: float(precio[h]) for h in model.H}
-    )
+    if mutable:
+        precio = list(parametro(model, 'precio', precio, model.H).values())
+        cargas = list(parametro(model, 'cargas', cargas, model.H).values())
+    costes = coeficientes(model, costes_gas(datos, c_i), mutable)
     # ---------------------------
     # Variables
     # ---------------------------
     model.q_cg = pyo.Var(model.H, domain=pyo.NonNegativeReals)
     model.p_gas = pyo.Var(bounds=(0, np.inf))
 
-    def p_maxima(m, h):
-        return m.q_cg[h] <= m.p_gas
-    model.p_max = pyo.Constraint(model.H, rule=p_maxima)
-
-    def balance_rule(m, h):
-        return m.q_cg[h] * ef == m.q_ct[h]
-    model.Balance = pyo.Constraint(model.H, rule=balance_rule)
+    # ---------------------------
+    # Restricciones
+    # ---------------------------
+    restricciones(model, 'p_max', model.H, [(1, model.q_cg), (-1, model.p_gas)], superior=0)
+    restricciones(model, 'Balance', model.H, [(ef, model.q_cg)], inferior=cargas, superior=cargas)
 
-    def coste_operativo(m):
-        return sum(m.q_cg[h] * m.precio[h] for h in m.H)
-    model.opex = pyo.Expression(rule=coste_operativo)
-    model.c_cg = pyo.Expression(expr=0.05968 * model.p_gas)
+    model.opex = pyo.Expression(expr=suma_producto(precio, model.q_cg))
+    model.c_cg = pyo.Expression(expr=costes['coste_cg'] * model.p_gas)
 
     model.capex = pyo.Expression(
-        expr=model.c_cg + c_i
+        expr=model.c_cg + costes['coste_fijo']
     )
     model.OBJ = pyo.Objective(
-        expr=model.opex + model.capex / datos['Gas']['Ciclo de vida'],
+        expr=model.opex + model.capex / costes['vida'],
         sense=pyo.minimize
     )
+    return model
+
+
+def actualizar_gas(model, df, costes=None):
+    """Cambia el precio, las cargas y, si se indican, los coeficientes de coste de un modelo construido con
+    mutable=True
+
+    :param model: Modelo de gas
+    :param df: Dataframe horario con la misma longitud que el del modelo
+    :param costes: Coeficientes devueltos por costes_gas
+    """
+    actualizar_parametro(model.precio, df["precio_gas"].to_numpy(dtype=float) * peso_periodo(df))
+    actualizar_parametro(model.cargas, df["cargas"].to_numpy(dtype=float))
+    if costes is not None:
+        actualizar_coeficientes(model, costes)
+
+
+def solucion_gas(df, c_i, datos):
+    """Solución analítica del modelo de gas sin pasar por el solver
+
+    El balance fija la energía de la caldera en cada hora, la potencia es el máximo horario y el coste
+    operativo el producto escalar con el precio del gas por el peso de cada fila.
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param c_i: Coste invariable de la instalación sin tener en cuenta el precio de la caldera de gas
+    :param datos: Datos técnicos de los equipos de climatización
+    """
+    cargas = df["cargas"].to_numpy(dtype=float)
+    precio = df["precio_gas"].to_numpy(dtype=float)
+    if (cargas < 0).any():
+        raise ValueError("El modelo de gas no admite cargas de refrigeración (cargas negativas)")
+
+    q_cg = cargas / datos['Gas']['eficiencia']
+    p_gas = float(q_cg.max()) if len(q_cg) else 0.0
+    return {
+        'q_cg': q_cg,
+        'p_gas': p_gas,
+        'opex': float(q_cg @ precio) * peso_periodo(df),
+        'capex': datos['Gas']['coste potencia'] * p_gas + c_i
+    }
+
+
+def resolver_gas(df, c_i, datos):
+    """Resolución del modelo de gas con pyomo. Sirve de comprobación de la solución analítica
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param c_i: Coste invariable de la instalación sin tener en cuenta el precio de la caldera de gas
+    :param datos: Datos técnicos de los equipos de climatización
+    """
     # ---------------------------
-    # SOLVER SCIP
+    # SOLVER (ver optimizador.sistemas.solver)
     # ---------------------------
-    load_dotenv(dotenv_path=".env")
-    opt = pyo.SolverFactory(
-        "scip",
-        executable=os.getenv("RUTA_ARCHIVO")
-    )
-    opt.solve(model, tee=True)
-    df_results = pd.DataFrame({'Horas': model.H,
-                               'cargas': (np.round(pyo.value(model.q_ct[h]), 2) for h in model.H),
-                               'Q_cg': (np.round(pyo.value(model.q_cg[h]), 2) for h in model.H)})
-    df_results.to_csv("Resultados/resultados_modelo_Gas.csv", index=False)
+    model = resolver_modelo_vivo(('Gas', len(df)), lambda mutable: modelo_gas(df, c_i, datos, mutable),
+                                 lambda m: actualizar_gas(m, df, costes_gas(datos, c_i)), datos, 'Gas')
+    return {
+        'q_cg': valores_variable(model.q_cg),
+        'p_gas': pyo.value(model.p_gas),
+        'opex': pyo.value(model.opex),
+        'capex': pyo.value(model.capex)
+    }
+
+
+def optimizar_gas(df, c_i, datos, metodo="analitico"):
+    """Solución del modelo de gas con el método indicado, sin guardar resultados
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param c_i: Coste invariable de la instalación sin tener en cuenta el precio de la caldera de gas
+    :param datos: Datos técnicos de los equipos de climatización
+    :param metodo: "analitico" para la solución directa con NumPy o "pyomo" para resolver el modelo con el solver
+    """
+    if metodo == "analitico":
+        return solucion_gas(df, c_i, datos)
+    if metodo == "pyomo":
+        return resolver_gas(df, c_i, datos)
+    raise ValueError(f"Método de cálculo desconocido: {metodo}")
+
+
+@medido
+def calculo_gas(df, c_i, metodo="analitico", carpeta="Resultados", datos=None):
+    """Funcion para la optimización económica de sistemas de climatización por gas
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param c_i: Coste invariable de la instalación sin tener en cuenta el precio de la caldera de gas
+    :param metodo: "analitico" para la solución directa con NumPy o "pyomo" para resolver el modelo con el solver
+    :param carpeta: Carpeta en la que se guardan los resultados y las gráficas
+    :param datos: Datos técnicos de los equipos de climatización. Por defecto los de cargar_configuracion
+    """
+    if datos is None:
+        datos = cargar_configuracion().datos
+    anotar(sistema='Gas', horas=len(df), metodo=metodo)
+
+    solucion = optimizar_gas(df, c_i, datos, metodo)
+    informar("Solución Gas obtenida")
+
+    df_results = pd.DataFrame({'Horas': range(len(df)),
+                               'cargas': df["cargas"].to_numpy(dtype=float),
+                               'Q_cg': solucion['q_cg']})
+    guardar_resultados(df_results, "resultados_modelo_Gas", carpeta)
+    informar("Resultados Gas guardados")
     resultado = {
-        "Costo operativo anual": f"{np.round(pyo.value(model.opex), 2)} €",
-        "Potencia Caldera de gas": f"{np.round(pyo.value(model.p_gas)/1000, 2)} kW",
-        "Inversion": f"{float(np.round(pyo.value(model.capex), 2))} €"
+        "Costo operativo anual": f"{np.round(solucion['opex'], 2)} €",
+        "Potencia Caldera de gas": f"{np.round(solucion['p_gas']/1000, 2)} kW",
+        "Inversion": f"{float(np.round(solucion['capex'], 2))} €"
     }
     df_results.set_index(df.index, inplace=True)
-    sns.scatterplot(data=df_results, x=df_results.index, y='Q_cg', s=9, color='grey')
-    plt.ylabel('Energia [W·h]')
-    plt.xlabel("Año")
-    plt.savefig('Resultados/Todos los datos Gas.png')
-    plt.close()
-
-    data = df_results.groupby(by=df_results.index.hour)[['Q_cg']].mean()
-    data.reset_index(inplace=True)
-    data = pd.melt(data, id_vars=data.columns[0], value_vars=['Q_cg'])
-    g = sns.FacetGrid(data, col="variable", sharey=False)
-    g.map(sns.barplot, data.columns[0], "value", color='grey')
-    g.set_titles(col_template="{col_name}")
-    g.set_axis_labels("Hora del día", "Energia [W·h]")
-    for ax in g.axes.flatten():
-        ax.tick_params(axis='x', labelsize=7)
-        plt.setp(ax.get_xticklabels(), rotation=90)
-    plt.savefig('Resultados/Discriminación horaria gas.png')
-    plt.close()
-
-    data = df_results.groupby(by=df_results.index.month)[['Q_cg']].mean()
-    data.reset_index(inplace=True)
-    data = pd.melt(data, id_vars=data.columns[0], value_vars=['Q_cg'])
-    g = sns.FacetGrid(data, col="variable", sharey=False)
-    g.map(sns.barplot, data.columns[0], "value", color='grey')
-    g.set_titles(col_template="{col_name}")
-    g.set_axis_labels("Mes del año", "Energia [W·h]")
-    plt.savefig('Resultados/Discriminación mensual Gas.png')
-    plt.close()
+    generar_graficas(df_results[['Q_cg']], 'Gas', carpeta)
     return resultado
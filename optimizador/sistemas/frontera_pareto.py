@@ -0,0 +1,310 @@
+"""Módulo para la frontera de Pareto entre la inversión y el coste de operación de cada sistema
+
+calculo_todas_opciones elige el sistema con menor coste total anual (opex + capex / ciclo de vida). Con
+'puntos' en la sección Frontera de Pareto de datos_tecnicos.yaml se calcula además la frontera de cada sistema
+con el método de epsilon-restricción y se guarda en Frontera_sistemas.csv junto a Comparativa_sistemas.csv:
+    - los extremos son la menor inversión posible y el menor coste de operación posible
+    - cada punto intermedio minimiza el coste de operación con la inversión limitada a un valor entre ambos
+    - el óptimo anualizado de siempre se añade como un punto más (columna optimo)
+
+El modelo de cada sistema se construye una sola vez: el límite de la inversión es un parámetro mutable, los
+objetivos se activan y desactivan sobre el mismo modelo y cada punto parte de la solución del anterior. Los
+puntos intermedios se reparten en tramos consecutivos entre los procesos de trabajo, que reciben los datos
+horarios en memoria compartida y construyen el modelo una vez por tramo.
+
+Como en calculo_sistema, con refrigeración la aerotermia de alta se dimensiona junto al aire acondicionado y
+las placas compartidas en un solo modelo (ver estudio_conjunto), de modo que su frontera incluye los dos equipos.
+La caldera de gas, y la aerotermia de alta cuando se resuelve por partes, solo cubren las horas de calefacción con
+la irradiación de esas horas; la parte de aire acondicionado no entra en su frontera. La aerotermia usa la
+formulación lineal y, con días representativos o series más largas que 'filas maximas', el modelo de días
+representativos.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+import pyomo.environ as pyo
+
+from optimizador.configuracion import cargar_configuracion
+from optimizador.metricas import anotar, medido
+from optimizador.progreso import informar
+from optimizador.serie_temporal import ajustar_irradiacion, filas_maximas
+from optimizador.sistemas.construccion import temporadas
+from optimizador.sistemas.dias_representativos import DIAS_POR_DEFECTO, agrupar_dias, datos_agrupados
+from optimizador.sistemas.estudio_aerotermia import aerotermia_por_partes, modelo_aerotermia
+from optimizador.sistemas.estudio_conjunto import modelo_conjunto
+from optimizador.sistemas.estudio_gas import modelo_gas
+from optimizador.sistemas.memoria_compartida import compartir_datos, liberar_datos, reconstruir_datos
+from optimizador.sistemas.solver import (comprobar_solver, configuracion_solver, crear_solver, resolver,
+                                         valores_enteros)
+
+# Peso del otro coste en el objetivo de los extremos y de los puntos intermedios: entre soluciones con el mismo
+# coste principal se queda con la de menor coste secundario, de modo que ningún punto está dominado
+AUMENTO = 1e-4
+OBJETIVOS = ('OBJ', 'OBJ_capex', 'OBJ_opex')
+COLUMNAS = ('sistema', 'punto', 'limite_inversion', 'inversion', 'coste_operativo', 'coste_total_anual',
+            'potencia_kw', 'volumen_deposito', 'placas', 'optimo')
+
+
+def puntos_frontera(datos):
+    """Puntos de la frontera de cada sistema (al menos los dos extremos), o 0 si no se calcula
+
+    :param datos: Datos técnicos de los equipos de climatización
+    """
+    puntos = (datos.get('Frontera de Pareto') or {}).get('puntos')
+    return max(2, int(puntos)) if puntos else 0
+
+
+def datos_sistema(nuevo, df, irradiacion, refri, c_aire=None):
+    """Filas del Dataframe que cubre el sistema y la irradiación de esas mismas filas, como en calculo_sistema
+
+    :param nuevo: Sistema de la frontera
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param refri: Se quiere refrigeración en el sistema
+    :param c_aire: Coste del aire acondicionado devuelto por coste_aire. Con él el sistema cubre todas las filas
+    """
+    if refri and nuevo in ('Gas', 'Aerotermia de alta') and c_aire is None:
+        return temporadas(df, irradiacion)[0]
+    return df, irradiacion
+
+
+def coste_sistema(nuevo, actual, refri, configuracion):
+    """Coste invariable de la instalación del sistema, como en calculo_sistema: las ayudas solo se descuentan en
+    la caldera de gas sin refrigeración
+
+    :param nuevo: Sistema de la frontera
+    :param actual: Sistema de climatización instalado en la residencia
+    :param refri: Se quiere refrigeración en el sistema
+    :param configuracion: Configuración devuelta por cargar_configuracion
+    """
+    if nuevo == 'Gas' and not refri:
+        return configuracion.inversion_neta(actual, nuevo)
+    return configuracion.coste_inversion(actual, nuevo)
+
+
+def coste_aire(nuevo, df, actual, refri, configuracion):
+    """Coste invariable del aire acondicionado si el sistema se dimensiona junto a él en un solo modelo, como en
+    calculo_sistema (aerotermia de alta con refrigeración que no se resuelve por partes), o None
+
+    :param nuevo: Sistema de la frontera
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param actual: Sistema de climatización instalado en la residencia
+    :param refri: Se quiere refrigeración en el sistema
+    :param configuracion: Configuración devuelta por cargar_configuracion
+    """
+    if refri and nuevo == 'Aerotermia de alta' and not aerotermia_por_partes(df, configuracion.datos):
+        return configuracion.coste_inversion(actual, 'Aire acondicionado')
+    return None
+
+
+def modelo_frontera(nuevo, df, irradiacion, placas, aguas, c_i, datos, c_aire=None):
+    """Modelo del sistema con el límite de la inversión y los objetivos de los extremos de la frontera
+
+    :param nuevo: Sistema de la frontera
+    :param df: Dataframe con las filas que cubre el sistema
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param placas: Área disponible para las placas solares en cada agua del tejado
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param c_i: Coste invariable de la instalacion del nuevo sistema de climatización
+    :param datos: Datos técnicos de los equipos de climatización
+    :param c_aire: Coste del aire acondicionado devuelto por coste_aire. Con él el modelo es el conjunto de la
+        aerotermia y el aire acondicionado
+    """
+    irradiacion = np.array(irradiacion, dtype=float)
+    opciones = datos.get('Dias representativos') or {}
+    if nuevo == 'Gas':
+        model = modelo_gas(df, c_i, datos)
+    elif c_aire is not None:
+        model = modelo_conjunto(nuevo, df, irradiacion, placas, aguas, c_i, c_aire, datos)
+    elif opciones.get('dias') or len(df) > filas_maximas(datos):
+        agrupacion = agrupar_dias(df, irradiacion, int(opciones.get('dias') or DIAS_POR_DEFECTO),
+                                  int(opciones.get('semilla') or 0))
+        df_dias, irradiacion_dias = datos_agrupados(df, irradiacion, agrupacion)
+        model = modelo_aerotermia(nuevo, df_dias, irradiacion_dias, placas, aguas, c_i, datos,
+                                  pesos=agrupacion['pesos'], secuencia=agrupacion['asignacion'])
+    else:
+        model = modelo_aerotermia(nuevo, df, irradiacion, placas, aguas, c_i, datos)
+    model.limite_capex = pyo.Param(mutable=True, initialize=0.0)
+    model.Frontera = pyo.Constraint(expr=model.capex <= model.limite_capex)
+    model.Frontera.deactivate()
+    model.OBJ_capex = pyo.Objective(expr=model.capex + AUMENTO * model.opex, sense=pyo.minimize)
+    model.OBJ_opex = pyo.Objective(expr=model.opex + AUMENTO * model.capex, sense=pyo.minimize)
+    activar_objetivo(model, 'OBJ')
+    return model
+
+
+def activar_objetivo(model, nombre):
+    """Deja activo solo uno de los objetivos del modelo de la frontera
+
+    :param model: Modelo devuelto por modelo_frontera
+    :param nombre: 'OBJ' (coste total anual), 'OBJ_capex' u 'OBJ_opex'
+    """
+    for objetivo in OBJETIVOS:
+        if objetivo == nombre:
+            model.component(objetivo).activate()
+        else:
+            model.component(objetivo).deactivate()
+
+
+def solver_sistema(datos, nuevo):
+    """Solver del sistema, que se crea una vez y conserva el modelo cargado entre puntos si es appsi
+
+    :param datos: Datos técnicos de los equipos de climatización
+    :param nuevo: Sistema de la frontera
+    """
+    configuracion = configuracion_solver(datos, nuevo)
+    opt = crear_solver(configuracion)
+    comprobar_solver(opt, configuracion['nombre'])
+    return opt
+
+
+def punto_frontera(model, nuevo, datos, limite=None, optimo=False):
+    """Costes y equipos de la solución actual del modelo
+
+    :param model: Modelo devuelto por modelo_frontera ya resuelto
+    :param nuevo: Sistema de la frontera
+    :param datos: Datos técnicos de los equipos de climatización
+    :param limite: Límite de la inversión del punto, o None en los extremos y en el óptimo
+    :param optimo: El punto es el óptimo del coste total anual
+    """
+    inversion = pyo.value(model.capex)
+    operativo = pyo.value(model.opex)
+    vida = datos['Gas' if nuevo == 'Gas' else 'Bomba de calor']['Ciclo de vida']
+    # En el modelo conjunto los equipos del sistema están en el bloque de la calefacción
+    equipos = model.calefaccion if hasattr(model, 'calefaccion') else model
+    deposito = equipos.component('v_dep')
+    placas = equipos.component('n_ps')
+    return {'sistema': nuevo, 'limite_inversion': limite, 'inversion': inversion, 'coste_operativo': operativo,
+            'coste_total_anual': operativo + inversion / vida,
+            'potencia_kw': pyo.value(equipos.p_gas if nuevo == 'Gas' else equipos.p_bdc) / 1000,
+            'volumen_deposito': pyo.value(deposito) if deposito is not None else None,
+            'placas': float(valores_enteros(placas).sum()) if placas is not None else None, 'optimo': optimo}
+
+
+def extremos_frontera(model, nuevo, datos, opt):
+    """Óptimo del coste total anual, punto de menor inversión y punto de menor coste de operación
+
+    :param model: Modelo devuelto por modelo_frontera
+    :param nuevo: Sistema de la frontera
+    :param datos: Datos técnicos de los equipos de climatización
+    :param opt: Solver devuelto por solver_sistema
+    """
+    puntos = []
+    for objetivo in OBJETIVOS:
+        activar_objetivo(model, objetivo)
+        resolver(model, datos, nuevo, opt=opt, calentar=bool(puntos))
+        puntos.append(punto_frontera(model, nuevo, datos, optimo=objetivo == 'OBJ'))
+    return puntos
+
+
+def recorrer_limites(model, nuevo, datos, opt, limites):
+    """Resuelve los puntos intermedios sobre el mismo modelo, cada uno partiendo de la solución del anterior
+
+    :param model: Modelo devuelto por modelo_frontera
+    :param nuevo: Sistema de la frontera
+    :param datos: Datos técnicos de los equipos de climatización
+    :param opt: Solver devuelto por solver_sistema
+    :param limites: Límites de la inversión, de mayor a menor para que los puntos consecutivos estén próximos
+    """
+    activar_objetivo(model, 'OBJ_opex')
+    model.Frontera.activate()
+    puntos = []
+    for limite in limites:
+        model.limite_capex.set_value(float(limite))
+        informar("Frontera de Pareto", f"{nuevo}: inversión hasta {limite:.2f} €")
+        resolver(model, datos, nuevo, opt=opt, calentar=bool(puntos))
+        puntos.append(punto_frontera(model, nuevo, datos, float(limite)))
+    model.Frontera.deactivate()
+    return puntos
+
+
+def tramo_en_proceso(nuevo, descripcion, refri, placas, aguas, c_i, c_aire, datos, limites):
+    """Construye el modelo en un proceso de trabajo y resuelve un tramo de puntos intermedios
+
+    :param nuevo: Sistema de la frontera
+    :param descripcion: Descripción de los datos horarios devuelta por compartir_datos
+    :param refri: Se quiere refrigeración en el sistema
+    :param placas: Área disponible para las placas solares en cada agua del tejado
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param c_i: Coste invariable de la instalacion del nuevo sistema de climatización
+    :param c_aire: Coste del aire acondicionado devuelto por coste_aire
+    :param datos: Datos técnicos de los equipos de climatización
+    :param limites: Límites de la inversión del tramo
+    """
+    df, irradiacion = reconstruir_datos(descripcion)
+    df, irradiacion = datos_sistema(nuevo, df, irradiacion, refri, c_aire)
+    model = modelo_frontera(nuevo, df, irradiacion, placas, aguas, c_i, datos, c_aire)
+    return recorrer_limites(model, nuevo, datos, solver_sistema(datos, nuevo), limites)
+
+
+def tabla_frontera(filas, sistemas):
+    """Tabla de la frontera: una fila por punto distinto de cada sistema, de menor a mayor inversión
+
+    :param filas: Puntos devueltos por punto_frontera
+    :param sistemas: Sistemas en el orden de la tabla
+    """
+    orden = {nuevo: i for i, nuevo in enumerate(sistemas)}
+    tabla = pd.DataFrame(filas, columns=[c for c in COLUMNAS if c != 'punto'])
+    tabla = tabla.astype({'optimo': bool})
+    # Los límites que no llegan a restringir la inversión repiten un punto ya calculado; se conserva el óptimo
+    redondeada = tabla.assign(inversion=tabla['inversion'].round(2), coste_operativo=tabla['coste_operativo'].round(2))
+    repetidos = redondeada.sort_values('optimo', ascending=False, kind='stable').duplicated(
+        ['sistema', 'inversion', 'coste_operativo'])
+    tabla = tabla.loc[~repetidos.reindex(tabla.index)]
+    tabla = tabla.sort_values(['sistema', 'inversion'], key=lambda c: c.map(orden) if c.name == 'sistema' else c,
+                              kind='stable')
+    tabla.insert(1, 'punto', tabla.groupby('sistema').cumcount())
+    return tabla.reset_index(drop=True)
+
+
+@medido
+def frontera_sistemas(df, irradiacion, placas, aguas, actual, refri, sistemas, puntos, procesos=1,
+                      configuracion=None):
+    """Frontera entre la inversión y el coste de operación de cada sistema
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :param placas: Área disponible para las placas solares en cada agua del tejado
+    :param aguas: Numero de aguas del tejado de la residencia en estudio
+    :param actual: Sistema de climatización instalado en la residencia
+    :param refri: Se quiere refrigeración en el sistema
+    :param sistemas: Sistemas de la frontera
+    :param puntos: Puntos de cada sistema, extremos incluidos
+    :param procesos: Número de procesos que resuelven los puntos intermedios a la vez
+    :param configuracion: Configuración devuelta por cargar_configuracion. Por defecto la de la carpeta de trabajo
+    """
+    if configuracion is None:
+        configuracion = cargar_configuracion()
+    datos = configuracion.datos
+    irradiacion = ajustar_irradiacion(irradiacion, df)
+    anotar(horas=len(df), puntos=puntos, procesos=procesos)
+    filas = []
+    futuros = []
+    bloques, descripcion = compartir_datos(df, irradiacion) if procesos > 1 else ([], None)
+    try:
+        with ProcessPoolExecutor(max_workers=procesos) if procesos > 1 else nullcontext() as pool:
+            for nuevo in sistemas:
+                c_i = coste_sistema(nuevo, actual, refri, configuracion)
+                c_aire = coste_aire(nuevo, df, actual, refri, configuracion)
+                df_sistema, irradiacion_sistema = datos_sistema(nuevo, df, irradiacion, refri, c_aire)
+                model = modelo_frontera(nuevo, df_sistema, irradiacion_sistema, placas, aguas, c_i, datos, c_aire)
+                informar(f"Modelo {nuevo} construido", "frontera de Pareto")
+                opt = solver_sistema(datos, nuevo)
+                extremos = extremos_frontera(model, nuevo, datos, opt)
+                filas.extend(extremos)
+                menor, mayor = extremos[1]['inversion'], extremos[2]['inversion']
+                limites = np.linspace(mayor, menor, puntos)[1:-1] if not np.isclose(menor, mayor) else []
+                if pool is None or len(limites) < 2:
+                    filas.extend(recorrer_limites(model, nuevo, datos, opt, limites))
+                    continue
+                # Los procesos reciben el modelo por construir, no el ya construido en este proceso
+                futuros.extend(pool.submit(tramo_en_proceso, nuevo, descripcion, refri, placas, aguas, c_i, c_aire,
+                                           datos, tramo)
+                               for tramo in np.array_split(limites, min(procesos, len(limites))))
+            for futuro in futuros:
+                filas.extend(futuro.result())
+    finally:
+        liberar_datos(bloques)
+    return tabla_frontera(filas, sistemas)
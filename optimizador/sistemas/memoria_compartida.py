@@ -0,0 +1,92 @@
+"""Módulo para compartir los datos horarios entre procesos sin copiarlos"""
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from optimizador.parametros_horarios import columna_climatizacion
+
+
+def _a_memoria(array, bloques):
+    """Copia un vector en un bloque de memoria compartida y devuelve su descripción
+
+    :param array: Vector NumPy a compartir
+    :param bloques: Lista donde se guardan los bloques creados para liberarlos después
+    """
+    array = np.ascontiguousarray(array)
+    bloque = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=bloque.buf)[...] = array
+    bloques.append(bloque)
+    return (bloque.name, array.dtype.str, array.shape)
+
+
+def _de_memoria(descripcion, abiertos):
+    """Vista NumPy sobre un bloque de memoria compartida creado por otro proceso
+
+    :param descripcion: Nombre, tipo y forma del vector
+    :param abiertos: Lista donde se guardan los bloques abiertos para cerrarlos después
+    """
+    nombre, tipo, forma = descripcion
+    # Los procesos del pool comparten el resource_tracker del proceso principal, que es quien elimina el bloque
+    bloque = shared_memory.SharedMemory(name=nombre)
+    abiertos.append(bloque)
+    return np.ndarray(forma, dtype=np.dtype(tipo), buffer=bloque.buf)
+
+
+def compartir_datos(df, irradiacion):
+    """Copia una vez en memoria compartida las columnas horarias y la irradiación
+
+    :param df: Dataframe con todos los parámetros que tienen carácter horario
+    :param irradiacion: Resultados de irradiacion incidente en la residencia
+    :return: Bloques creados (hay que pasarlos a liberar_datos) y descripción que se envía a los procesos
+    """
+    bloques = []
+    columnas = {}
+    for columna in df.columns:
+        valores = df[columna].to_numpy()
+        if valores.dtype == object:
+            # climatizacion se envía como máscara booleana en lugar de cadenas
+            columnas[columna] = ('calefaccion', _a_memoria(valores == 'Calefaccion', bloques))
+        else:
+            columnas[columna] = ('numerico', _a_memoria(valores, bloques))
+    descripcion = {
+        'columnas': columnas,
+        'indice': _a_memoria(df.index.to_numpy(), bloques),
+        'irradiacion': _a_memoria(np.asarray(irradiacion, dtype=float), bloques),
+        'caras': list(getattr(irradiacion, 'columns', [])),
+        # Paso y años del horizonte (ver optimizador.serie_temporal)
+        'attrs': dict(df.attrs)
+    }
+    return bloques, descripcion
+
+
+def reconstruir_datos(descripcion):
+    """Reconstruye en el proceso de trabajo el Dataframe horario y la irradiación
+
+    :param descripcion: Descripción devuelta por compartir_datos
+    """
+    abiertos = []
+    datos = {}
+    for columna, (tipo, vector) in descripcion['columnas'].items():
+        valores = _de_memoria(vector, abiertos)
+        if tipo == 'calefaccion':
+            datos[columna] = columna_climatizacion(valores)
+        else:
+            datos[columna] = valores.copy()
+    df = pd.DataFrame(datos, index=pd.Index(_de_memoria(descripcion['indice'], abiertos).copy()))
+    df.attrs.update(descripcion.get('attrs', {}))
+    irradiacion = pd.DataFrame(_de_memoria(descripcion['irradiacion'], abiertos).copy(),
+                               columns=descripcion['caras'] or None)
+    for bloque in abiertos:
+        bloque.close()
+    return df, irradiacion
+
+
+def liberar_datos(bloques):
+    """Cierra y elimina los bloques de memoria compartida
+
+    :param bloques: Bloques devueltos por compartir_datos
+    """
+    for bloque in bloques:
+        bloque.close()
+        bloque.unlink()
@@ -0,0 +1,110 @@
+"""Módulo que conserva en memoria los modelos ya construidos para resolverlos de nuevo con otros precios
+
+Cuando solo cambian el precio, las cargas o la irradiación, el modelo y el solver del cálculo anterior se
+reutilizan: los parámetros mutables del modelo se actualizan en el sitio y el solver parte de la solución
+anterior, sin volver a construir las restricciones. Lo mismo ocurre con los coeficientes del coste de
+inversión (precio de equipos y placas, coste fijo y ciclo de vida), que los modelos vivos guardan también
+como parámetros. La estructura del modelo (número de horas, horas de calefacción y refrigeración, temperatura
+exterior, placas, resto de datos técnicos y solver) forma la clave, de modo que cualquier cambio en ella
+construye un modelo nuevo.
+
+Los modelos se guardan dentro de cada proceso: sirven a los scripts, a los procesos de trabajo del cálculo por
+lotes y a los cálculos sucesivos de la interfaz, que se resuelven en un mismo proceso de trabajo (ver
+optimizador.proceso_calculo). Variable del archivo .env:
+    MODELOS_VIVOS   número de modelos que se conservan por proceso. Con 0 no se conservan; por defecto 0, salvo en
+                    el proceso de trabajo de la interfaz y en el barrido, que fijan su propio número
+"""
+import hashlib
+import os
+
+from collections import OrderedDict
+
+import numpy as np
+
+from dotenv import load_dotenv
+
+from optimizador.cache import clave_cache
+from optimizador.progreso import informar
+from optimizador.sistemas.solver import comprobar_solver, configuracion_solver, crear_solver, resolver
+
+# Modelo y solver de cada clave, del usado hace más tiempo al más reciente
+_modelos = OrderedDict()
+
+# Datos técnicos que solo intervienen en el coste de inversión y no forman parte de la clave
+COEFICIENTES = {'Gas': ('coste potencia', 'Ciclo de vida'), 'Aerotermia de alta': ('coste potencia',),
+                'Aerotermia de baja': ('coste potencia',), 'Deposito': ('coste volumen',),
+                'Aire acondicionado': ('coste potencia', 'precio Ud. Interior'), 'Placas solares': ('precio',),
+                'Bomba de calor': ('Ciclo de vida',)}
+
+
+def capacidad_modelos_vivos():
+    """Número de modelos que se conservan en memoria definido en el archivo .env"""
+    load_dotenv(dotenv_path=".env")
+    valor = os.getenv("MODELOS_VIVOS", "0").strip()
+    return int(valor) if valor else 0
+
+
+def huella_vector(valores):
+    """Huella SHA-256 de un vector que forma parte de la estructura del modelo
+
+    :param valores: Vector NumPy o lista
+    """
+    valores = np.ascontiguousarray(np.asarray(valores))
+    return hashlib.sha256(str(valores.dtype).encode("utf-8") + valores.tobytes()).hexdigest()
+
+
+def datos_estructura(datos):
+    """Datos técnicos sin los coeficientes del coste de inversión, que se actualizan en el modelo conservado
+
+    :param datos: Datos técnicos de los equipos de climatización
+    """
+    return {seccion: {clave: valor for clave, valor in valores.items() if clave not in COEFICIENTES[seccion]}
+            if seccion in COEFICIENTES and isinstance(valores, dict) else valores
+            for seccion, valores in datos.items()}
+
+
+def vaciar_modelos_vivos():
+    """Descarta todos los modelos conservados"""
+    _modelos.clear()
+
+
+def resolver_modelo_vivo(partes, construir, actualizar, datos, sistema, nombre=None):
+    """Resuelve el modelo de un sistema reutilizando, si existe, uno con la misma estructura
+
+    :param partes: Objetos serializables en JSON que fijan la estructura del modelo, sin los datos técnicos ni el
+        solver, que se añaden a la clave
+    :param construir: Función que recibe mutable y construye el modelo
+    :param actualizar: Función que cambia los parámetros mutables de un modelo conservado, coeficientes del coste
+        de inversión incluidos
+    :param datos: Datos técnicos de los equipos de climatización
+    :param sistema: 'Gas', 'Aire acondicionado' o el tipo de aerotermia
+    :param nombre: Nombre del modelo en los avisos de progreso. Por defecto el sistema
+    :return: Modelo resuelto
+    """
+    nombre = nombre or sistema
+    capacidad = capacidad_modelos_vivos()
+    if capacidad <= 0:
+        model = construir(False)
+        informar(f"Modelo {nombre} construido")
+        resolver(model, datos, sistema)
+        return model
+
+    configuracion = configuracion_solver(datos, sistema)
+    clave = clave_cache(partes, datos_estructura(datos), configuracion)
+    if clave in _modelos:
+        model, opt = _modelos[clave]
+        _modelos.move_to_end(clave)
+        actualizar(model)
+        informar(f"Modelo {nombre} actualizado")
+        resolver(model, datos, sistema, opt=opt, calentar=True)
+        return model
+
+    model = construir(True)
+    informar(f"Modelo {nombre} construido")
+    opt = crear_solver(configuracion)
+    comprobar_solver(opt, configuracion['nombre'])
+    resolver(model, datos, sistema, opt=opt)
+    _modelos[clave] = (model, opt)
+    while len(_modelos) > capacidad:
+        _modelos.popitem(last=False)
+    return model
@@ -0,0 +1,225 @@
+"""Módulo con la configuración y la llamada al solver de los modelos de optimización
+
+El solver de cada sistema se configura en datos_tecnicos.yaml: la sección Solver fija los valores comunes y
+cada sistema puede sustituirlos en su propia subsección Solver. Opciones:
+    nombre    nombre del solver en pyomo: scip, appsi_highs, cbc, glpk, appsi_cbc...
+    hilos     número de hilos del solver
+    gap       gap relativo de parada en problemas enteros
+    tiempo    tiempo máximo de resolución en segundos
+    opciones  diccionario con opciones propias del solver, se pasan sin cambios
+    formulacion  solo aerotermia: lineal (por defecto) o bilineal, que se ignora si el solver no la admite
+Los solvers appsi_* se ejecutan dentro del propio proceso, sin escribir el modelo en archivos .nl/.lp.
+
+El registro del solver se controla con la variable SALIDA_SOLVER del archivo .env:
+    completa  se muestra en la consola (comportamiento por defecto)
+    progreso  solo se lee para informar del gap a la interfaz (ver optimizador.progreso)
+    no        el solver no escribe su registro
+"""
+import os
+
+import numpy as np
+import pyomo.environ as pyo
+
+from dotenv import load_dotenv
+
+from optimizador.metricas import medir, metricas_activas
+from optimizador.progreso import informar, seguimiento_solver
+
+# Nombre de las opciones (hilos, gap, tiempo) en los solvers que se ejecutan como programa externo
+OPCIONES_EXTERNOS = {
+    'scip': ('parallel/maxnthreads', 'limits/gap', 'limits/time'),
+    'cbc': ('threads', 'ratioGap', 'seconds'),
+    'glpk': (None, 'mipgap', 'tmlim'),
+    'gurobi': ('Threads', 'MIPGap', 'TimeLimit'),
+    'cplex': ('threads', 'mipgap', 'timelimit'),
+}
+# Atributo con las opciones propias de los solvers appsi y nombre de las opciones de hilos y gap. Sin
+# opción de gap propia se usa config.mip_gap
+OPCIONES_APPSI = {
+    'appsi_highs': ('highs_options', 'threads', None),
+    'appsi_cbc': ('cbc_options', 'threads', 'ratioGap'),
+    'appsi_gurobi': ('gurobi_options', 'Threads', None),
+    'appsi_cplex': ('cplex_options', 'threads', None),
+}
+NIVELES_SALIDA = ('completa', 'progreso', 'no')
+# Solvers capaces de resolver los productos de variables del modelo de aerotermia sin linealizar
+NO_CONVEXOS = ('scip', 'gurobi', 'appsi_gurobi')
+
+
+def configuracion_solver(datos, sistema):
+    """Configuración del solver de un sistema: valores comunes sustituidos por los propios del sistema
+
+    :param datos: Datos técnicos de los equipos de climatización
+    :param sistema: 'Gas', 'Aire acondicionado' o el tipo de aerotermia
+    """
+    configuracion = {'nombre': 'scip', 'hilos': None, 'gap': None, 'tiempo': None, 'opciones': {}}
+    configuracion.update(datos.get('Solver') or {})
+    configuracion.update((datos.get(sistema) or {}).get('Solver') or {})
+    return configuracion
+
+
+def nivel_salida_solver():
+    """Nivel del registro del solver definido en el archivo .env o en las variables de entorno"""
+    load_dotenv(dotenv_path=".env")
+    nivel = os.getenv("SALIDA_SOLVER", "completa").strip().lower() or "completa"
+    if nivel not in NIVELES_SALIDA:
+        raise ValueError(f"Nivel de salida del solver desconocido: {nivel}. Opciones: {', '.join(NIVELES_SALIDA)}")
+    return nivel
+
+
+def crear_solver(configuracion):
+    """Crea el solver con las opciones de la configuración
+
+    :param configuracion: Diccionario devuelto por configuracion_solver
+    """
+    nombre = configuracion['nombre']
+    hilos, gap, tiempo = configuracion['hilos'], configuracion['gap'], configuracion['tiempo']
+    if nombre in OPCIONES_APPSI:
+        opt = pyo.SolverFactory(nombre)
+        atributo, opcion_hilos, opcion_gap = OPCIONES_APPSI[nombre]
+        propias = dict(configuracion['opciones'] or {})
+        if hilos is not None:
+            propias.setdefault(opcion_hilos, int(hilos))
+        if gap is not None and opcion_gap is not None:
+            propias.setdefault(opcion_gap, float(gap))
+        elif gap is not None:
+            opt.config.mip_gap = float(gap)
+        setattr(opt, atributo, propias)
+        return opt
+
+    load_dotenv(dotenv_path=".env")
+    # SCIP se busca en la ruta del archivo .env; el resto de solvers externos en el PATH
+    ejecutable = os.getenv("RUTA_ARCHIVO") if nombre == 'scip' else None
+    opt = pyo.SolverFactory(nombre, executable=ejecutable) if ejecutable else pyo.SolverFactory(nombre)
+    for opcion, valor in zip(OPCIONES_EXTERNOS.get(nombre, (None, None, None)), (hilos, gap, tiempo)):
+        if opcion is not None and valor is not None:
+            opt.options[opcion] = valor
+    for opcion, valor in (configuracion['opciones'] or {}).items():
+        opt.options[opcion] = valor
+    return opt
+
+
+def argumentos_solve(configuracion):
+    """Argumentos de solve() que no se pueden fijar al crear el solver
+
+    :param configuracion: Diccionario devuelto por configuracion_solver
+    """
+    # Los solvers appsi sustituyen el límite de tiempo de su configuración por el argumento timelimit
+    if configuracion['nombre'] in OPCIONES_APPSI and configuracion['tiempo'] is not None:
+        return {'timelimit': float(configuracion['tiempo'])}
+    return {}
+
+
+def comprobar_solver(opt, nombre):
+    """Lanza un error claro si el solver no está instalado
+
+    :param opt: Solver devuelto por crear_solver
+    :param nombre: Nombre del solver en la configuración
+    """
+    if not opt.available(exception_flag=False):
+        ayuda = "revise RUTA_ARCHIVO en el archivo .env" if nombre == 'scip' else "instale el solver o cambie su nombre"
+        raise RuntimeError(f"El solver {nombre} no está disponible: {ayuda} o la sección Solver de "
+                           f"datos_tecnicos.yaml")
+
+
+def admite_no_convexos(datos, sistema):
+    """Indica si el solver configurado para un sistema resuelve productos de variables
+
+    :param datos: Datos técnicos de los equipos de climatización
+    :param sistema: 'Gas', 'Aire acondicionado' o el tipo de aerotermia
+    """
+    return configuracion_solver(datos, sistema)['nombre'] in NO_CONVEXOS
+
+
+def valores_variable(componente):
+    """Valores de una variable o parámetro indexado en el orden de su conjunto, leídos de una sola pasada sin
+    buscar cada índice (los valores sin asignar quedan como nan)
+
+    :param componente: Variable o parámetro indexado de pyomo
+    """
+    return np.fromiter((np.nan if v is None else v for v in componente.extract_values().values()),
+                       dtype=float, count=len(componente))
+
+
+def valores_enteros(componente):
+    """Valores de una variable entera indexada redondeados, sin las diferencias de tolerancia entre solvers
+    (2.9999999 o -0.0 en lugar de 3 o 0)
+
+    :param componente: Variable o parámetro indexado de pyomo
+    """
+    return np.round(valores_variable(componente)) + 0.0
+
+
+def tamano_modelo(model):
+    """Número de variables, de variables enteras y de restricciones activas de un modelo de pyomo
+
+    :param model: Modelo de pyomo
+    """
+    variables = enteras = 0
+    for variable in model.component_data_objects(pyo.Var, active=True, descend_into=True):
+        variables += 1
+        enteras += not variable.is_continuous()
+    restricciones = sum(1 for _ in model.component_data_objects(pyo.Constraint, active=True, descend_into=True))
+    return {'variables': variables, 'enteras': enteras, 'restricciones': restricciones}
+
+
+def numero(valor):
+    """Valor numérico de un campo de los resultados de pyomo o None si no está definido o no es finito
+
+    :param valor: Campo de SolverResults
+    """
+    try:
+        valor = float(valor)
+    except (TypeError, ValueError):
+        return None
+    # Las cotas infinitas de un problema sin solución no se pueden escribir en JSON
+    return valor if np.isfinite(valor) else None
+
+
+def estado_solver(resultado, opt):
+    """Estado, terminación, cotas, gap y nodos de la resolución
+
+    :param resultado: SolverResults devuelto por solve()
+    :param opt: Solver con el que se ha resuelto
+    """
+    superior = numero(resultado.problem.upper_bound)
+    inferior = numero(resultado.problem.lower_bound)
+    gap = numero(getattr(resultado.solver, 'gap', None))
+    if gap is None and superior is not None and inferior is not None:
+        gap = abs(superior - inferior) / max(abs(superior), 1e-10)
+    nodos = numero(getattr(resultado.solver, 'node_count', None))
+    # HiGHS dentro del proceso no los incluye en los resultados
+    highs = getattr(opt, '_solver_model', None)
+    if nodos is None and highs is not None and hasattr(highs, 'getInfo'):
+        nodos = numero(highs.getInfo().mip_node_count)
+    return {'estado': str(resultado.solver.status), 'terminacion': str(resultado.solver.termination_condition),
+            'cota_superior': superior, 'cota_inferior': inferior, 'gap': gap,
+            'nodos': int(nodos) if nodos is not None and nodos >= 0 else None}
+
+
+def resolver(model, datos, sistema, opt=None, calentar=False):
+    """Resuelve el modelo con el solver configurado para el sistema
+
+    :param model: Modelo de pyomo
+    :param datos: Datos técnicos de los equipos de climatización
+    :param sistema: 'Gas', 'Aire acondicionado' o el tipo de aerotermia
+    :param opt: Solver ya creado para el sistema. Los solvers appsi conservan el modelo cargado entre llamadas
+    :param calentar: Parte de los valores actuales de las variables si el solver lo admite (ver modelos_vivos)
+    """
+    configuracion = configuracion_solver(datos, sistema)
+    if opt is None:
+        opt = crear_solver(configuracion)
+        comprobar_solver(opt, configuracion['nombre'])
+    argumentos = argumentos_solve(configuracion)
+    if calentar and opt.warm_start_capable():
+        argumentos['warmstart'] = True
+    nivel = nivel_salida_solver()
+    with medir('solver', sistema=sistema, solver=configuracion['nombre']) as metrica:
+        if metricas_activas():
+            metrica.update(tamano_modelo(model))
+        with seguimiento_solver(f"Resolviendo {sistema}", consola=nivel == 'completa') as tee:
+            resultado = opt.solve(model, tee=tee and nivel != 'no', **argumentos)
+        if metricas_activas():
+            metrica.update(estado_solver(resultado, opt))
+    informar(f"Modelo {sistema} resuelto")
+    return resultado
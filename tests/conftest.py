@@ -0,0 +1,39 @@
+"""Configuración común de los tests: se ejecutan desde la raíz del repositorio, donde están los archivos de
+configuración (datos_tecnicos.yaml, Datos/inversion.csv y Datos/ayudas.csv)"""
+import os
+import shutil
+
+import pytest
+
+from optimizador.configuracion import ARCHIVOS_CONFIGURACION, cargar_configuracion, variar_configuracion
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def carpeta_raiz(monkeypatch):
+    """Carpeta de trabajo en la raíz del repositorio durante cada test"""
+    monkeypatch.chdir(RAIZ)
+
+
+@pytest.fixture
+def carpeta_configuracion(monkeypatch, tmp_path):
+    """Carpeta de trabajo temporal con una copia de los archivos de configuración, que el test puede modificar"""
+    for archivo in ARCHIVOS_CONFIGURACION:
+        os.makedirs(tmp_path / os.path.dirname(archivo), exist_ok=True)
+        shutil.copy(os.path.join(RAIZ, archivo), tmp_path / archivo)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def configuracion_highs():
+    """Configuración del repositorio con HiGHS como solver"""
+    pytest.importorskip('highspy')
+    return variar_configuracion(cargar_configuracion(), {'Solver.nombre': 'appsi_highs'})
+
+
+@pytest.fixture
+def datos_highs(configuracion_highs):
+    """Datos técnicos del repositorio con HiGHS como solver"""
+    return configuracion_highs.datos
@@ -0,0 +1,24 @@
+"""Tests del barrido con un solo proceso: se ejecuta en el proceso del llamador sin cambiar su entorno"""
+import os
+
+import pandas as pd
+
+from benchmarks.datos_sinteticos import datos_sinteticos
+from optimizador.barrido import barrido
+
+
+def test_un_proceso_conserva_el_entorno(monkeypatch, tmp_path, configuracion_highs):
+    df, _ = datos_sinteticos(48, 1)
+    monkeypatch.setenv('GRAFICAS', 'inmediato')
+    monkeypatch.delenv('MPLBACKEND', raising=False)
+    monkeypatch.delenv('MODELOS_VIVOS', raising=False)
+    monkeypatch.setenv('CACHE_RESULTADOS', '0')
+
+    tabla, _ = barrido(df, pd.DataFrame({'cara_0': [0.0] * len(df)}), [0], 1, 'Otro', False,
+                       {'ayudas.Gas': [0, 500]}, sistemas=['Gas'], procesos=1, salida=str(tmp_path / "barrido"),
+                       configuracion=configuracion_highs)
+
+    assert tabla['coste_total_anual'].notna().all()
+    assert os.environ['GRAFICAS'] == 'inmediato'
+    assert 'MPLBACKEND' not in os.environ
+    assert 'MODELOS_VIVOS' not in os.environ
@@ -0,0 +1,107 @@
+"""Tests de la caché de resultados: una entrada se reutiliza con los mismos datos y configuración, se invalida
+si cambia la configuración y se desalojan las entradas usadas hace más tiempo"""
+import os
+import time
+
+import pytest
+
+from optimizador.cache_resultados import resultado_en_cache
+from optimizador.configuracion import cargar_configuracion, variar_configuracion
+
+
+class Calculo:
+    """Cálculo de prueba que cuenta sus ejecuciones y deja un archivo en la carpeta de resultados"""
+
+    def __init__(self):
+        self.llamadas = 0
+
+    def __call__(self, carpeta):
+        self.llamadas += 1
+        with open(os.path.join(carpeta, "Resultados.csv"), "w", encoding="utf-8") as f:
+            f.write("x" * 10)
+        return {"Inversion": f"{100 * self.llamadas} €", "Placas": [1, 2]}
+
+
+@pytest.fixture
+def cache(monkeypatch, carpeta_configuracion):
+    """Caché de resultados en una carpeta temporal. Devuelve la carpeta"""
+    carpeta = carpeta_configuracion / "cache"
+    monkeypatch.setenv("CACHE_RESULTADOS", str(carpeta))
+    monkeypatch.setenv("CACHE_RESULTADOS_MB", "50")
+    return carpeta
+
+
+def entradas_cache(carpeta):
+    """Archivos guardados en la caché"""
+    return [nombre for _, _, archivos in os.walk(carpeta) for nombre in archivos]
+
+
+def test_segundo_calculo_desde_cache(cache, tmp_path):
+    calculo = Calculo()
+    primero = resultado_en_cache(['vivienda'], calculo, str(tmp_path / "primera"))
+    segundo = resultado_en_cache(['vivienda'], calculo, str(tmp_path / "segunda"))
+
+    assert calculo.llamadas == 1
+    assert len(entradas_cache(cache)) == 1
+    assert segundo == primero == {"Inversion": "100 €", "Placas": [1, 2]}
+    assert segundo is not primero
+    with open(tmp_path / "segunda" / "Resultados.csv", encoding="utf-8") as f:
+        assert f.read() == "x" * 10
+
+
+def test_otros_datos_no_reutilizan_la_entrada(cache, tmp_path):
+    calculo = Calculo()
+    resultado_en_cache(['vivienda', 1], calculo, str(tmp_path))
+    resultado_en_cache(['vivienda', 2], calculo, str(tmp_path))
+
+    assert calculo.llamadas == 2
+    assert len(entradas_cache(cache)) == 2
+
+
+def test_cambio_de_datos_tecnicos(cache, tmp_path):
+    calculo = Calculo()
+    resultado_en_cache(['vivienda'], calculo, str(tmp_path))
+    with open("datos_tecnicos.yaml", "a", encoding="utf-8") as f:
+        f.write("# cambio\n")
+    resultado_en_cache(['vivienda'], calculo, str(tmp_path))
+    resultado_en_cache(['vivienda'], calculo, str(tmp_path))
+
+    assert calculo.llamadas == 2
+    assert len(entradas_cache(cache)) == 2
+
+
+def test_configuracion_variada(cache, tmp_path):
+    calculo = Calculo()
+    configuracion = cargar_configuracion()
+    variada = variar_configuracion(configuracion, {'Placas solares.precio': 200})
+    resultado_en_cache(['vivienda'], calculo, str(tmp_path), configuracion=configuracion)
+    resultado_en_cache(['vivienda'], calculo, str(tmp_path), configuracion=variada)
+    resultado_en_cache(['vivienda'], calculo, str(tmp_path), configuracion=variar_configuracion(
+        configuracion, {'Placas solares.precio': 200}))
+
+    assert calculo.llamadas == 2
+
+
+def test_desalojo_de_las_entradas_antiguas(cache, monkeypatch, tmp_path):
+    calculo = Calculo()
+
+    def usar(numero):
+        resultado_en_cache(['vivienda', numero], calculo, str(tmp_path))
+        # Fechas de modificación distintas aunque el reloj de los archivos sea poco preciso
+        time.sleep(0.05)
+
+    usar(0)
+    tamano = sum(os.path.getsize(os.path.join(raiz, nombre)) for raiz, _, archivos in os.walk(cache)
+                 for nombre in archivos)
+    # Caché con sitio para dos entradas: la tercera desaloja a la usada hace más tiempo
+    monkeypatch.setenv("CACHE_RESULTADOS_MB", str(2.5 * tamano / 1024 ** 2))
+    usar(1)
+    usar(0)
+    usar(2)
+    assert len(entradas_cache(cache)) == 2
+    assert calculo.llamadas == 3
+
+    usar(0)
+    assert calculo.llamadas == 3
+    usar(1)
+    assert calculo.llamadas == 4
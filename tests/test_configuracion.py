@@ -0,0 +1,65 @@
+"""Tests de la configuración: se lee una vez, se vuelve a leer si cambia algún archivo y es de solo lectura"""
+import dataclasses
+import pickle
+
+import pytest
+
+from optimizador.configuracion import cargar_configuracion, variar_configuracion
+
+
+@pytest.mark.usefixtures('carpeta_configuracion')
+def test_se_lee_una_vez():
+    assert cargar_configuracion() is cargar_configuracion()
+
+
+def test_se_lee_de_nuevo_si_cambia_un_archivo(carpeta_configuracion):
+    primera = cargar_configuracion()
+    with open(carpeta_configuracion / "Datos" / "ayudas.csv", "w", encoding="utf-8") as f:
+        f.write("Gas;Aerotermia de alta;Aerotermia de baja;Aire acondicionado\n500;0;0;0\n")
+    segunda = cargar_configuracion()
+
+    assert segunda is not primera
+    assert segunda.huellas != primera.huellas
+    assert primera.ayudas['Gas'] == 0
+    assert segunda.ayudas['Gas'] == 500
+    assert segunda.inversion_neta('Otro', 'Gas') == segunda.coste_inversion('Otro', 'Gas') - 500
+
+
+@pytest.mark.usefixtures('carpeta_configuracion')
+def test_solo_lectura():
+    configuracion = cargar_configuracion()
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        configuracion.datos = {}
+    with pytest.raises(TypeError):
+        configuracion.datos['Gas']['eficiencia'] = 1
+    with pytest.raises(TypeError):
+        configuracion.ayudas.update({'Gas': 100})
+    with pytest.raises(TypeError):
+        del configuracion.inversion['Otro']
+    copia = pickle.loads(pickle.dumps(configuracion))
+    assert copia == configuracion
+    with pytest.raises(TypeError):
+        copia.datos['Gas']['eficiencia'] = 1
+
+
+@pytest.mark.usefixtures('carpeta_configuracion')
+def test_variar_configuracion():
+    configuracion = cargar_configuracion()
+    precio = configuracion.datos['Placas solares']['precio']
+    variada = variar_configuracion(configuracion, {'Placas solares.precio': 200, 'ayudas.Gas': 300,
+                                                   'Aire acondicionado.precio Ud. Interior': 800})
+
+    assert variada.datos['Placas solares']['precio'] == 200
+    assert variada.datos['Aire acondicionado']['precio Ud. Interior'] == 800
+    assert variada.ayudas['Gas'] == 300
+    assert configuracion.datos['Placas solares']['precio'] == precio
+    assert configuracion.ayudas['Gas'] == 0
+    assert variada.huellas[:len(configuracion.huellas)] == configuracion.huellas
+    assert variada.huellas != configuracion.huellas
+    with pytest.raises(TypeError):
+        variada.datos['Placas solares']['precio'] = 100
+    with pytest.raises(KeyError):
+        variar_configuracion(configuracion, {'Placas solares.no existe': 1})
+    with pytest.raises(KeyError):
+        variar_configuracion(configuracion, {'Placas solares': 1})
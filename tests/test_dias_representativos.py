@@ -0,0 +1,44 @@
+"""Tests del modelo de aerotermia con días representativos y el depósito encadenado entre los días de la serie"""
+import pyomo.environ as pyo
+import pytest
+
+from benchmarks.datos_sinteticos import datos_sinteticos
+from optimizador.sistemas.construccion import mascara_calefaccion
+from optimizador.sistemas.dias_representativos import agrupar_dias, datos_agrupados
+from optimizador.sistemas.estudio_aerotermia import modelo_aerotermia, temperatura_deposito
+from optimizador.sistemas.solver import resolver
+
+TIPO = 'Aerotermia de alta'
+
+
+def modelo_dias(df, irradiacion, n_dias, datos):
+    """Modelo de días representativos resuelto y su agrupación"""
+    agrupacion = agrupar_dias(df, irradiacion, n_dias)
+    df_dias, irradiacion_dias = datos_agrupados(df, irradiacion, agrupacion)
+    model = modelo_aerotermia(TIPO, df_dias, irradiacion_dias, [60, 60], 2, 0, datos, pesos=agrupacion['pesos'],
+                              secuencia=agrupacion['asignacion'])
+    resolver(model, datos, TIPO)
+    return model
+
+
+def test_un_dia_por_representante_igual_que_el_modelo_completo(datos_highs):
+    df, irradiacion = datos_sinteticos(240, 2)
+    completo = modelo_aerotermia(TIPO, df, irradiacion, [60, 60], 2, 0, datos_highs)
+    resolver(completo, datos_highs, TIPO)
+    reducido = modelo_dias(df, irradiacion, 10, datos_highs)
+
+    assert pyo.value(completo.v_dep) > 0
+    assert pyo.value(reducido.v_dep) == pytest.approx(pyo.value(completo.v_dep), rel=1e-4)
+    assert pyo.value(reducido.p_bdc) == pytest.approx(pyo.value(completo.p_bdc), rel=1e-4)
+
+
+def test_temperatura_de_la_serie_dentro_de_los_limites(datos_highs):
+    df, irradiacion = datos_sinteticos(720, 2)
+    model = modelo_dias(df, irradiacion, 4, datos_highs)
+    t_int = temperatura_deposito(model, datos_highs[TIPO]['temperatura'], serie=True)
+    calefaccion = mascara_calefaccion(df)
+
+    assert len(t_int) == len(df)
+    assert t_int[calefaccion].min() >= datos_highs[TIPO]['temperatura'] - 1e-4
+    assert t_int.max() <= 85 + 1e-4
+    assert t_int[~calefaccion].max(initial=5) <= 7 + 1e-4
@@ -0,0 +1,86 @@
+"""Tests del aire acondicionado: la solución analítica con placas fijadas coincide con la del modelo resuelto con
+pyomo, y cada temporada conserva la irradiación de sus propias filas"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from optimizador.sistemas.construccion import irradiacion_filas, temporadas
+from optimizador.sistemas.estudio_aire_acondicionado import (optimizar_aire_acondicionado, resolver_aire_acondicionado,
+                                                             solucion_aire_acondicionado)
+
+C_I = 2401.43
+AREA = [60, 60]
+AGUAS = 2
+
+
+@pytest.fixture
+def df_aire():
+    """Dos días horarios con cargas de calefacción y de refrigeración y precio de la luz variable"""
+    rng = np.random.default_rng(0)
+    horas = 48
+    cargas = rng.uniform(-6000, 8000, horas)
+    return pd.DataFrame({
+        'cargas': cargas,
+        'precio_luz': rng.uniform(0.08, 0.20, horas) / 1000,
+        'climatizacion': np.where(cargas >= 0, 'Calefaccion', 'Refrigeracion')
+    }, index=pd.date_range(start='01-01-2023', freq='h', periods=horas))
+
+
+@pytest.fixture
+def irradiacion_aire(df_aire):
+    """Irradiación de dos caras con un valor distinto en cada fila"""
+    sol = np.clip(800 * np.sin(np.pi * ((np.arange(len(df_aire)) % 24) - 6) / 12), 0, None)
+    return pd.DataFrame({'cara_0': sol, 'cara_1': 0.7 * sol})
+
+
+def test_solucion_analitica_igual_que_pyomo(df_aire, irradiacion_aire, datos_highs):
+    n_ps = [3, 1]
+    analitica = solucion_aire_acondicionado(df_aire, irradiacion_aire, n_ps, AGUAS, C_I, datos_highs)
+    solver = resolver_aire_acondicionado(df_aire, irradiacion_aire, AREA, n_ps, AGUAS, C_I, datos_highs)
+
+    assert analitica['e_ps'].sum() > 0
+    np.testing.assert_allclose(analitica['e_red'], solver['e_red'], rtol=1e-6, atol=1e-6)
+    np.testing.assert_allclose(analitica['e_ps'], solver['e_ps'], rtol=1e-6, atol=1e-6)
+    np.testing.assert_array_equal(analitica['n_ps'], solver['n_ps'])
+    assert analitica['p_bdc'] == pytest.approx(solver['p_bdc'], rel=1e-6)
+    assert analitica['opex'] == pytest.approx(solver['opex'], rel=1e-6)
+    assert analitica['capex'] == pytest.approx(solver['capex'], rel=1e-6)
+
+
+def test_temporada_de_refrigeracion_igual_que_pyomo(df_aire, irradiacion_aire, datos_highs):
+    _, (df_refrigeracion, irradiacion_refrigeracion) = temporadas(df_aire, irradiacion_aire)
+    analitica = optimizar_aire_acondicionado(df_refrigeracion, irradiacion_refrigeracion, AREA, [2, 2], AGUAS, C_I,
+                                             datos_highs)
+    solver = optimizar_aire_acondicionado(df_refrigeracion, irradiacion_refrigeracion, AREA, [2, 2], AGUAS, C_I,
+                                          datos_highs, metodo="pyomo")
+
+    np.testing.assert_allclose(analitica['e_red'], solver['e_red'], rtol=1e-6, atol=1e-6)
+    assert analitica['opex'] == pytest.approx(solver['opex'], rel=1e-6)
+
+
+def test_temporadas_conservan_la_irradiacion_de_cada_fila(df_aire):
+    # La irradiación de cada fila es su posición en el Dataframe
+    irradiacion = np.repeat(np.arange(len(df_aire), dtype=float)[:, None], AGUAS, axis=1)
+    calefaccion = np.flatnonzero(df_aire['climatizacion'] == 'Calefaccion')
+    refrigeracion = np.flatnonzero(df_aire['climatizacion'] == 'Refrigeracion')
+
+    (df_calefaccion, irradiacion_calefaccion), (df_refrigeracion, irradiacion_refrigeracion) = temporadas(
+        df_aire, irradiacion)
+
+    assert len(calefaccion) > 0 and len(refrigeracion) > 0
+    assert df_calefaccion.index.equals(df_aire.index[calefaccion])
+    assert df_refrigeracion.index.equals(df_aire.index[refrigeracion])
+    np.testing.assert_array_equal(irradiacion_calefaccion[:, 0], calefaccion)
+    np.testing.assert_array_equal(irradiacion_refrigeracion[:, 1], refrigeracion)
+
+
+def test_irradiacion_de_otra_longitud(df_aire, irradiacion_aire, datos_highs):
+    _, (df_refrigeracion, _) = temporadas(df_aire, irradiacion_aire)
+
+    with pytest.raises(ValueError):
+        irradiacion_filas(df_aire, irradiacion_aire.iloc[:-1])
+    with pytest.raises(ValueError):
+        temporadas(df_aire, irradiacion_aire.iloc[:-1])
+    # La irradiación de todo el año no se puede usar con las filas de una temporada
+    with pytest.raises(ValueError):
+        optimizar_aire_acondicionado(df_refrigeracion, irradiacion_aire, AREA, [2, 2], AGUAS, C_I, datos_highs)
@@ -0,0 +1,79 @@
+"""Tests del modelo conjunto de la aerotermia de alta en calefacción y el aire acondicionado en refrigeración"""
+import numpy as np
+import pyomo.environ as pyo
+import pytest
+
+from benchmarks.datos_sinteticos import datos_sinteticos
+from optimizador.barrido import importe
+from optimizador.configuracion import variar_configuracion
+from optimizador.sistemas import calculo_sistema
+from optimizador.sistemas.estudio_aerotermia import aerotermia_por_partes
+from optimizador.sistemas.estudio_conjunto import calculo_conjunto, modelo_conjunto
+from optimizador.sistemas.solver import resolver, valores_enteros
+
+TIPO = 'Aerotermia de alta'
+PLACAS, AGUAS, ACTUAL = [60, 60], 2, 'Otro'
+HORAS = 96
+
+
+@pytest.fixture
+def configuracion_conjunta(configuracion_highs, monkeypatch):
+    """Configuración con HiGHS sin gap y placas baratas, para que el óptimo tenga placas"""
+    monkeypatch.setenv('CACHE_RESULTADOS', '0')
+    monkeypatch.setenv('GRAFICAS', 'no')
+    monkeypatch.setenv('MODELOS_VIVOS', '0')
+    return variar_configuracion(configuracion_highs, {f'{TIPO}.Solver.gap': 0, 'Solver.gap': 0,
+                                                      'Placas solares.precio': 20})
+
+
+@pytest.fixture
+def serie_mixta():
+    """Cuatro días con una de cada tres horas en refrigeración"""
+    df, irradiacion = datos_sinteticos(HORAS, AGUAS)
+    df.loc[df.index[::3], 'cargas'] *= -1
+    df['climatizacion'] = np.where(df['cargas'] >= 0, 'Calefaccion', 'Refrigeracion')
+    return df, irradiacion
+
+
+def coste_total(resultado, datos):
+    """Coste total anual de un resultado de calculo_sistema"""
+    return (importe(resultado['Costo operativo anual']) +
+            importe(resultado['Inversion']) / datos['Bomba de calor']['Ciclo de vida'])
+
+
+def test_no_peor_que_en_dos_pasos(serie_mixta, configuracion_conjunta, tmp_path):
+    df, irradiacion = serie_mixta
+    # Con días representativos la aerotermia se resuelve por partes en las horas de calefacción y el aire
+    # acondicionado después, con las placas de la aerotermia
+    dias = int((df['climatizacion'] == 'Calefaccion').sum()) // 24
+    dos_pasos = variar_configuracion(configuracion_conjunta, {'Dias representativos.dias': dias})
+    assert not aerotermia_por_partes(df, configuracion_conjunta.datos)
+    assert aerotermia_por_partes(df, dos_pasos.datos)
+
+    conjunto = calculo_sistema(TIPO, df, irradiacion, PLACAS, AGUAS, ACTUAL, True, str(tmp_path),
+                               configuracion_conjunta)
+    separado = calculo_sistema(TIPO, df, irradiacion, PLACAS, AGUAS, ACTUAL, True, str(tmp_path), dos_pasos)
+
+    datos = configuracion_conjunta.datos
+    assert coste_total(conjunto, datos) <= coste_total(separado, datos) * (1 + 1e-6)
+
+
+def test_placas_compartidas_y_pagadas_una_vez(serie_mixta, configuracion_conjunta, tmp_path):
+    df, irradiacion = serie_mixta
+    datos = configuracion_conjunta.datos
+    c_i = configuracion_conjunta.coste_inversion(ACTUAL, TIPO)
+    c_aire = configuracion_conjunta.coste_inversion(ACTUAL, 'Aire acondicionado')
+    model = modelo_conjunto(TIPO, df, irradiacion, PLACAS, AGUAS, c_i, c_aire, datos)
+    resolver(model, datos, TIPO)
+
+    calefaccion, refrigeracion = model.calefaccion, model.refrigeracion
+    assert len(model.Placas) == AGUAS
+    np.testing.assert_array_equal(valores_enteros(refrigeracion.n_ps), valores_enteros(calefaccion.n_ps))
+    assert valores_enteros(calefaccion.n_ps).sum() > 0
+    assert pyo.value(refrigeracion.c_ps) > 0
+    inversion = pyo.value(calefaccion.capex) + pyo.value(refrigeracion.capex) - pyo.value(refrigeracion.c_ps)
+    assert pyo.value(model.capex) == pytest.approx(inversion, rel=1e-9)
+
+    resultado = calculo_conjunto(TIPO, df, irradiacion, PLACAS, AGUAS, c_i, c_aire, str(tmp_path), datos)
+    assert importe(resultado['Inversion']) == pytest.approx(inversion, abs=0.01)
+    np.testing.assert_array_equal(resultado['Placas'], valores_enteros(calefaccion.n_ps))
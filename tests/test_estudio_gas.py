@@ -0,0 +1,36 @@
+"""Tests del modelo de gas: la solución analítica coincide con la del modelo resuelto con pyomo"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from optimizador.sistemas.estudio_gas import resolver_gas, solucion_gas
+
+C_I = 3036.26
+
+
+@pytest.fixture
+def df_gas():
+    """Dos días horarios con cargas de calefacción y precio del gas variables"""
+    rng = np.random.default_rng(0)
+    horas = 48
+    return pd.DataFrame({
+        'cargas': rng.uniform(0, 8000, horas),
+        'precio_gas': rng.uniform(0.09, 0.13, horas) / 1000,
+        'climatizacion': ['Calefaccion'] * horas
+    }, index=pd.date_range(start='01-01-2023', freq='h', periods=horas))
+
+
+def test_solucion_analitica_igual_que_pyomo(df_gas, datos_highs):
+    analitica = solucion_gas(df_gas, C_I, datos_highs)
+    solver = resolver_gas(df_gas, C_I, datos_highs)
+
+    np.testing.assert_allclose(analitica['q_cg'], solver['q_cg'], rtol=1e-6, atol=1e-6)
+    assert analitica['p_gas'] == pytest.approx(solver['p_gas'], rel=1e-6)
+    assert analitica['opex'] == pytest.approx(solver['opex'], rel=1e-6)
+    assert analitica['capex'] == pytest.approx(solver['capex'], rel=1e-6)
+
+
+def test_cargas_de_refrigeracion(df_gas, datos_highs):
+    df_gas.loc[df_gas.index[0], 'cargas'] = -100
+    with pytest.raises(ValueError):
+        solucion_gas(df_gas, C_I, datos_highs)
@@ -0,0 +1,36 @@
+"""Tests de la frontera de Pareto: el punto óptimo de cada sistema coincide con el resultado de seleccion_sistema"""
+import pytest
+
+from benchmarks.datos_sinteticos import datos_sinteticos
+from optimizador.barrido import importe
+from optimizador.configuracion import variar_configuracion
+from optimizador.sistemas import seleccion_sistema
+from optimizador.sistemas.estudio_completo import SISTEMAS
+from optimizador.sistemas.frontera_pareto import frontera_sistemas
+
+PLACAS, AGUAS, ACTUAL = [60, 60], 2, 'Otro'
+
+
+@pytest.fixture
+def configuracion_ayudas(configuracion_highs, monkeypatch):
+    """Configuración con HiGHS sin gap y ayudas distintas de cero para todos los sistemas"""
+    monkeypatch.setenv('CACHE_RESULTADOS', '0')
+    monkeypatch.setenv('GRAFICAS', 'no')
+    cambios = {f'ayudas.{nuevo}': 2000 for nuevo in SISTEMAS}
+    cambios.update({f'{nuevo}.Solver.gap': 0 for nuevo in SISTEMAS if nuevo != 'Gas'})
+    return variar_configuracion(configuracion_highs, cambios)
+
+
+def test_optimo_igual_que_seleccion_sistema(configuracion_ayudas, tmp_path):
+    df, irradiacion = datos_sinteticos(48, AGUAS)
+    frontera = frontera_sistemas(df, irradiacion, PLACAS, AGUAS, ACTUAL, False, SISTEMAS, 3,
+                                 configuracion=configuracion_ayudas)
+
+    for nuevo in SISTEMAS:
+        resultado = seleccion_sistema(nuevo, df, irradiacion, PLACAS, AGUAS, ACTUAL, False, str(tmp_path),
+                                      configuracion_ayudas)
+        optimo = frontera[(frontera['sistema'] == nuevo) & frontera['optimo']]
+        assert len(optimo) == 1
+        assert optimo['inversion'].iloc[0] == pytest.approx(importe(resultado['Inversion']), abs=0.01), nuevo
+        assert optimo['coste_operativo'].iloc[0] == pytest.approx(importe(resultado['Costo operativo anual']),
+                                                                  abs=0.01), nuevo
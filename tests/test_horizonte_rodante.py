@@ -0,0 +1,63 @@
+"""Tests de la operación de la aerotermia por horizonte rodante con los equipos fijados"""
+import numpy as np
+import pytest
+
+from benchmarks.datos_sinteticos import datos_sinteticos
+from optimizador.configuracion import variar_configuracion
+from optimizador.sistemas import estudio_aerotermia
+from optimizador.sistemas.estudio_aerotermia import despacho_horizonte_rodante, optimizar_aerotermia
+
+TIPO = 'Aerotermia de alta'
+PLACAS, AGUAS, C_I = [60, 60], 2, 0
+
+
+@pytest.fixture
+def datos_exactos(configuracion_highs):
+    """Datos técnicos con HiGHS y sin gap, para que el óptimo de cada modelo sea único"""
+    return variar_configuracion(configuracion_highs, {f'{TIPO}.Solver.gap': 0}).datos
+
+
+@pytest.fixture
+def dimensionado(datos_exactos):
+    """Serie de cuatro días y solución del modelo de toda la serie"""
+    df, irradiacion = datos_sinteticos(96, AGUAS)
+    return df, irradiacion, optimizar_aerotermia(TIPO, df, irradiacion, PLACAS, AGUAS, C_I, datos_exactos)
+
+
+def test_una_ventana_igual_que_el_modelo_completo(dimensionado, datos_exactos):
+    df, irradiacion, completo = dimensionado
+    rodante = despacho_horizonte_rodante(TIPO, df, irradiacion, PLACAS, AGUAS, C_I, datos_exactos, completo,
+                                         ventana=len(df), solape=0)
+
+    assert completo['opex'] > 0
+    assert rodante['opex'] == pytest.approx(completo['opex'], rel=1e-6)
+    assert rodante['p_bdc'] == pytest.approx(completo['p_bdc'], rel=1e-6)
+    np.testing.assert_allclose(rodante['e_red'], completo['e_red'], rtol=1e-5, atol=1e-3)
+    np.testing.assert_allclose(rodante['t_int'], completo['t_int'], rtol=1e-5, atol=1e-3)
+
+
+def test_temperatura_enlazada_entre_ventanas(dimensionado, datos_exactos, monkeypatch):
+    df, irradiacion, completo = dimensionado
+    iniciales = []
+    construir = estudio_aerotermia.modelo_aerotermia
+
+    def modelo_ventana(*args, t_inicial=None, **kwargs):
+        iniciales.append(t_inicial)
+        return construir(*args, t_inicial=t_inicial, **kwargs)
+
+    monkeypatch.setattr(estudio_aerotermia, 'modelo_aerotermia', modelo_ventana)
+    ventana = 24
+    rodante = despacho_horizonte_rodante(TIPO, df, irradiacion, PLACAS, AGUAS, C_I, datos_exactos, completo,
+                                         ventana=ventana, solape=12)
+
+    horas = len(df) - 1
+    assert len(iniciales) == int(np.ceil(horas / ventana))
+    assert iniciales[0] is None
+    # Cada ventana parte de la temperatura de la última hora conservada de la anterior
+    for k, t_inicial in enumerate(iniciales[1:], start=1):
+        assert t_inicial == pytest.approx(rodante['t_int'][k * ventana - 1])
+    assert len(rodante['e_red']) == len(rodante['t_int']) == horas
+    precio = df['precio_luz'].to_numpy(dtype=float)[1:]
+    assert rodante['opex'] == pytest.approx(float(precio @ rodante['e_red']), rel=1e-9)
+    # Con el estado enlazado la operación por ventanas es una solución posible del modelo completo
+    assert rodante['opex'] >= completo['opex'] * (1 - 1e-6)
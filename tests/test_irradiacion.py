@@ -0,0 +1,140 @@
+"""Tests de la caché de PVGIS y de la descarga de cada cara del tejado con un servidor HTTP local que imita la API
+y cuenta las consultas"""
+import json
+import os
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pytest
+
+import optimizador.irradiacion
+from optimizador.irradiacion import azimut_caras, calculo_irradiacion
+from optimizador.irradiacion.irradiacion import obtener_datos_pvgis
+
+
+class ServidorPVGIS(BaseHTTPRequestHandler):
+    """Responde como seriescalc con un día de datos horarios que dependen del azimut. Los azimuts de rechazados
+    reciben un error 400"""
+    consultas = []
+    rechazados = set()
+
+    def do_GET(self):  # pylint: disable=C0103
+        """Guarda la consulta y devuelve la serie horaria en JSON"""
+        consulta = {clave: valores[0] for clave, valores in parse_qs(urlparse(self.path).query).items()}
+        self.consultas.append(consulta)
+        azimut = float(consulta['aspect'])
+        if azimut in self.rechazados:
+            self.send_error(400, "Azimut rechazado")
+            return
+        horario = [{"time": f"20230101:{h:02d}10", "Gb(i)": max(0.0, 500 - abs(h - 12) * 60) + azimut,
+                    "Gd(i)": 50.0, "Gr(i)": 2.0} for h in range(24)]
+        cuerpo = json.dumps({"outputs": {"hourly": horario}}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, format, *args):  # pylint: disable=W0622
+        """Sin registro de cada consulta"""
+
+
+@pytest.fixture
+def pvgis(monkeypatch, tmp_path):
+    """Servidor local como URL de PVGIS y caché en una carpeta temporal. Devuelve la lista de consultas"""
+    ServidorPVGIS.consultas = []
+    ServidorPVGIS.rechazados = set()
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), ServidorPVGIS)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    monkeypatch.setenv("PVGIS_URL", f"http://127.0.0.1:{servidor.server_port}/seriescalc")
+    monkeypatch.setenv("CACHE_PVGIS", str(tmp_path / "pvgis"))
+    monkeypatch.setenv("CACHE_PVGIS_MB", "200")
+    monkeypatch.setenv("PVGIS_SIN_CONEXION", "0")
+    yield ServidorPVGIS.consultas
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def entradas_cache(carpeta):
+    """Archivos .npz guardados en la caché"""
+    return [nombre for _, _, archivos in os.walk(carpeta) for nombre in archivos if nombre.endswith(".npz")]
+
+
+def test_segunda_descarga_desde_cache(pvgis, tmp_path):
+    primera = obtener_datos_pvgis(40.4, -3.7, 0)
+    segunda = obtener_datos_pvgis(40.4, -3.7, 0)
+
+    assert len(pvgis) == 1
+    assert len(entradas_cache(tmp_path / "pvgis")) == 1
+    assert set(primera) == set(segunda)
+    for columna, valores in primera.items():
+        np.testing.assert_array_equal(valores, segunda[columna])
+
+
+def test_cada_consulta_tiene_su_entrada(pvgis):
+    obtener_datos_pvgis(40.4, -3.7, 0)
+    obtener_datos_pvgis(40.4, -3.7, 90)
+    obtener_datos_pvgis(40.4, -3.7, 0, anio=2022)
+
+    assert len(pvgis) == 3
+    assert [consulta['aspect'] for consulta in pvgis] == ['0', '90', '0']
+
+
+def test_sin_conexion_solo_lee_la_cache(pvgis, monkeypatch):
+    guardada = obtener_datos_pvgis(40.4, -3.7, 0)
+    monkeypatch.setenv("PVGIS_SIN_CONEXION", "1")
+
+    leida = obtener_datos_pvgis(40.4, -3.7, 0)
+    np.testing.assert_array_equal(guardada["Gb(i)"], leida["Gb(i)"])
+    with pytest.raises(ConnectionError):
+        obtener_datos_pvgis(40.4, -3.7, 90)
+    assert len(pvgis) == 1
+
+
+def test_desalojo_de_las_entradas_antiguas(pvgis, monkeypatch, tmp_path):
+    carpeta = tmp_path / "pvgis"
+    obtener_datos_pvgis(40.4, -3.7, 0)
+    tamano = sum(os.path.getsize(os.path.join(raiz, nombre)) for raiz, _, archivos in os.walk(carpeta)
+                 for nombre in archivos)
+    # Caché con sitio para una sola entrada: la nueva desaloja a la anterior
+    monkeypatch.setenv("CACHE_PVGIS_MB", str(1.5 * tamano / 1024 ** 2))
+    obtener_datos_pvgis(40.4, -3.7, 90)
+    assert len(entradas_cache(carpeta)) == 1
+
+    obtener_datos_pvgis(40.4, -3.7, 90)
+    obtener_datos_pvgis(40.4, -3.7, 0)
+    assert len(pvgis) == 3
+
+
+def test_una_consulta_por_cara(pvgis):
+    caras = azimut_caras(30, 4)
+    irradiacion = calculo_irradiacion(40.4, -3.7, 30, 4, anio=2023)
+
+    assert sorted(float(consulta['aspect']) for consulta in pvgis) == sorted(caras)
+    assert list(irradiacion.columns) == [f'cara_{i}' for i in range(4)]
+    # Cada columna tiene los datos de su azimut aunque las descargas terminen en otro orden
+    for i, cara in enumerate(caras):
+        directa = obtener_datos_pvgis(40, -3, cara)
+        np.testing.assert_allclose(irradiacion[f'cara_{i}'], directa['Gb(i)'] + directa['Gd(i)'] + directa['Gr(i)'])
+    assert len(pvgis) == 4
+
+
+def test_caras_con_la_misma_orientacion(pvgis, monkeypatch):
+    monkeypatch.setattr(optimizador.irradiacion, 'azimut_caras', lambda azimut, aguas: [azimut, azimut + 360])
+    irradiacion = calculo_irradiacion(40.4, -3.7, 20, 2, anio=2023)
+
+    assert len(pvgis) == 1
+    np.testing.assert_array_equal(irradiacion['cara_0'], irradiacion['cara_1'])
+
+
+def test_error_con_la_cara_que_falla(pvgis):
+    ServidorPVGIS.rechazados = {180.0}
+
+    with pytest.raises(ConnectionError, match="cara_1") as error:
+        calculo_irradiacion(40.4, -3.7, 0, 2, anio=2023)
+    assert "cara_0" not in str(error.value)
+    assert len(pvgis) == 2
@@ -0,0 +1,19 @@
+"""Tests del cálculo por lotes con un solo proceso: se ejecuta en el proceso del llamador sin cambiar su entorno"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from optimizador.lotes import optimizar_lote
+
+
+def test_un_proceso_conserva_el_entorno(monkeypatch, tmp_path):
+    temperatura = tmp_path / "T_exterior.csv"
+    pd.DataFrame({'T_exterior': np.full(8760, 10.0)}).to_csv(temperatura, index=False)
+    monkeypatch.setenv('GRAFICAS', 'inmediato')
+    monkeypatch.delenv('MPLBACKEND', raising=False)
+
+    optimizar_lote([], salida=str(tmp_path / "lote"), temperatura=str(temperatura), procesos=1, graficas='no')
+
+    assert os.environ['GRAFICAS'] == 'inmediato'
+    assert 'MPLBACKEND' not in os.environ
@@ -0,0 +1,97 @@
+"""Tests de los modelos vivos: el modelo conservado, con los precios, las cargas, la irradiación y los costes de
+inversión actualizados, da la misma solución que un modelo construido de nuevo"""
+import numpy as np
+import pytest
+
+from benchmarks.datos_sinteticos import datos_sinteticos
+from optimizador.configuracion import variar_configuracion
+from optimizador.progreso import registrar
+from optimizador.sistemas.estudio_aerotermia import optimizar_aerotermia
+from optimizador.sistemas.estudio_aire_acondicionado import resolver_aire_acondicionado
+from optimizador.sistemas.estudio_gas import resolver_gas
+from optimizador.sistemas.modelos_vivos import vaciar_modelos_vivos
+
+TIPO = 'Aerotermia de alta'
+PLACAS, AGUAS = [60, 60], 2
+
+# Cambios de los coeficientes del coste de inversión entre el primer cálculo y el segundo
+CAMBIOS = {
+    'Gas': {'Gas.coste potencia': 0.08, 'Gas.Ciclo de vida': 12},
+    TIPO: {f'{TIPO}.coste potencia': 0.45, 'Deposito.coste volumen': 6.0, 'Placas solares.precio': 150},
+    'Aire acondicionado': {'Aire acondicionado.coste potencia': 0.3, 'Aire acondicionado.precio Ud. Interior': 800,
+                           'Placas solares.precio': 150}
+}
+
+
+def resolver_sistema(sistema, df, irradiacion, c_i, datos):
+    """Solución de un sistema resuelto con pyomo a través de los modelos vivos"""
+    if sistema == 'Gas':
+        return resolver_gas(df, c_i, datos)
+    if sistema == TIPO:
+        return optimizar_aerotermia(TIPO, df, irradiacion, PLACAS, AGUAS, c_i, datos)
+    return resolver_aire_acondicionado(df, irradiacion, PLACAS, [0] * AGUAS, AGUAS, c_i, datos)
+
+
+def serie(sistema, horas=48, semilla=0):
+    """Serie sintética del sistema: el aire acondicionado tiene también horas de refrigeración"""
+    df, irradiacion = datos_sinteticos(horas, AGUAS, semilla)
+    if sistema == 'Aire acondicionado':
+        df.loc[df.index[::3], 'cargas'] *= -1
+        df['climatizacion'] = np.where(df['cargas'] >= 0, 'Calefaccion', 'Refrigeracion')
+    return df, irradiacion
+
+
+@pytest.fixture
+def avisos(monkeypatch):
+    """Modelos vivos activados y vacíos. Devuelve la lista de avisos de progreso"""
+    monkeypatch.setenv('MODELOS_VIVOS', '4')
+    vaciar_modelos_vivos()
+    lista = []
+    registrar(lambda etapa, detalle: lista.append(etapa))
+    yield lista
+    registrar(None)
+    vaciar_modelos_vivos()
+
+
+@pytest.fixture
+def datos_exactos(configuracion_highs):
+    """Configuración con HiGHS y sin gap, para que el óptimo de cada modelo sea único"""
+    return variar_configuracion(configuracion_highs, {f'{TIPO}.Solver.gap': 0, 'Solver.gap': 0})
+
+
+@pytest.mark.parametrize('sistema', ['Gas', TIPO, 'Aire acondicionado'])
+def test_modelo_actualizado_igual_que_uno_nuevo(sistema, avisos, datos_exactos, monkeypatch):
+    df, irradiacion = serie(sistema)
+    resolver_sistema(sistema, df, irradiacion, 1000, datos_exactos.datos)
+
+    # Otros precios, cargas, irradiación y costes de inversión con la misma estructura
+    df_nuevo = df.copy()
+    rng = np.random.default_rng(1)
+    df_nuevo['precio_luz'] *= rng.uniform(0.5, 2.0, len(df))
+    df_nuevo['precio_gas'] *= 1.3
+    df_nuevo['cargas'] *= 1.2
+    irradiacion_nueva = irradiacion * 0.8
+    datos_nuevos = variar_configuracion(datos_exactos, CAMBIOS[sistema]).datos
+    actualizado = resolver_sistema(sistema, df_nuevo, irradiacion_nueva, 1500, datos_nuevos)
+    assert avisos.count(f"Modelo {sistema} actualizado") == 1
+
+    monkeypatch.setenv('MODELOS_VIVOS', '0')
+    nuevo = resolver_sistema(sistema, df_nuevo, irradiacion_nueva, 1500, datos_nuevos)
+
+    for clave in ('p_gas', 'p_bdc', 'v_dep', 'opex', 'capex'):
+        if clave in nuevo:
+            assert actualizado[clave] == pytest.approx(nuevo[clave], rel=1e-6, abs=1e-6), clave
+    if 'n_ps' in nuevo:
+        np.testing.assert_array_equal(actualizado['n_ps'], nuevo['n_ps'])
+
+
+@pytest.mark.parametrize('sistema', ['Gas', TIPO, 'Aire acondicionado'])
+def test_otra_estructura_construye_un_modelo_nuevo(sistema, avisos, datos_exactos):
+    df, irradiacion = serie(sistema)
+    resolver_sistema(sistema, df, irradiacion, 1000, datos_exactos.datos)
+    resolver_sistema(sistema, df, irradiacion, 1000, datos_exactos.datos)
+    df_largo, irradiacion_larga = serie(sistema, horas=72)
+    resolver_sistema(sistema, df_largo, irradiacion_larga, 1000, datos_exactos.datos)
+
+    assert avisos.count(f"Modelo {sistema} construido") == 2
+    assert avisos.count(f"Modelo {sistema} actualizado") == 1